@@ -0,0 +1,158 @@
+"""
+async_client_module.py - Asyncio Groww client over a pooled HTTP session.
+Responsibility: Expose the Groww data calls used by the bot as coroutines on one
+keep-alive aiohttp session, plus a blocking view so the sync modules can run on it.
+No strategy logic. No trade logic.
+"""
+
+import asyncio
+
+import aiohttp
+from growwapi import GrowwAPI
+from growwapi.groww.exceptions import GrowwAPIException
+
+import config
+from methods_module import METHODS
+
+
+def _query_params(params: dict) -> list:
+    """Flatten params into (key, value) pairs; tuples/lists become repeated keys."""
+    pairs = []
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            pairs.extend((key, str(v)) for v in value)
+        else:
+            pairs.append((key, str(value)))
+    return pairs
+
+
+class AsyncGrowwClient:
+    """
+    Coroutine versions of get_historical_candles, get_ltp, get_quote,
+    get_expiries and get_contracts. Same endpoints, parameters and error
+    mapping as GrowwAPI, but all requests share one pooled session so
+    TLS handshakes are paid once per connection instead of once per call.
+    GrowwAPI constants (SEGMENT_FNO, CANDLE_INTERVAL_MIN_15, ...) are available
+    as attributes.
+    """
+
+    def __init__(self, token: str, max_connections: int = None, timeout: float = None):
+        self.token = token
+        self.domain = "https://api.groww.in/v1"
+        self.max_connections = max_connections or config.ASYNC_MAX_CONNECTIONS
+        self.timeout = timeout or config.API_REQUEST_TIMEOUT
+        self._session = None
+
+    def __getattr__(self, name):
+        # Constants (EXCHANGE_NSE, SEGMENT_CASH, ...) come from GrowwAPI
+        if name.isupper():
+            return getattr(GrowwAPI, name)
+        raise AttributeError(name)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=config.ASYNC_KEEPALIVE_SECONDS,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _get(self, path: str, params: dict) -> dict:
+        session = await self._get_session()
+        async with session.get(
+            f"{self.domain}{path}",
+            params=_query_params(params),
+            headers=GrowwAPI._build_headers(self.token),
+        ) as response:
+            response_map = await response.json(content_type=None)
+            return self._parse_response(response.status, response_map)
+
+    @staticmethod
+    def _parse_response(status: int, response_map: dict) -> dict:
+        """Same error handling as GrowwAPI._parse_response."""
+        if response_map.get("status") == "FAILURE":
+            error = response_map["error"]
+            raise GrowwAPIException(code=error["code"], msg=error["message"])
+        if status in GrowwAPI._ERROR_MAP:
+            raise GrowwAPI._ERROR_MAP[status]()
+        if status >= 400:
+            raise GrowwAPIException(
+                code=str(status),
+                msg="The request to the Groww API failed.",
+            )
+        return dict(
+            response_map["payload"] if "payload" in response_map else response_map
+        )
+
+    async def get_historical_candles(self, exchange: str, segment: str, groww_symbol: str,
+                                     start_time: str, end_time: str, candle_interval: str) -> dict:
+        return await self._get("/historical/candles", {
+            "exchange": exchange,
+            "segment": segment,
+            "groww_symbol": groww_symbol,
+            "start_time": start_time,
+            "end_time": end_time,
+            "candle_interval": candle_interval,
+        })
+
+    async def get_ltp(self, exchange_trading_symbols, segment: str) -> dict:
+        return await self._get("/live-data/ltp", {
+            "segment": segment,
+            "exchange_symbols": exchange_trading_symbols,
+        })
+
+    async def get_quote(self, trading_symbol: str, exchange: str, segment: str) -> dict:
+        return await self._get("/live-data/quote", {
+            "exchange": exchange,
+            "segment": segment,
+            "trading_symbol": trading_symbol,
+        })
+
+    async def get_expiries(self, exchange: str, underlying_symbol: str,
+                           year: int = None, month: int = None) -> dict:
+        return await self._get("/historical/expiries", {
+            "exchange": exchange,
+            "underlying_symbol": underlying_symbol,
+            "year": year,
+            "month": month,
+        })
+
+    async def get_contracts(self, exchange: str, underlying_symbol: str, expiry_date: str) -> dict:
+        return await self._get("/historical/contracts", {
+            "exchange": exchange,
+            "underlying_symbol": underlying_symbol,
+            "expiry_date": expiry_date,
+        })
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class SyncClientView:
+    """
+    Blocking facade over an AsyncGrowwClient whose event loop runs elsewhere.
+    Lets TrendModule, EntryModule, PositionModule, etc. use the async client
+    unchanged from worker threads. Never call it from the loop's own thread.
+    """
+
+    def __init__(self, async_client: AsyncGrowwClient, loop: asyncio.AbstractEventLoop):
+        self.async_client = async_client
+        self.loop = loop
+
+    def __getattr__(self, name):
+        if name in METHODS:
+            method = getattr(self.async_client, name)
+
+            def call(*args, **kwargs):
+                future = asyncio.run_coroutine_threadsafe(method(*args, **kwargs), self.loop)
+                return future.result()
+
+            return call
+        return getattr(self.async_client, name)
@@ -0,0 +1,176 @@
+"""
+async_engine.py - Asyncio orchestration.
+Responsibility: Run the main loop on an event loop with AsyncGrowwClient, awaiting
+each index's pipeline concurrently. Same modules and rules as main_engine.
+No strategy logic. No risk calculation. No logging logic.
+"""
+
+import asyncio
+import datetime
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from trend_module import TrendModule
+from entry_module import EntryModule
+from risk_module import RiskModule
+from position_module import PositionModule
+from logger_module import LoggerModule
+from tradestore_module import TradeStore
+from candlestore_module import CandleStore
+from sharedcandle_module import SharedCandleWriter
+from snapshot_module import SnapshotModule
+from chain_module import ChainModule
+from async_client_module import AsyncGrowwClient, SyncClientView
+from metrics_module import stage
+from scheduler_module import BarScheduler
+from main_engine import (
+    get_api_token,
+    get_ist_now_naive,
+    is_market_hours,
+    is_daily_reset_time,
+    bar_closes,
+    scan_index,
+    open_from_signals,
+    export_metrics,
+    start_price_feed,
+    wrap_client,
+)
+
+
+async def scan_entries_async(snapshot, trend_module, entry_module, chain_module,
+                             risk_module, position_module, strike_pool, scheduler=None):
+    """
+    Await every tradeable index's pipeline concurrently, then merge on the
+    loop thread in INDEX_LIST order before any risk/position change.
+    """
+    bias_bar, entry_bar = bar_closes(scheduler)
+    indices = [idx for idx in config.INDEX_LIST if risk_module.can_trade(idx)]
+
+    results = await asyncio.gather(
+        *(
+            asyncio.to_thread(scan_index, index_symbol, snapshot, trend_module,
+                              entry_module, chain_module, strike_pool, bias_bar, entry_bar)
+            for index_symbol in indices
+        ),
+        return_exceptions=True,
+    )
+
+    for index_symbol, signals in zip(indices, results):
+        if isinstance(signals, Exception):
+            print(f"  Scan error for {index_symbol}: {signals}")
+            continue
+
+        # Limits may have changed from trades opened earlier in this cycle
+        if signals and risk_module.can_trade(index_symbol):
+            open_from_signals(index_symbol, signals, risk_module, position_module)
+
+
+async def async_main():
+    print("=====================================")
+    print("Paper Bot v1.0 - Hybrid MTF Engine (async)")
+    print("=====================================")
+
+    token = get_api_token()
+
+    # Pooled async client; the sync modules see it through a blocking view
+    async_client = AsyncGrowwClient(token)
+    groww = wrap_client(SyncClientView(async_client, asyncio.get_running_loop()))
+    if config.METRICS_ENABLED and hasattr(signal, "SIGUSR1"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, export_metrics)
+
+    # Initialize Modules
+    candle_store = CandleStore(config.CANDLE_STORE_DIR, get_ist_now_naive) if config.CANDLE_STORE_DIR else None
+    shared_candles = SharedCandleWriter() if config.SHARED_CANDLE_PREFIX else None
+    trend_module = TrendModule(groww, candle_store, shared_candles, get_ist_now_naive)
+    entry_module = EntryModule(groww, candle_store, shared_candles, get_ist_now_naive)
+    position_module = PositionModule(clock=get_ist_now_naive)
+    risk_module = RiskModule(position_module)
+    logger = TradeStore() if config.LOG_BACKEND == "columnar" else LoggerModule()
+    if candle_store is not None:
+        candle_store.prune()
+    snapshot_module = SnapshotModule(groww)
+    chain_module = ChainModule(groww)
+    strike_pool = ThreadPoolExecutor(max_workers=config.STRIKE_WORKERS)
+    scheduler = BarScheduler(get_ist_now_naive) if config.BAR_CLOSE_SCHEDULING else None
+    feed = start_price_feed(groww, position_module, risk_module, logger)
+
+    print("Initial Capital:", risk_module.capital)
+    print("Monitoring indices:", config.INDEX_LIST)
+    print("-------------------------------------\n")
+
+    daily_reset_done = False
+
+    try:
+        while True:
+            try:
+                # Check market hours
+                if not is_market_hours():
+                    print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Outside market hours. Waiting...")
+                    await asyncio.sleep(60)
+                    daily_reset_done = False
+                    continue
+
+                # Daily reset logic (once at market open)
+                if is_daily_reset_time() and not daily_reset_done:
+                    risk_module.reset_daily()
+                    chain_module.clear()
+                    if candle_store is not None:
+                        candle_store.prune()
+                    daily_reset_done = True
+
+                with stage("cycle"):
+                    # One market snapshot per cycle: every decision below reads from it
+                    with stage("snapshot"):
+                        # Option LTPs only when positions are managed here, not by the feed
+                        snapshot = await asyncio.to_thread(snapshot_module.take, config.INDEX_LIST,
+                                                           position_module if feed is None else None)
+
+                    # Manage open trades every cycle (unless the feed does it per tick)
+                    if feed is None:
+                        with stage("manage"):
+                            await asyncio.to_thread(position_module.manage_positions, groww, risk_module,
+                                                    logger, snapshot.option_ltps)
+
+                    # Scan for entries
+                    with stage("scan"):
+                        await scan_entries_async(snapshot, trend_module, entry_module, chain_module,
+                                                 risk_module, position_module, strike_pool, scheduler)
+
+                # Status update
+                print(f"\nCapital: {risk_module.capital:.2f}")
+                print(f"Open Positions: {len(position_module.open_positions)}")
+                print(f"Daily Trades: {risk_module.daily_trades}")
+                print(f"Daily Drawdown: {risk_module.get_daily_drawdown_pct():.2%}")
+                print("-------------------------------------\n")
+
+            except Exception as e:
+                print(f"\n[Engine] Unexpected error: {e}")
+                import traceback
+                traceback.print_exc()
+
+            await asyncio.sleep(config.LOOP_SLEEP_SECONDS)
+
+    finally:
+        if feed is not None:
+            await asyncio.to_thread(feed.stop)
+        strike_pool.shutdown(wait=False)
+        await async_client.close()
+        if shared_candles is not None:
+            shared_candles.close()
+        print(f"Final Capital: {risk_module.capital:.2f}")
+        print(f"Total Logged Trades: {logger.get_trade_count()}")
+        logger.close()
+        if config.METRICS_ENABLED:
+            export_metrics()
+
+
+def main():
+    try:
+        asyncio.run(async_main())
+    except KeyboardInterrupt:
+        print("\n\nBot stopped by user.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""
+backtest_engine.py - Historical replay of the strategy.
+Responsibility: Replay stored 1H index and 15M option candles through the live rules:
+EMA bias, the 4 entry conditions (as NumPy columns), RiskModule sizing/limits and
+PositionModule breakeven/trail/target/stop. Trades go to a LoggerModule CSV.
+No new strategy logic.
+
+Data layout:  DATA_DIR/1hour/NSE_NIFTY.csv, DATA_DIR/15minute/NSE-NIFTY-24Feb26-25600-CE.csv
+              (BIAS_BASE_INTERVAL set: DATA_DIR/15minute/NSE_NIFTY.csv, resampled to 1H)
+              DATA_DIR/15minute/NSE_NIFTY.csv, if present, prices the ATM strike at
+              each 15M bar close; without it the last closed 1H close is used.
+CSV columns:  timestamp,open,high,low,close,volume  (ISO timestamp or epoch seconds)
+
+Usage: python backtest_engine.py DATA_DIR [--out backtest_trades.csv]
+       python backtest_engine.py CANDLE_STORE_DIR --store   (the live bot's candle store)
+"""
+
+import argparse
+import contextlib
+import csv
+import datetime
+import os
+from collections import defaultdict
+
+import numpy as np
+
+import config
+import vector_module
+from candle_module import candle_time
+from candlestore_module import CandleStore
+from resample_module import resample
+from chain_module import OptionChain
+from risk_module import RiskModule
+from position_module import PositionModule
+from logger_module import LoggerModule
+from scheduler_module import INTERVAL_MINUTES, last_bar_close, session_bounds
+from main_engine import select_strikes, open_from_signals
+
+
+def load_candles_csv(path: str) -> list:
+    """Read a candle CSV into [timestamp, open, high, low, close, volume] rows."""
+    candles = []
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)  # skip header
+        for row in reader:
+            ts = row[0]
+            if ts.replace(".", "", 1).isdigit():
+                ts = float(ts)
+            candles.append([ts] + [float(v) if v else 0.0 for v in row[1:6]])
+    return candles
+
+
+def _split_series(load, cfg=config):
+    """
+    (index_candles, option_candles, index_prices) from load(interval) -> {symbol: candles}.
+    With BIAS_BASE_INTERVAL, index bars are resampled from that interval's
+    index series (INDEX_LIST symbols) instead of read at BIAS_INTERVAL.
+    index_prices: index bars at ENTRY_INTERVAL (resampled from BIAS_BASE_INTERVAL
+    when that is finer), for the ATM price at each entry bar close.
+    """
+    entry_series = load(cfg.ENTRY_INTERVAL)
+    option_candles = {
+        symbol: candles
+        for symbol, candles in entry_series.items()
+        if symbol not in cfg.INDEX_LIST
+    }
+    index_prices = {
+        symbol: candles
+        for symbol, candles in entry_series.items()
+        if symbol in cfg.INDEX_LIST
+    }
+    if not cfg.BIAS_BASE_INTERVAL:
+        return load(cfg.BIAS_INTERVAL), option_candles, index_prices
+
+    base = {
+        symbol: candles
+        for symbol, candles in load(cfg.BIAS_BASE_INTERVAL).items()
+        if symbol in cfg.INDEX_LIST
+    }
+    minutes = INTERVAL_MINUTES[cfg.BIAS_INTERVAL]
+    index_candles = {symbol: resample(candles, minutes) for symbol, candles in base.items()}
+    entry_minutes = INTERVAL_MINUTES[cfg.ENTRY_INTERVAL]
+    if INTERVAL_MINUTES[cfg.BIAS_BASE_INTERVAL] < entry_minutes:
+        for symbol, candles in base.items():
+            index_prices.setdefault(symbol, resample(candles, entry_minutes))
+    return index_candles, option_candles, index_prices
+
+
+def load_candle_dir(data_dir: str, cfg=config):
+    """
+    Load DATA_DIR/<BIAS_INTERVAL>/*.csv and DATA_DIR/<ENTRY_INTERVAL>/*.csv
+    (index bars from DATA_DIR/<BIAS_BASE_INTERVAL> when set).
+    Returns (index_candles, option_candles, index_prices) keyed by symbol / contract.
+    """
+    def load(interval):
+        folder = os.path.join(data_dir, interval)
+        if not os.path.isdir(folder):
+            return {}
+        return {
+            name[:-4]: load_candles_csv(os.path.join(folder, name))
+            for name in sorted(os.listdir(folder))
+            if name.endswith(".csv")
+        }
+
+    return _split_series(load, cfg)
+
+
+def load_candle_store(store_dir: str, cfg=config):
+    """
+    Load the BIAS_INTERVAL and ENTRY_INTERVAL series of a CandleStore
+    (index bars resampled from BIAS_BASE_INTERVAL when set).
+    Returns (index_candles, option_candles, index_prices) like load_candle_dir.
+    """
+    store = CandleStore(store_dir)
+
+    def load(interval):
+        series = {}
+        for symbol in store.symbols(interval):
+            candles = store.read_candles(interval, symbol)
+            for c in candles:
+                if c[5] is None:
+                    c[5] = 0.0
+            series[symbol] = candles
+        return series
+
+    return _split_series(load, cfg)
+
+
+class StoredChains:
+    """ChainModule stand-in built from the contracts present in the data."""
+
+    def __init__(self, contracts):
+        by_expiry = defaultdict(list)
+        for contract in contracts:
+            # Contract: NSE-NIFTY-24Feb26-25600-CE
+            parts = contract.split("-")
+            if len(parts) != 5:
+                continue
+            try:
+                expiry = datetime.datetime.strptime(parts[2], "%d%b%y").strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+            by_expiry[(parts[1], expiry)].append(contract)
+
+        self._chains = {
+            key: OptionChain(key[0], key[1], names) for key, names in by_expiry.items()
+        }
+        self._expiries = defaultdict(list)
+        for underlying, expiry in sorted(self._chains):
+            self._expiries[underlying].append(expiry)
+
+    def get_expiries(self, underlying: str) -> list:
+        return self._expiries.get(underlying, [])
+
+    def get_chain(self, underlying: str, expiry: str):
+        return self._chains.get((underlying, expiry))
+
+
+def _bar_close_times(starts: list, minutes: int) -> list:
+    """Close time of each bar: start + interval, cut at the session close."""
+    closes = []
+    for start in starts:
+        _, session_close = session_bounds(start)
+        closes.append(min(start + datetime.timedelta(minutes=minutes), session_close))
+    return closes
+
+
+def _window_starts(keys: np.ndarray, close_times: np.ndarray, lookback_days: int, cfg) -> np.ndarray:
+    """
+    Index of the first bar of each bar's live lookback window: a cycle at
+    close + BAR_SETTLE_SECONDS keeps the bars whose key (bar start, or the
+    start of its last base bar) is within lookback_days (see CandleCache).
+    """
+    cutoff = close_times + np.timedelta64(int(cfg.BAR_SETTLE_SECONDS), "s") - np.timedelta64(lookback_days, "D")
+    return np.searchsorted(keys, cutoff, side="left")
+
+
+def _trailing_windows(first: np.ndarray, min_bars: int):
+    """
+    Bars grouped by the length of their window first[j]..j. Yields
+    (bars, positions): the bar indices of one group and the
+    (len(bars) x length) indices of their windows. Windows shorter than
+    min_bars are skipped.
+    """
+    length = np.arange(len(first)) - first + 1
+    for size in np.unique(length[length >= min_bars]):
+        bars = np.flatnonzero(length == size)
+        yield bars, (bars - size + 1)[:, None] + np.arange(size)
+
+
+class Backtester:
+    def __init__(self, index_candles: dict, option_candles: dict, cfg=config, index_prices: dict = None):
+        self.cfg = cfg  # config module or an isolated copy (sweeps)
+        self.index_candles = index_candles
+        self.option_candles = option_candles
+        self.index_prices = index_prices or {}
+        self.chains = StoredChains(option_candles)
+        self._prepare_trend()
+        self._prepare_prices()
+        self._prepare_entries()
+
+    def _prepare_trend(self):
+        """
+        Trend per index after each 1H bar, as TrendModule sees it at that bar's
+        close: EMA fast/slow seeded at the start of the BIAS_LOOKBACK_DAYS window.
+        """
+        self._trend = {}
+        minutes = INTERVAL_MINUTES[self.cfg.BIAS_INTERVAL]
+        for index_symbol, candles in self.index_candles.items():
+            starts = np.array([candle_time(c) for c in candles], dtype="datetime64[s]")
+            closes = np.array([float(c[4]) for c in candles])
+            close_times = np.array(_bar_close_times(starts.tolist(), minutes), dtype="datetime64[s]")
+            keys = starts
+            if self.cfg.BIAS_BASE_INTERVAL:
+                # Live windows cut the base bars; a partly kept 1H bar still has its close
+                base = np.timedelta64(INTERVAL_MINUTES[self.cfg.BIAS_BASE_INTERVAL], "m")
+                keys = close_times - base
+            first = _window_starts(keys, close_times, self.cfg.BIAS_LOOKBACK_DAYS, self.cfg)
+
+            ema_fast = np.full(len(closes), np.nan)
+            ema_slow = np.full(len(closes), np.nan)
+            for bars, positions in _trailing_windows(first, self.cfg.EMA_SLOW):
+                ema_fast[bars] = vector_module.ema(closes[positions], self.cfg.EMA_FAST)[:, -1]
+                ema_slow[bars] = vector_module.ema(closes[positions], self.cfg.EMA_SLOW)[:, -1]
+            trend = np.full(len(closes), None, dtype=object)
+            with np.errstate(invalid="ignore"):
+                trend[ema_fast > ema_slow] = "UP"
+                trend[ema_fast < ema_slow] = "DOWN"
+            self._trend[index_symbol] = (starts, closes, trend)
+
+    def _prepare_prices(self):
+        """Close time and close columns per index on ENTRY_INTERVAL bars (index_prices)."""
+        self._prices = {}
+        minutes = INTERVAL_MINUTES[self.cfg.ENTRY_INTERVAL]
+        for index_symbol, candles in self.index_prices.items():
+            if not candles:
+                continue
+            starts = [candle_time(c) for c in candles]
+            close_times = np.array(_bar_close_times(starts, minutes), dtype="datetime64[s]")
+            closes = np.array([float(c[4]) for c in candles])
+            self._prices[index_symbol] = (close_times, closes)
+
+    def _prepare_entries(self):
+        """
+        Entry signal columns per contract, and an event table
+        bar close time -> [(contract, bar index)].
+        Bar j is evaluated as EntryModule.check_entry does at its close: over
+        the bars of the ENTRY_LOOKBACK_DAYS window up to j. Windows of equal
+        length (any contract) are evaluated in one entry_current pass.
+        """
+        self._entries = {}
+        self._bar_index = {}
+        self._events = defaultdict(list)
+        minutes = INTERVAL_MINUTES[self.cfg.ENTRY_INTERVAL]
+
+        series = []  # (contract, offset, bar count)
+        arrays, firsts, calls = [], [], []
+        offset = 0
+        for contract, candles in self.option_candles.items():
+            if not candles:
+                continue
+            starts = [candle_time(c) for c in candles]
+            close_times = _bar_close_times(starts, minutes)
+            bar_index = {}
+            for j, close_time in enumerate(close_times):
+                bar_index[close_time] = j
+                self._events[close_time].append((contract, j))
+            self._bar_index[contract] = bar_index
+
+            first = _window_starts(np.array(starts, dtype="datetime64[s]"),
+                                   np.array(close_times, dtype="datetime64[s]"),
+                                   self.cfg.ENTRY_LOOKBACK_DAYS, self.cfg)
+            arrays.append(np.nan_to_num(np.array([c[1:6] for c in candles], dtype=float)))  # missing volume -> 0.0
+            firsts.append(first + offset)
+            calls.append(np.full(len(candles), contract.rsplit("-", 1)[-1] == "CE"))
+            series.append((contract, offset, len(candles)))
+            offset += len(candles)
+        if not series:
+            return
+
+        bars = np.concatenate(arrays)
+        first = np.concatenate(firsts)
+        calls = np.concatenate(calls)
+        signal = np.zeros(len(bars), dtype=bool)
+        atr = np.full(len(bars), np.nan)
+        rsi = np.full(len(bars), np.nan)
+        min_candles = max(
+            self.cfg.BREAKOUT_LOOKBACK + 1,
+            self.cfg.VOLUME_AVG_PERIOD + 1,
+            self.cfg.ATR_PERIOD + 1,
+            self.cfg.RSI_PERIOD + 1,
+        )
+        for group, positions in _trailing_windows(first, min_candles):
+            for opt_type, is_call in (("CE", True), ("PE", False)):
+                rows = calls[group] == is_call
+                if not rows.any():
+                    continue
+                block = bars[positions[rows]]
+                current = vector_module.entry_current(
+                    block[..., 1], block[..., 2], block[..., 3], block[..., 4], opt_type, self.cfg,
+                )
+                signal[group[rows]] = current["signal"]
+                atr[group[rows]] = current["atr"]
+                rsi[group[rows]] = current["rsi"]
+
+        for contract, start, count in series:
+            window = slice(start, start + count)
+            self._entries[contract] = {
+                "signal": signal[window],
+                "close": bars[window, 3],
+                "low": bars[window, 2],
+                "atr": atr[window],
+                "rsi": rsi[window],
+            }
+
+    def _trend_at(self, index_symbol: str, now: datetime.datetime):
+        """(trend, index close) from 1H bars closed by now, like the live scheduler."""
+        if index_symbol not in self._trend:
+            return None, None
+        starts, closes, trend = self._trend[index_symbol]
+        bias_bar = np.datetime64(last_bar_close(now, INTERVAL_MINUTES[self.cfg.BIAS_INTERVAL]), "s")
+        closed = int(np.searchsorted(starts, bias_bar, side="left"))
+        if not closed:
+            return None, None
+        return trend[closed - 1], float(closes[closed - 1])
+
+    def _index_price(self, index_symbol: str, now: datetime.datetime, fallback: float) -> float:
+        """
+        Index close of the last ENTRY_INTERVAL bar closed by now, the price a
+        live cycle at now would see; fallback if there is no such bar.
+        """
+        if index_symbol not in self._prices:
+            return fallback
+        close_times, closes = self._prices[index_symbol]
+        closed = int(np.searchsorted(close_times, np.datetime64(now, "s"), side="right"))
+        return float(closes[closed - 1]) if closed else fallback
+
+    def _signals(self, chain, selected_strikes: list, opt_type: str, now: datetime.datetime) -> list:
+        """Entry signals on bars closing at `now`, in strike order."""
+        signals = []
+        for strike in selected_strikes:
+            contract = chain.contract(strike, opt_type)
+            if contract is None:
+                continue
+            j = self._bar_index.get(contract, {}).get(now)
+            if j is None:
+                continue
+            columns = self._entries[contract]
+            if columns["signal"][j]:
+                signals.append((contract, {
+                    "close": float(columns["close"][j]),
+                    "low": float(columns["low"][j]),
+                    "ATR": float(columns["atr"][j]),
+                    "RSI": float(columns["rsi"][j]),
+                }))
+        return signals
+
+    def run(self, log_file: str = None, verbose: bool = False) -> dict:
+        """
+        Replay every 15M bar close in time order. Each step mirrors one live
+        cycle: manage positions at bar closes, then scan for entries.
+        Returns summary stats; trades are written to log_file (overwritten) if given.
+        """
+        if log_file and os.path.exists(log_file):
+            os.remove(log_file)
+
+        position_module = PositionModule(self.cfg)
+        risk_module = RiskModule(position_module, self.cfg)
+        logger = BacktestLogger(log_file, self.cfg.INITIAL_CAPITAL)
+
+        with contextlib.ExitStack() as stack:
+            if not verbose:
+                devnull = stack.enter_context(open(os.devnull, "w"))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+
+            current_day = None
+            for now in sorted(self._events):
+                # Daily reset at the first bar of each day
+                if now.date() != current_day:
+                    current_day = now.date()
+                    risk_module.reset_daily()
+
+                # Manage open trades on this bar's closes
+                ltps = {
+                    contract: float(self._entries[contract]["close"][j])
+                    for contract, j in self._events[now]
+                }
+                position_module.manage_positions(None, risk_module, logger, ltps)
+
+                # Scan for entries
+                for index_symbol in self.cfg.INDEX_LIST:
+                    if not risk_module.can_trade(index_symbol):
+                        continue
+                    trend, index_price = self._trend_at(index_symbol, now)
+                    if trend is None:
+                        continue
+                    index_price = self._index_price(index_symbol, now, index_price)
+                    chain, selected_strikes = select_strikes(index_symbol, index_price, self.chains,
+                                                             now, self.cfg)
+                    if chain is None:
+                        continue
+                    opt_type = "CE" if trend == "UP" else "PE"
+                    signals = self._signals(chain, selected_strikes, opt_type, now)
+                    if signals:
+                        open_from_signals(index_symbol, signals, risk_module, position_module,
+                                          now.strftime("%Y-%m-%d %H:%M"))
+
+        logger.close()
+        return logger.summary(risk_module.capital)
+
+
+class BacktestLogger:
+    """LoggerModule-compatible sink that also keeps PnLs for the summary."""
+
+    def __init__(self, log_file: str = None, initial_capital: float = config.INITIAL_CAPITAL):
+        self.csv_logger = LoggerModule(log_file) if log_file else None
+        self.initial_capital = initial_capital
+        self.pnls = []
+
+    def log_trade(self, **trade):
+        self.pnls.append(trade["pnl"])
+        if self.csv_logger is not None:
+            self.csv_logger.log_trade(**trade)
+
+    def get_trade_count(self) -> int:
+        return len(self.pnls)
+
+    def close(self):
+        if self.csv_logger is not None:
+            self.csv_logger.close()
+
+    def summary(self, final_capital: float) -> dict:
+        pnls = np.array(self.pnls, dtype=float)
+        equity = self.initial_capital + np.cumsum(pnls)
+        peak = np.maximum.accumulate(np.concatenate([[self.initial_capital], equity]))
+        drawdown = (peak[1:] - equity) / peak[1:] if len(pnls) else np.zeros(0)
+        return {
+            "trades": int(len(pnls)),
+            "net_pnl": float(pnls.sum()),
+            "win_rate": float((pnls > 0).mean()) if len(pnls) else 0.0,
+            "max_drawdown_pct": float(drawdown.max()) if len(pnls) else 0.0,
+            "final_capital": float(final_capital),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay stored candles through the strategy.")
+    parser.add_argument("data_dir", help="Directory with <interval>/<symbol>.csv candle files")
+    parser.add_argument("--store", action="store_true", help="data_dir is a CandleStore directory")
+    parser.add_argument("--out", default="backtest_trades.csv", help="Trade log CSV (LoggerModule schema)")
+    parser.add_argument("--verbose", action="store_true", help="Print the live modules' output")
+    args = parser.parse_args()
+
+    load = load_candle_store if args.store else load_candle_dir
+    index_candles, option_candles, index_prices = load(args.data_dir)
+    print(f"Loaded {len(index_candles)} index series, {len(option_candles)} option series, "
+          f"{len(index_prices)} {config.ENTRY_INTERVAL} index series")
+
+    summary = Backtester(index_candles, option_candles, index_prices=index_prices).run(args.out, args.verbose)
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
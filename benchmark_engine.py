@@ -0,0 +1,378 @@
+"""
+benchmark_engine.py - Performance benchmarks.
+Responsibility: Time the indicator helpers, entry checks, position management and
+one full main-loop cycle against a synthetic in-process API, at the live sizes and
+well beyond. Results go to JSON; a stored baseline can be compared for regressions.
+No strategy logic.
+
+Usage:
+    python benchmark_engine.py [--out bench.json] [--only NAME]
+    python benchmark_engine.py --compare baseline.json [--threshold 0.10]
+"""
+
+import argparse
+import bisect
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+
+from growwapi import GrowwAPI
+
+import config
+from trend_module import TrendModule
+from entry_module import EntryModule
+from risk_module import RiskModule
+from position_module import PositionModule
+from snapshot_module import SnapshotModule
+from chain_module import ChainModule
+from main_engine import scan_entries
+
+# Bars per series (30/60 are the live ENTRY/BIAS_CANDLE_COUNT)
+BAR_SIZES = [30, 60, 500, 2000, 5000]
+
+# Contracts per entry check (strike window x CE/PE), at ENTRY_WINDOW_BARS bars each
+STRIKE_WINDOW_SIZES = [10, 40, 400]
+ENTRY_WINDOW_BARS = 125        # ~5 trading days of 15M bars
+
+# Open positions managed per cycle
+POSITION_SIZES = [3, 15, 100, 500]
+
+# (indices, strikes each side of ATM) per cycle: 3 x 5 is the live setup
+CYCLE_SIZES = [(3, 2), (10, 5), (30, 10)]
+
+REPEAT = 5                 # Timed repeats per benchmark (min/median reported)
+MIN_REPEAT_SECONDS = 0.05  # Calls per repeat are scaled up to at least this long
+
+INDEX_LTP = 25000.0
+STRIKE_STEP = 50
+
+
+class SyntheticGroww:
+    """
+    Deterministic stand-in for GrowwAPI. Every symbol gets a seeded random-walk
+    candle series of `bars` bars ending now; requests return the part inside
+    the asked window. LTPs are the last close. GrowwAPI constants are attributes.
+    """
+
+    def __init__(self, bars: int = 500, seed: int = 1, strike_count: int = 201):
+        self.bars = bars
+        self.seed = seed
+        self.strike_count = strike_count
+        self._series = {}  # (symbol, interval) -> (bar starts, candles)
+
+    def __getattr__(self, name):
+        if name.isupper():
+            return getattr(GrowwAPI, name)
+        raise AttributeError(name)
+
+    def _candles(self, symbol: str, interval: str):
+        key = (symbol, interval)
+        if key not in self._series:
+            minutes = 60 if interval == GrowwAPI.CANDLE_INTERVAL_HOUR_1 else 15
+            step = datetime.timedelta(minutes=minutes)
+            now = datetime.datetime.now().replace(second=0, microsecond=0)
+            start = now - now.minute % minutes * datetime.timedelta(minutes=1) - step * (self.bars - 1)
+
+            rng = random.Random(f"{self.seed}:{symbol}:{interval}")
+            price = INDEX_LTP if interval == GrowwAPI.CANDLE_INTERVAL_HOUR_1 else 100.0
+            starts, candles = [], []
+            for i in range(self.bars):
+                t = start + step * i
+                open_ = price
+                price = max(1.0, price * (1 + rng.gauss(0, 0.01)))
+                candles.append([
+                    t.strftime("%Y-%m-%dT%H:%M:%S"),
+                    open_,
+                    max(open_, price) * 1.002,
+                    min(open_, price) * 0.998,
+                    price,
+                    rng.randint(100, 1000),
+                ])
+                starts.append(t)
+            self._series[key] = (starts, candles)
+        return self._series[key]
+
+    def get_historical_candles(self, exchange, segment, groww_symbol, start_time, end_time,
+                               candle_interval, timeout=None):
+        starts, candles = self._candles(groww_symbol, candle_interval)
+        lo = bisect.bisect_left(starts, datetime.datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S"))
+        hi = bisect.bisect_right(starts, datetime.datetime.strptime(end_time, "%Y-%m-%d %H:%M:%S"))
+        return {"candles": candles[lo:hi]}
+
+    def get_ltp(self, exchange_trading_symbols, segment, timeout=None):
+        price = INDEX_LTP if segment == GrowwAPI.SEGMENT_CASH else 100.0
+        return {symbol: price for symbol in exchange_trading_symbols}
+
+    def get_quote(self, trading_symbol, exchange, segment, timeout=None):
+        return {"ltp": 100.0}
+
+    def get_expiries(self, exchange, underlying_symbol, year=None, month=None, timeout=None):
+        today = datetime.date.today()
+        return {"expiries": [(today + datetime.timedelta(days=d)).isoformat() for d in (3, 10, 38)]}
+
+    def get_contracts(self, exchange, underlying_symbol, expiry_date, timeout=None):
+        expiry = datetime.datetime.strptime(expiry_date, "%Y-%m-%d").strftime("%d%b%y")
+        low = int(INDEX_LTP) - STRIKE_STEP * (self.strike_count // 2)
+        return {"contracts": [
+            f"NSE-{underlying_symbol}-{expiry}-{low + STRIKE_STEP * i}-{opt}"
+            for i in range(self.strike_count)
+            for opt in ("CE", "PE")
+        ]}
+
+
+def _lookback_days(bars: int, minutes: int) -> int:
+    """Days of lookback that cover `bars` continuous bars."""
+    return bars * minutes // (24 * 60) + 2
+
+
+def _measure(func) -> dict:
+    """Seconds per call: min and median over REPEAT timed repeats."""
+    timer = timeit.Timer(func)
+    elapsed = timer.timeit(number=1)  # also warms up
+    number = max(1, int(MIN_REPEAT_SECONDS / max(elapsed, 1e-9)))
+    runs = [t / number for t in timer.repeat(repeat=REPEAT, number=number)]
+    return {"min": min(runs), "median": statistics.median(runs), "number": number}
+
+
+@contextlib.contextmanager
+def _quiet():
+    """The modules print per call; keep that out of the timings."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+@contextlib.contextmanager
+def _universe(index_count: int, strike_range: int):
+    """Temporarily widen config to index_count synthetic indices."""
+    names = ("INDEX_LIST", "UNDERLYING_MAP", "GROWW_SYMBOL_MAP", "LOT_SIZE", "ATM_STRIKE_RANGE")
+    saved = {name: getattr(config, name) for name in names}
+    indices = [f"NSE_BENCH{i}" for i in range(index_count)]
+    config.INDEX_LIST = indices
+    config.UNDERLYING_MAP = {idx: idx[4:] for idx in indices}
+    config.GROWW_SYMBOL_MAP = {idx: idx.replace("_", "-") for idx in indices}
+    config.LOT_SIZE = {idx: 50 for idx in indices}
+    config.ATM_STRIKE_RANGE = strike_range
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def bench_indicators(results: dict):
+    """TrendModule._ema, EntryModule ATR/RSI/parse helpers per series length."""
+    groww = SyntheticGroww(bars=max(BAR_SIZES))
+    entry_module = EntryModule(groww)
+    _, all_candles = groww._candles("NSE-BENCH-OPT", GrowwAPI.CANDLE_INTERVAL_MIN_15)
+
+    for bars in BAR_SIZES:
+        candles = all_candles[-bars:]
+        parsed = entry_module._parse_candles(candles)
+        highs, lows, closes = parsed["highs"], parsed["lows"], parsed["closes"]
+
+        results[f"ema[bars={bars}]"] = _measure(
+            lambda: TrendModule._ema(closes, config.EMA_SLOW))
+        results[f"atr_series[bars={bars}]"] = _measure(
+            lambda: EntryModule._calculate_atr_series(highs, lows, closes, config.ATR_PERIOD))
+        results[f"rsi[bars={bars}]"] = _measure(
+            lambda: EntryModule._calculate_rsi(closes, config.RSI_PERIOD))
+        results[f"parse_candles[bars={bars}]"] = _measure(
+            lambda: entry_module._parse_candles(candles))
+
+
+def bench_check_entry(results: dict):
+    """check_entry cold (fresh module: fetch + full indicator build) and warm (cached)."""
+    contract = "NSE-BENCH-20Oct26-25000-CE"
+
+    for bars in BAR_SIZES:
+        groww = SyntheticGroww(bars=bars)
+        groww._candles(contract, GrowwAPI.CANDLE_INTERVAL_MIN_15)
+        days = _lookback_days(bars, 15)
+
+        def cold():
+            entry_module = EntryModule(groww)
+            entry_module.candle_cache.lookback_days = days
+            entry_module.check_entry(contract, "UP")
+
+        warm_module = EntryModule(groww)
+        warm_module.candle_cache.lookback_days = days
+
+        with _quiet():
+            warm_module.check_entry(contract, "UP")
+            results[f"check_entry_cold[bars={bars}]"] = _measure(cold)
+            results[f"check_entry_warm[bars={bars}]"] = _measure(
+                lambda: warm_module.check_entry(contract, "UP"))
+
+
+def bench_check_entry_batch(results: dict):
+    """A strike window checked per contract (check_entry) vs in one check_entry_batch."""
+    groww = SyntheticGroww(bars=ENTRY_WINDOW_BARS)
+    days = _lookback_days(ENTRY_WINDOW_BARS, 15)
+
+    for count in STRIKE_WINDOW_SIZES:
+        contracts = [
+            f"NSE-BENCH-20Oct26-{int(INDEX_LTP) + STRIKE_STEP * (i // 2)}-{('CE', 'PE')[i % 2]}"
+            for i in range(count)
+        ]
+
+        def fresh():
+            entry_module = EntryModule(groww)
+            entry_module.candle_cache.lookback_days = days
+            return entry_module
+
+        scalar_module = fresh()
+        batch_module = fresh()
+        with _quiet():
+            for contract in contracts:
+                scalar_module.check_entry(contract, "UP")
+            batch_module.check_entry_batch(contracts, "UP")
+
+            results[f"entry_window_cold[contracts={count}]"] = _measure(
+                lambda: [fresh().check_entry(c, "UP") for c in contracts])
+            results[f"entry_window_batch_cold[contracts={count}]"] = _measure(
+                lambda: fresh().check_entry_batch(contracts, "UP"))
+            results[f"entry_window_warm[contracts={count}]"] = _measure(
+                lambda: [scalar_module.check_entry(c, "UP") for c in contracts])
+            results[f"entry_window_batch_warm[contracts={count}]"] = _measure(
+                lambda: batch_module.check_entry_batch(contracts, "UP"))
+
+
+def bench_manage_positions(results: dict):
+    """manage_positions with snapshot LTPs, and with its own batched LTP fetch."""
+    groww = SyntheticGroww()
+
+    for count in POSITION_SIZES:
+        position_module = PositionModule()
+        risk_module = RiskModule(position_module)
+        for i in range(count):
+            # Stop/target far from the LTP so nothing closes between repeats
+            position_module.open_trade(
+                f"NSE-NIFTY-24Feb26-{20000 + STRIKE_STEP * i}-CE", "NSE_NIFTY",
+                100.0, 50.0, 200.0, 75, 75, 50.0,
+            )
+        ltps = {contract: 100.0 for contract in position_module.open_positions}
+
+        with _quiet():
+            results[f"manage_positions[positions={count}]"] = _measure(
+                lambda: position_module.manage_positions(groww, risk_module, None, ltps))
+            results[f"manage_positions_fetch[positions={count}]"] = _measure(
+                lambda: position_module.manage_positions(groww, risk_module, None))
+
+
+def bench_cycle(results: dict):
+    """
+    One main-loop body: snapshot, manage positions, scan entries. Cold builds
+    every module per cycle; warm keeps the candle/chain/indicator state.
+    Risk and position state start fresh each cycle so every index is scanned.
+    """
+    for index_count, strike_range in CYCLE_SIZES:
+        contracts = index_count * (2 * strike_range + 1)
+        label = f"indices={index_count},contracts={contracts}"
+
+        with _universe(index_count, strike_range), _quiet():
+            groww = SyntheticGroww(bars=max(config.BIAS_LOOKBACK_DAYS * 24, 500))
+
+            def build():
+                return (SnapshotModule(groww), TrendModule(groww), EntryModule(groww),
+                        ChainModule(groww))
+
+            def cycle(snapshot_module, trend_module, entry_module, chain_module):
+                position_module = PositionModule()
+                risk_module = RiskModule(position_module)
+                snapshot = snapshot_module.take(config.INDEX_LIST, position_module)
+                position_module.manage_positions(groww, risk_module, None, snapshot.option_ltps)
+                scan_entries(snapshot, trend_module, entry_module, chain_module,
+                             risk_module, position_module)
+
+            results[f"cycle_cold[{label}]"] = _measure(lambda: cycle(*build()))
+
+            warm = build()
+            cycle(*warm)
+            results[f"cycle_warm[{label}]"] = _measure(lambda: cycle(*warm))
+
+
+BENCHMARKS = {
+    "indicators": bench_indicators,
+    "check_entry": bench_check_entry,
+    "check_entry_batch": bench_check_entry_batch,
+    "manage_positions": bench_manage_positions,
+    "cycle": bench_cycle,
+}
+
+
+def run_benchmarks(only: str = None) -> dict:
+    """Run the suite (or the groups whose name contains `only`)."""
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        print(f"[Bench] {name}...", file=sys.stderr)
+        bench(results)
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": REPEAT,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Rows (name, baseline min, current min, ratio, regressed) for every
+    benchmark present in both runs. Regressed when slower by more than threshold.
+    The per-call minimum is compared; it is the least noisy of the statistics.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["min"] / base["min"] if base["min"] > 0 else float("inf")
+        rows.append((name, base["min"], result["min"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indicators, entry checks and engine cycles.")
+    parser.add_argument("--out", default="bench.json", help="Results JSON")
+    parser.add_argument("--only", help="Run only benchmark groups whose name contains this")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed slowdown vs baseline before flagging (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.only)
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+
+    if not args.compare:
+        for name, result in current["results"].items():
+            print(f"{name:55s} {result['median'] * 1e6:12.1f} us")
+        print(f"[Bench] {len(current['results'])} results -> {args.out}")
+        return
+
+    with open(args.compare, "r") as f:
+        baseline = json.load(f)
+
+    rows = compare(current, baseline, args.threshold)
+    for name, base, now, ratio, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:55s} {base * 1e6:12.1f} -> {now * 1e6:12.1f} us  x{ratio:5.2f} {flag}")
+
+    regressions = [row for row in rows if row[4]]
+    print(f"[Bench] {len(regressions)} regressions of {len(rows)} compared (threshold {args.threshold:.0%})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
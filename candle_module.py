@@ -0,0 +1,160 @@
+"""
+candle_module.py - Incremental candle cache.
+Responsibility: Keep fetched candle history per symbol and request only the bars
+after the last cached timestamp. No indicator logic. No trade logic.
+"""
+
+import datetime
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# NSE session time (no DST)
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+
+def ist_now() -> datetime.datetime:
+    """Current naive IST time, whatever the host timezone (default clock)."""
+    return datetime.datetime.now(IST).replace(tzinfo=None)
+
+
+def candle_time(candle) -> datetime.datetime:
+    """
+    Return the bar start time of a candle as a naive IST datetime (the
+    scheduler's clock), whatever the host timezone.
+    Handles epoch seconds (v1 format) and ISO strings (v2 format).
+    """
+    ts = candle[0]
+    if isinstance(ts, (int, float)):
+        return datetime.datetime.fromtimestamp(ts, IST).replace(tzinfo=None)
+    parsed = datetime.datetime.fromisoformat(str(ts))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(IST)
+    return parsed.replace(tzinfo=None)
+
+
+def closed_candles(candles: list, bar_close: datetime.datetime) -> list:
+    """Candles that started before bar_close (drops the forming bar, if any)."""
+    end = len(candles)
+    while end > 0 and candle_time(candles[end - 1]) >= bar_close:
+        end -= 1
+    return candles if end == len(candles) else candles[:end]
+
+
+class CandleCache:
+    """
+    With a store (CandleStore) and its interval, history survives restarts:
+    the first get() per key reads the stored window and only fetches the
+    missing head (if the window starts before anything stored) and tail.
+    Every fetched batch is written back to the store, which keeps at least
+    lookback_days of the interval (CandleStore.retain).
+    With shared (SharedCandleWriter), every batch is also published to
+    shared memory for other processes.
+    clock() gives the current naive IST time (replay time when replaying),
+    the same clock as candle_time(), so both ends of a fetch are IST.
+    """
+
+    def __init__(self, lookback_days: int, store=None, interval: str = None, shared=None,
+                 clock=None):
+        self.lookback_days = lookback_days
+        self.store = store
+        self.interval = interval
+        self.shared = shared
+        self.clock = clock or ist_now
+        self._candles = {}  # key -> list of candles, oldest first
+        if store is not None:
+            store.retain(interval, lookback_days)
+
+    def get(self, key: str, fetch):
+        """
+        Return the full cached history for key, refreshed with new bars.
+        fetch(start_str, end_str) must return a list of candles.
+
+        The first call fetches the whole lookback window. Later calls fetch
+        from the start of the last cached bar, so the still-forming bar is
+        replaced and any newer bars are appended. Bars older than the
+        lookback window are dropped.
+        """
+        now = self.clock()
+        window_start = now - datetime.timedelta(days=self.lookback_days)
+        cached = self._candles.get(key)
+        if cached is None and self.store is not None:
+            cached = self._load(key, window_start, fetch)
+            if cached and self.shared is not None:
+                self.shared.write(self.interval, key, cached)
+
+        if cached:
+            start = candle_time(cached[-1])
+        else:
+            start = window_start
+
+        new_candles = fetch(start.strftime(TIME_FORMAT), now.strftime(TIME_FORMAT))
+        if self.store is not None:
+            self.store.write(self.interval, key, new_candles,
+                             covered_from=None if cached else window_start)
+        if self.shared is not None:
+            self.shared.write(self.interval, key, new_candles)
+
+        if not cached:
+            if new_candles:
+                self._candles[key] = list(new_candles)
+            return self._candles.get(key, [])
+
+        if new_candles:
+            self._merge(cached, new_candles)
+        self._trim(cached, window_start)
+        return cached
+
+    def _load(self, key: str, window_start: datetime.datetime, fetch):
+        """
+        Stored bars from window_start on, plus a fetch of the head if the
+        store has never covered the start of the window. None if nothing stored.
+        """
+        stored = self.store.read_candles(self.interval, key, start=window_start)
+        if not stored:
+            return None
+
+        covered = self.store.covered_from(self.interval, key)
+        if covered is None or covered > window_start:
+            first = candle_time(stored[0])
+            head_end = first - datetime.timedelta(seconds=1)
+            head = fetch(window_start.strftime(TIME_FORMAT), head_end.strftime(TIME_FORMAT))
+            head = [c for c in head if candle_time(c) < first]
+            self.store.write(self.interval, key, head, covered_from=window_start)
+            stored = head + stored
+
+        self._candles[key] = stored
+        return stored
+
+    def peek(self, key: str):
+        """Return cached history for key without fetching (empty if none)."""
+        return self._candles.get(key, [])
+
+    def clear(self, key: str = None):
+        """Drop cached history for key, or for all keys."""
+        if key is None:
+            self._candles.clear()
+        else:
+            self._candles.pop(key, None)
+
+    @staticmethod
+    def _trim(cached: list, window_start: datetime.datetime):
+        """
+        Drop bars that started before window_start, so history stays the
+        lookback window (indicator states rebuild when the first bar changes).
+        """
+        cut = 0
+        while cut < len(cached) and candle_time(cached[cut]) < window_start:
+            cut += 1
+        if cut:
+            del cached[:cut]
+
+    @staticmethod
+    def _merge(cached: list, new_candles: list):
+        """Replace cached bars at or after the first new bar, then append."""
+        first_new = candle_time(new_candles[0])
+        cut = len(cached)
+        while cut > 0 and candle_time(cached[cut - 1]) >= first_new:
+            cut -= 1
+        del cached[cut:]
+        cached.extend(new_candles)
+
@@ -0,0 +1,209 @@
+"""
+candlestore_module.py - Persistent candle store.
+Responsibility: Keep candle history on disk per (symbol, interval) as fixed-size
+binary records, so a restart reads history locally and only asks the API for what
+is missing. Also the data source for offline analysis. Bars older than the
+lookback of the caches using the store (plus CANDLE_STORE_KEEP_DAYS) are pruned.
+No indicator logic. No trade logic.
+
+Layout:
+    STORE_DIR/index.json                covered-from time per (interval, symbol)
+    STORE_DIR/<interval>/<symbol>.bin   RECORD rows, oldest first
+"""
+
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+
+import config
+from candle_module import candle_time, ist_now
+
+# One bar. time is the naive IST bar start; volume NaN = missing.
+RECORD = np.dtype([
+    ("time", "<M8[s]"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+_INDEX_FILE = "index.json"
+
+
+def to_records(candles: list) -> np.ndarray:
+    """API candles ([ts, o, h, l, c, v, ...]) -> RECORD array."""
+    records = np.zeros(len(candles), dtype=RECORD)
+    for i, c in enumerate(candles):
+        records[i] = (
+            np.datetime64(candle_time(c), "s"),
+            float(c[1]), float(c[2]), float(c[3]), float(c[4]),
+            np.nan if c[5] is None else float(c[5]),
+        )
+    return records
+
+
+def to_candles(records: np.ndarray) -> list:
+    """RECORD array -> candles in the API's v2 form (ISO timestamps)."""
+    times = np.datetime_as_string(records["time"], unit="s")
+    values = records[["open", "high", "low", "close"]].tolist()
+    volumes = records["volume"].tolist()
+    return [
+        [t, o, h, l, c, None if v != v else v]  # v != v: NaN
+        for t, (o, h, l, c), v in zip(times.tolist(), values, volumes)
+    ]
+
+
+class CandleStore:
+    def __init__(self, store_dir: str, clock=None):
+        self.store_dir = store_dir
+        self.clock = clock or ist_now  # naive IST now, for prune()
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+        self._covered = {}  # "interval/symbol" -> earliest requested time (ISO)
+        self._retention = {}  # interval -> days of bars needed (see retain)
+        path = os.path.join(store_dir, _INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._covered = json.load(f)
+
+    def _path(self, interval: str, symbol: str) -> str:
+        return os.path.join(self.store_dir, interval, f"{symbol}.bin")
+
+    def read(self, interval: str, symbol: str, start: datetime.datetime = None,
+             end: datetime.datetime = None) -> np.ndarray:
+        """
+        Stored bars with start <= time <= end as a RECORD array. The file is
+        memory-mapped and only the selected range is copied out, so the
+        result stays valid when the writer later truncates the file.
+        """
+        with self._lock:
+            return self._read(interval, symbol, start, end)
+
+    def _read(self, interval: str, symbol: str, start=None, end=None) -> np.ndarray:
+        path = self._path(interval, symbol)
+        if not os.path.exists(path) or os.path.getsize(path) < RECORD.itemsize:
+            return np.zeros(0, dtype=RECORD)
+        records = np.memmap(path, dtype=RECORD, mode="r")
+        lo = 0 if start is None else np.searchsorted(records["time"], np.datetime64(start, "s"), "left")
+        hi = len(records) if end is None else np.searchsorted(records["time"], np.datetime64(end, "s"), "right")
+        selected = np.array(records[lo:hi])
+        del records
+        return selected
+
+    def read_candles(self, interval: str, symbol: str, start: datetime.datetime = None,
+                     end: datetime.datetime = None) -> list:
+        """Same as read(), as a list of API-style candles."""
+        return to_candles(self.read(interval, symbol, start, end))
+
+    def covered_from(self, interval: str, symbol: str):
+        """Earliest time history was requested from for this series, or None."""
+        value = self._covered.get(f"{interval}/{symbol}")
+        return datetime.datetime.fromisoformat(value) if value else None
+
+    def write(self, interval: str, symbol: str, candles: list,
+              covered_from: datetime.datetime = None):
+        """
+        Merge candles into the stored series: stored bars in the new bars' time
+        range are replaced (the forming bar is rewritten until it closes).
+        Appending at the tail truncates and appends in place; anything else
+        rewrites the file. covered_from records how far back history was asked for.
+        """
+        with self._lock:
+            if candles:
+                self._merge(interval, symbol, to_records(candles))
+            if covered_from is not None:
+                key = f"{interval}/{symbol}"
+                current = self._covered.get(key)
+                if current is None or covered_from.isoformat() < current:
+                    self._covered[key] = covered_from.isoformat()
+                    self._write_index()
+
+    def _merge(self, interval: str, symbol: str, new: np.ndarray):
+        path = self._path(interval, symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        existing = self._read(interval, symbol)
+        first, last = new["time"][0], new["time"][-1]
+
+        if not len(existing) or existing["time"][-1] <= last:
+            # Tail update: cut stored bars from the first new bar, append
+            cut = int(np.searchsorted(existing["time"], first, "left"))
+            with open(path, "ab") as f:
+                f.truncate(cut * RECORD.itemsize)
+                f.write(new.tobytes())
+            return
+
+        merged = np.concatenate([
+            existing[existing["time"] < first],
+            new,
+            existing[existing["time"] > last],
+        ])
+        tmp = path + ".tmp"
+        merged.tofile(tmp)
+        os.replace(tmp, path)
+
+    def _write_index(self):
+        path = os.path.join(self.store_dir, _INDEX_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._covered, f, indent=0)
+        os.replace(tmp, path)
+
+    def retain(self, interval: str, days: int):
+        """Keep at least `days` of bars for interval (CandleCache registers its lookback)."""
+        with self._lock:
+            self._retention[interval] = max(days, self._retention.get(interval, 0))
+
+    def prune(self, now: datetime.datetime = None, keep_days: int = None) -> int:
+        """
+        Drop bars older than each retained interval's days (+ keep_days, default
+        CANDLE_STORE_KEEP_DAYS) before now. Series left empty (e.g. expired
+        contracts) are removed. Intervals nobody retained are left alone.
+        Returns the number of bars dropped.
+        """
+        now = self.clock() if now is None else now
+        keep_days = config.CANDLE_STORE_KEEP_DAYS if keep_days is None else keep_days
+        dropped = 0
+        with self._lock:
+            changed = False
+            for interval, days in self._retention.items():
+                cutoff = now - datetime.timedelta(days=days + keep_days)
+                for symbol in self.symbols(interval):
+                    count, removed = self._prune_series(interval, symbol, cutoff)
+                    dropped += count
+                    key = f"{interval}/{symbol}"
+                    if removed:
+                        changed |= self._covered.pop(key, None) is not None
+                    elif count and self._covered.get(key, cutoff.isoformat()) < cutoff.isoformat():
+                        # Stored history now starts at the cutoff at the earliest
+                        self._covered[key] = cutoff.isoformat()
+                        changed = True
+            if changed:
+                self._write_index()
+        if dropped:
+            print(f"  [CandleStore] Pruned {dropped} bars")
+        return dropped
+
+    def _prune_series(self, interval: str, symbol: str, cutoff: datetime.datetime):
+        """(bars dropped, series removed) for one series cut at cutoff."""
+        path = self._path(interval, symbol)
+        stored = self._read(interval, symbol)
+        cut = int(np.searchsorted(stored["time"], np.datetime64(cutoff, "s"), "left"))
+        if cut == len(stored):
+            os.remove(path)
+            return cut, True
+        if cut:
+            tmp = path + ".tmp"
+            stored[cut:].tofile(tmp)
+            os.replace(tmp, path)
+        return cut, False
+
+    def symbols(self, interval: str) -> list:
+        """Symbols stored for an interval."""
+        folder = os.path.join(self.store_dir, interval)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-4] for name in os.listdir(folder) if name.endswith(".bin"))
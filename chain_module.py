@@ -0,0 +1,103 @@
+"""
+chain_module.py - Option chain cache.
+Responsibility: Cache expiries and contracts per underlying, index contracts by
+(strike, CE/PE) and look up ATM / strike windows by bisection.
+No strategy logic. No trade logic.
+"""
+
+import bisect
+import time
+
+import config
+
+
+class OptionChain:
+    """Contracts of one (underlying, expiry), parsed once at load time."""
+
+    def __init__(self, underlying: str, expiry: str, contracts: list):
+        self.underlying = underlying
+        self.expiry = expiry
+        self.loaded_at = time.monotonic()
+        self.contracts = {}  # (strike, "CE"/"PE") -> contract name
+
+        for contract in contracts:
+            # Contract: NSE-NIFTY-24Feb26-25600-CE
+            parts = contract.split("-")
+            if len(parts) < 5:
+                continue
+            try:
+                strike = int(parts[3])
+            except ValueError:
+                continue
+            self.contracts[(strike, parts[4])] = contract
+
+        self.strikes = sorted(set(strike for strike, _ in self.contracts))
+
+    def atm_strike(self, ltp: float):
+        """Strike closest to ltp (lower strike on a tie). None if chain is empty."""
+        if not self.strikes:
+            return None
+        i = bisect.bisect_left(self.strikes, ltp)
+        if i == 0:
+            return self.strikes[0]
+        if i == len(self.strikes):
+            return self.strikes[-1]
+        lower, upper = self.strikes[i - 1], self.strikes[i]
+        return lower if ltp - lower <= upper - ltp else upper
+
+    def strike_window(self, atm: int, width: int) -> list:
+        """Strikes from `width` below to `width` above atm (clipped at the ends)."""
+        i = bisect.bisect_left(self.strikes, atm)
+        return self.strikes[max(0, i - width):i + width + 1]
+
+    def contract(self, strike: int, opt_type: str):
+        """Contract name for (strike, CE/PE), or None if not listed."""
+        return self.contracts.get((strike, opt_type))
+
+
+class ChainModule:
+    def __init__(self, groww, ttl_seconds: float = None):
+        self.groww = groww
+        self.ttl_seconds = config.CHAIN_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._expiries = {}  # underlying -> (loaded_at, [expiry, ...])
+        self._chains = {}    # (underlying, expiry) -> OptionChain
+
+    def get_expiries(self, underlying: str) -> list:
+        """Expiry dates (YYYY-MM-DD) for underlying, refreshed after the TTL."""
+        cached = self._expiries.get(underlying)
+        if cached and not self._expired(cached[0]):
+            return cached[1]
+
+        exp_data = self.groww.get_expiries(self.groww.EXCHANGE_NSE, underlying)
+        expiries = exp_data.get("expiries", [])
+        if expiries:
+            self._expiries[underlying] = (time.monotonic(), expiries)
+        return expiries
+
+    def get_chain(self, underlying: str, expiry: str):
+        """OptionChain for (underlying, expiry), refreshed after the TTL. None if no contracts."""
+        key = (underlying, expiry)
+        chain = self._chains.get(key)
+        if chain and not self._expired(chain.loaded_at):
+            return chain
+
+        contracts_data = self.groww.get_contracts(
+            self.groww.EXCHANGE_NSE,
+            underlying,
+            expiry,
+        )
+        contracts = contracts_data.get("contracts", [])
+        if not contracts:
+            return None
+
+        chain = OptionChain(underlying, expiry, contracts)
+        self._chains[key] = chain
+        return chain
+
+    def clear(self):
+        """Drop all cached expiries and chains (e.g. at the daily reset)."""
+        self._expiries.clear()
+        self._chains.clear()
+
+    def _expired(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at > self.ttl_seconds
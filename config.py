@@ -33,10 +33,27 @@ LOT_SIZE = {
 # ATM strike range (+/- from ATM)
 ATM_STRIKE_RANGE = 2
 
+# Option chain cache refresh (seconds)
+CHAIN_CACHE_TTL_SECONDS = 3600
+
 # Timeframes
 BIAS_INTERVAL = "1hour"       # 1H for trend bias
 ENTRY_INTERVAL = "15minute"   # 15M for option entry
 
+# Build bias bars locally from this index interval ("15minute", "1minute");
+# "" = fetch BIAS_INTERVAL bars from the API
+BIAS_BASE_INTERVAL = ""
+
+# Persistent candle history (warm restart: only missing bars are fetched); "" = off
+CANDLE_STORE_DIR = ""
+CANDLE_STORE_KEEP_DAYS = 0    # Days kept beyond each interval's lookback (offline analysis)
+
+# Publish candle history to shared memory for other processes (sharedcandle_module);
+# segment name prefix, "" = off
+SHARED_CANDLE_PREFIX = ""
+SHARED_CANDLE_CAPACITY = 4096  # Bars kept per (symbol, interval) segment
+SHARED_CANDLE_READ_TIMEOUT = 1.0  # Seconds a reader waits out a write in progress
+
 # EMA periods for trend
 EMA_FAST = 21
 EMA_SLOW = 50
@@ -63,13 +80,74 @@ MAX_OPEN_PER_INDEX = 1        # One open trade per index
 # Initial capital
 INITIAL_CAPITAL = 1000000
 
+# Max symbols per get_ltp request
+LTP_BATCH_SIZE = 50
+
+# Concurrent entry scan (one worker per index, strike checks fanned out)
+CONCURRENT_SCAN = False
+SCAN_WORKERS = 3              # Index pipelines in parallel
+STRIKE_WORKERS = 5            # Strike candle fetches/checks in parallel
+
+# Evaluate an index's strike window in one NumPy pass (check_entry_batch).
+# Faster on a cold cache, slower than per-contract check_entry once warm.
+BATCH_ENTRY = False
+
+# Scan universe: "config" = INDEX_LIST; "fno" = every F&O underlying (broker instrument list)
+SCAN_UNIVERSE = "config"
+
+# Sharded scanner (shard_engine): worker processes run trend/chain/entry per shard
+SHARD_COUNT = 4
+SHARD_TIMEOUT_SECONDS = 120       # Max wait for a shard's signals per cycle
+SHARD_REBALANCE_CYCLES = 10       # Re-split shards by measured scan time every N cycles
+SHARD_REBALANCE_IMBALANCE = 1.25  # ... when the slowest shard exceeds the fastest by this factor
+SHARD_COST_SMOOTHING = 0.3        # Weight of the newest per-underlying scan time
+
+# Async client (async_engine): pooled keep-alive HTTP session
+ASYNC_MAX_CONNECTIONS = 20
+ASYNC_KEEPALIVE_SECONDS = 60
+API_REQUEST_TIMEOUT = 15      # Seconds per request
+
+# Evaluate trend/entry once per closed BIAS/ENTRY bar (positions every loop)
+BAR_CLOSE_SCHEDULING = False
+BAR_SETTLE_SECONDS = 5        # Delay after a bar close before evaluating it
+
+# Record / replay broker API traffic (gzip JSON-lines journal, "" = off)
+RECORD_JOURNAL = ""
+REPLAY_JOURNAL = ""           # Replay instead of calling the API (no token needed)
+REPLAY_LATENCY = None         # None, "recorded", or seconds per call
+
+# Call/stage latency metrics (export: SIGUSR1 or on exit)
+METRICS_ENABLED = True
+METRICS_FILE = "metrics.json"
+
+# Client-side rate limiting: (calls, period seconds) windows per endpoint group
+RATE_LIMITING = True
+RATE_LIMITS = {
+    "live_data": [(10, 1), (300, 60)],      # get_ltp, get_quote
+    "non_trading": [(20, 1), (500, 60)],    # candles, expiries, contracts
+}
+RATE_LIMIT_RESERVE = 2        # Tokens per bucket kept for position LTP calls
+RATE_LIMIT_MAX_RETRIES = 4    # Retries after a throttle response
+RATE_LIMIT_BACKOFF_BASE = 0.5 # Seconds, doubled per retry (jittered)
+RATE_LIMIT_BACKOFF_MAX = 8.0
+
 # Loop interval
 LOOP_SLEEP_SECONDS = 5
 
+# Position price feed: "polling" = stops/targets checked on every tick
+# (batched LTP poll every FEED_POLL_SECONDS, in the urgent rate-limit lane);
+# "" = once per loop from the cycle snapshot
+PRICE_FEED = ""
+FEED_POLL_SECONDS = 0.5
+
 # Historical candle lookback (hours for 1H, minutes for 15M)
 BIAS_CANDLE_COUNT = 60        # Need at least 50 candles for EMA50
 ENTRY_CANDLE_COUNT = 30       # Need enough for ATR/RSI/volume
 
+# Initial history window (days) loaded into the candle cache per symbol
+BIAS_LOOKBACK_DAYS = 15       # 1H index candles (weekends, holidays)
+ENTRY_LOOKBACK_DAYS = 5       # 15M option candles
+
 # Market hours (IST -> UTC offset +5:30)
 MARKET_OPEN_HOUR = 9
 MARKET_OPEN_MINUTE = 15
@@ -82,3 +160,11 @@ EXPIRY_DAY_CUTOFF_MINUTE = 30
 
 # Logging
 LOG_FILE = "paper_trades_log.csv"
+LOG_BUFFERED = True           # Background writer; closing a trade never touches disk
+LOG_QUEUE_SIZE = 10000        # Max rows waiting for the writer
+LOG_FLUSH_ROWS = 50           # Write a batch at this many rows...
+LOG_FLUSH_SECONDS = 1.0       # ...or when the oldest queued row is this old
+LOG_DURABLE = False           # fsync after every batch
+LOG_STOP_RETRIES = 3          # Write attempts for the last batch on close (then reported lost)
+LOG_BACKEND = "csv"           # "csv" (LOG_FILE) or "columnar" (TRADE_STORE_DIR)
+TRADE_STORE_DIR = "trade_store"
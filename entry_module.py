@@ -4,147 +4,278 @@ Responsibility: Check all 4 entry conditions on 15M option candles.
 All conditions must be true simultaneously. No scoring.
 """
 
-import datetime
+import numpy as np
+
 import config
+import vector_module
+from candle_module import CandleCache, candle_time, closed_candles
+from indicator_module import EntryIndicators
 
 
 class EntryModule:
-    def __init__(self, groww):
+    def __init__(self, groww, candle_store=None, shared_candles=None, clock=None):
         self.groww = groww
-
-    def check_entry(self, contract: str, trend: str):
+        self.candle_cache = CandleCache(config.ENTRY_LOOKBACK_DAYS, candle_store, config.ENTRY_INTERVAL,
+                                        shared_candles, clock)
+        # contract -> (first bar time, committed bar count, EntryIndicators)
+        self._indicators = {}
+        # contract -> (bar_close, trend, result) for bar-close scheduling
+        self._entry_memo = {}
+        # contract -> (first bar time, closed bar count, parsed closed bars) for batches
+        self._bar_arrays = {}
+
+    def check_entry(self, contract: str, trend: str, bar_close=None):
         """
         Check entry conditions on 15M option candles.
+        Indicators are updated incrementally per closed bar (EntryIndicators)
+        and match the batch helpers below.
         All 4 conditions must be true:
         1. Breakout: Close > highest high of last 5 candles
         2. Volume expansion: Volume > 10 candle average
         3. ATR expansion: Current ATR > rolling ATR mean
         4. RSI: CE -> RSI > 55, PE -> RSI < 45
 
+        With bar_close (see scheduler_module), only bars that started before
+        it are used and the result is memoized per (contract, bar_close) and
+        returned unchanged until the next bar closes.
+
         Returns: (signal: bool, candle_data: dict or None)
         """
+        if bar_close is not None:
+            memo = self._entry_memo.get(contract)
+            if memo is not None and memo[0] == bar_close and memo[1] == trend:
+                return memo[2]
+
         try:
             candles = self._fetch_15m_candles(contract)
             if candles is None:
                 return False, None
 
-            min_candles = max(
-                config.BREAKOUT_LOOKBACK + 1,
-                config.VOLUME_AVG_PERIOD + 1,
-                config.ATR_PERIOD + 1,
-                config.RSI_PERIOD + 1,
-            )
+            if bar_close is not None:
+                candles = closed_candles(candles, bar_close)
 
-            if len(candles) < min_candles:
-                print(f"  [Entry] Not enough 15M candles for {contract} (got {len(candles)})")
-                return False, None
+            result = self._evaluate_entry(contract, trend, candles)
+            if bar_close is not None:
+                self._entry_memo[contract] = (bar_close, trend, result)
+            return result
 
-            # Parse candle data
-            # Candle format: [timestamp, open, high, low, close, volume] or with OI
-            parsed = self._parse_candles(candles)
-            if parsed is None:
-                return False, None
+        except Exception as e:
+            print(f"  [Entry] Error for {contract}: {e}")
+            return False, None
 
-            closes = parsed["closes"]
-            highs = parsed["highs"]
-            lows = parsed["lows"]
-            volumes = parsed["volumes"]
+    def _evaluate_entry(self, contract: str, trend: str, candles: list):
+        """Evaluate the 4 entry conditions on candles (last candle = current)."""
+        min_candles = max(
+            config.BREAKOUT_LOOKBACK + 1,
+            config.VOLUME_AVG_PERIOD + 1,
+            config.ATR_PERIOD + 1,
+            config.RSI_PERIOD + 1,
+        )
+
+        if len(candles) < min_candles:
+            print(f"  [Entry] Not enough 15M candles for {contract} (got {len(candles)})")
+            return False, None
 
-            # Current candle (last completed)
-            current_close = closes[-1]
-            current_high = highs[-1]
-            current_low = lows[-1]
-            current_volume = volumes[-1]
+        # Closed bars go into the streaming indicators; the last candle
+        # is evaluated on top of them without being committed.
+        indicators = self._update_indicators(contract, candles)
+        if indicators is None:
+            return False, None
 
-            # 1. Breakout check
-            lookback_highs = highs[-(config.BREAKOUT_LOOKBACK + 1):-1]
-            highest_high = max(lookback_highs)
-            breakout = current_close > highest_high
+        # Current candle (last completed)
+        current = self._parse_bar(candles[-1])
+        if current is None:
+            return False, None
+        current_high, current_low, current_close, current_volume = current
 
-            if not breakout:
-                return False, None
+        # 1. Breakout check
+        highest_high = indicators.highs.value
+        breakout = current_close > highest_high
 
-            # 2. Volume expansion
-            vol_avg = sum(volumes[-(config.VOLUME_AVG_PERIOD + 1):-1]) / config.VOLUME_AVG_PERIOD
-            volume_ok = current_volume > vol_avg if vol_avg > 0 else False
+        if not breakout:
+            return False, None
 
-            if not volume_ok:
-                return False, None
+        # 2. Volume expansion
+        vol_avg = indicators.volumes.total / config.VOLUME_AVG_PERIOD
+        volume_ok = current_volume > vol_avg if vol_avg > 0 else False
 
-            # 3. ATR expansion
-            atr_values = self._calculate_atr_series(highs, lows, closes, config.ATR_PERIOD)
-            if not atr_values or len(atr_values) < 2:
-                return False, None
+        if not volume_ok:
+            return False, None
 
-            current_atr = atr_values[-1]
-            atr_mean = sum(atr_values) / len(atr_values)
-            atr_ok = current_atr > atr_mean
+        # 3. ATR expansion
+        atr_stats = indicators.atr.peek(current_high, current_low, current_close)
+        if atr_stats is None or atr_stats[2] < 2:
+            return False, None
 
-            if not atr_ok:
-                return False, None
+        current_atr, atr_mean, _ = atr_stats
+        atr_ok = current_atr > atr_mean
 
-            # 4. RSI check
-            rsi = self._calculate_rsi(closes, config.RSI_PERIOD)
-            if rsi is None:
-                return False, None
+        if not atr_ok:
+            return False, None
 
-            opt_type = "CE" if trend == "UP" else "PE"
-            if opt_type == "CE":
-                rsi_ok = rsi > config.RSI_CE_THRESHOLD
-            else:
-                rsi_ok = rsi < config.RSI_PE_THRESHOLD
+        # 4. RSI check
+        rsi = indicators.rsi.peek(current_close)
+        if rsi is None:
+            return False, None
 
-            if not rsi_ok:
-                return False, None
+        opt_type = "CE" if trend == "UP" else "PE"
+        if opt_type == "CE":
+            rsi_ok = rsi > config.RSI_CE_THRESHOLD
+        else:
+            rsi_ok = rsi < config.RSI_PE_THRESHOLD
 
-            # All conditions met
-            candle_data = {
-                "close": current_close,
-                "high": current_high,
-                "low": current_low,
-                "volume": current_volume,
-                "ATR": current_atr,
-                "RSI": rsi,
-            }
+        if not rsi_ok:
+            return False, None
 
-            print(f"  [Entry] ALL conditions met for {contract}")
-            print(f"    Breakout: {current_close:.2f} > {highest_high:.2f}")
-            print(f"    Volume: {current_volume} > avg {vol_avg:.0f}")
-            print(f"    ATR: {current_atr:.2f} > mean {atr_mean:.2f}")
-            print(f"    RSI: {rsi:.2f} ({'>' if opt_type == 'CE' else '<'} threshold)")
+        # All conditions met
+        candle_data = {
+            "close": current_close,
+            "high": current_high,
+            "low": current_low,
+            "volume": current_volume,
+            "ATR": current_atr,
+            "RSI": rsi,
+        }
+        self._report_signal(contract, opt_type, candle_data, highest_high, vol_avg, atr_mean)
+        return True, candle_data
 
-            return True, candle_data
+    @staticmethod
+    def _report_signal(contract: str, opt_type: str, candle_data: dict,
+                       highest_high: float, vol_avg: float, atr_mean: float):
+        print(f"  [Entry] ALL conditions met for {contract}")
+        print(f"    Breakout: {candle_data['close']:.2f} > {highest_high:.2f}")
+        print(f"    Volume: {candle_data['volume']} > avg {vol_avg:.0f}")
+        print(f"    ATR: {candle_data['ATR']:.2f} > mean {atr_mean:.2f}")
+        print(f"    RSI: {candle_data['RSI']:.2f} ({'>' if opt_type == 'CE' else '<'} threshold)")
+
+    def check_entry_batch(self, contracts: list, trend: str, bar_close=None, pool=None) -> list:
+        """
+        check_entry for a whole strike window. Candles are fetched per contract
+        (on pool if given); contracts with identical bar timestamps are stacked
+        into (contracts x bars) arrays and the 4 conditions are evaluated for
+        all of them in one vector_module.entry_current pass per group.
+        Same results and memo as calling check_entry per contract; an error
+        only costs the contract (or group) it occurred in.
+
+        Returns: list of (signal, candle_data or None) in contract order.
+        """
+        results = [(False, None)] * len(contracts)
+        pending = []
+        for i, contract in enumerate(contracts):
+            memo = self._entry_memo.get(contract) if bar_close is not None else None
+            if memo is not None and memo[0] == bar_close and memo[1] == trend:
+                results[i] = memo[2]
+            else:
+                pending.append(i)
 
-        except Exception as e:
-            print(f"  [Entry] Error for {contract}: {e}")
-            return False, None
+        def fetch(i):
+            try:
+                return self._fetch_15m_candles(contracts[i])
+            except Exception as e:
+                print(f"  [Entry] Error for {contracts[i]}: {e}")
+                return None
+
+        fetched = list(pool.map(fetch, pending)) if pool is not None else [fetch(i) for i in pending]
+
+        min_candles = max(
+            config.BREAKOUT_LOOKBACK + 1,
+            config.VOLUME_AVG_PERIOD + 1,
+            config.ATR_PERIOD + 1,
+            config.RSI_PERIOD + 1,
+        )
+        groups = {}  # (bar count, first bar, last bar) -> [(position, bars)]
+        evaluated = []
+        for i, candles in zip(pending, fetched):
+            if candles is None:
+                continue
+            try:
+                if bar_close is not None:
+                    candles = closed_candles(candles, bar_close)
+                if len(candles) < min_candles:
+                    print(f"  [Entry] Not enough 15M candles for {contracts[i]} (got {len(candles)})")
+                    evaluated.append(i)
+                    continue
+                bars = self._bar_array(contracts[i], candles)
+            except Exception as e:
+                print(f"  [Entry] Error for {contracts[i]}: {e}")
+                continue
+            evaluated.append(i)
+            if bars is not None:
+                key = (len(candles), candles[0][0], candles[-1][0])
+                groups.setdefault(key, []).append((i, bars))
+
+        opt_type = "CE" if trend == "UP" else "PE"
+        failed = set()
+        for members in groups.values():
+            try:
+                block = np.stack([bars for _, bars in members])
+                current = vector_module.entry_current(
+                    block[..., 0], block[..., 1], block[..., 2], block[..., 3], opt_type, config
+                )
+            except Exception as e:
+                # Only this group is lost; like check_entry, nothing is memoized
+                print(f"  [Entry] Error for {', '.join(contracts[i] for i, _ in members)}: {e}")
+                failed.update(i for i, _ in members)
+                continue
+            for row in np.flatnonzero(current["signal"]):
+                i = members[row][0]
+                candle_data = {
+                    "close": float(current["close"][row]),
+                    "high": float(current["high"][row]),
+                    "low": float(current["low"][row]),
+                    "volume": float(current["volume"][row]),
+                    "ATR": float(current["atr"][row]),
+                    "RSI": float(current["rsi"][row]),
+                }
+                self._report_signal(
+                    contracts[i], opt_type, candle_data, float(current["breakout_level"][row]),
+                    float(current["vol_avg"][row]), float(current["atr_mean"][row]),
+                )
+                results[i] = (True, candle_data)
+
+        if bar_close is not None:
+            for i in evaluated:
+                if i in failed:
+                    continue
+                self._entry_memo[contracts[i]] = (bar_close, trend, results[i])
+        return results
+
+    def _bar_array(self, contract: str, candles: list):
+        """
+        candles as a (bars x 4) array of (high, low, close, volume). Closed bars
+        are parsed once and kept; only new bars and the last one are parsed.
+        Returns None if a candle cannot be parsed.
+        """
+        first_time = candle_time(candles[0])
+        closed_count = len(candles) - 1
+
+        entry = self._bar_arrays.get(contract)
+        if entry is None or entry[0] != first_time or entry[1] > closed_count:
+            closed = np.zeros((0, 4))
+            committed = 0
+        else:
+            _, committed, closed = entry
+
+        rows = [self._parse_bar(c) for c in candles[committed:]]
+        if any(row is None for row in rows):
+            self._bar_arrays.pop(contract, None)
+            return None
+        if closed_count > committed:
+            closed = np.concatenate([closed, np.array(rows[:-1])])
+        self._bar_arrays[contract] = (first_time, closed_count, closed)
+        return np.concatenate([closed, np.array(rows[-1:])])
 
     def _fetch_15m_candles(self, contract: str):
         """
         Fetch 15M candles for option contract.
-        Uses FNO segment.
+        Uses FNO segment. Only bars from the last cached bar onwards are
+        requested after the first call (see CandleCache).
         """
-        now = datetime.datetime.now()
-        # Go back enough to get sufficient candles
-        start = now - datetime.timedelta(days=5)
-
-        start_str = start.strftime("%Y-%m-%d %H:%M:%S")
-        end_str = now.strftime("%Y-%m-%d %H:%M:%S")
-
         try:
-            # Convert contract format for LTP symbol
-            # Contract: NSE-NIFTY-24Feb26-25600-CE
-            # groww_symbol for historical candles: use contract as-is
-            data = self.groww.get_historical_candles(
-                exchange=self.groww.EXCHANGE_NSE,
-                segment=self.groww.SEGMENT_FNO,
-                groww_symbol=contract,
-                start_time=start_str,
-                end_time=end_str,
-                candle_interval=self.groww.CANDLE_INTERVAL_MIN_15,
+            candles = self.candle_cache.get(
+                contract,
+                lambda start_str, end_str: self._request_15m_candles(contract, start_str, end_str),
             )
-
-            candles = data.get("candles", [])
             if not candles:
                 return None
             return candles
@@ -153,6 +284,71 @@ class EntryModule:
             print(f"  [Entry] Candle fetch error for {contract}: {e}")
             return None
 
+    def _request_15m_candles(self, contract: str, start_str: str, end_str: str) -> list:
+        """Request 15M option candles for a time range (FNO segment)."""
+        # Contract: NSE-NIFTY-24Feb26-25600-CE
+        # groww_symbol for historical candles: use contract as-is
+        data = self.groww.get_historical_candles(
+            exchange=self.groww.EXCHANGE_NSE,
+            segment=self.groww.SEGMENT_FNO,
+            groww_symbol=contract,
+            start_time=start_str,
+            end_time=end_str,
+            candle_interval=self.groww.CANDLE_INTERVAL_MIN_15,
+        )
+        return data.get("candles", [])
+
+    def _update_indicators(self, contract: str, candles: list):
+        """
+        Commit every candle except the last to this contract's indicators.
+        Indicators are rebuilt if the cached history was replaced.
+        Returns None if a candle cannot be parsed.
+        """
+        first_time = candle_time(candles[0])
+        closed_count = len(candles) - 1
+
+        entry = self._indicators.get(contract)
+        if entry is None or entry[0] != first_time or entry[1] > closed_count:
+            indicators = EntryIndicators(
+                config.BREAKOUT_LOOKBACK,
+                config.VOLUME_AVG_PERIOD,
+                config.ATR_PERIOD,
+                config.RSI_PERIOD,
+            )
+            committed = 0
+        else:
+            _, committed, indicators = entry
+
+        for c in candles[committed:closed_count]:
+            bar = self._parse_bar(c)
+            if bar is None:
+                self._indicators.pop(contract, None)
+                return None
+            indicators.update(*bar)
+
+        self._indicators[contract] = (first_time, closed_count, indicators)
+        return indicators
+
+    @staticmethod
+    def _parse_bar(candle: list):
+        """
+        Parse one candle into (high, low, close, volume).
+        Returns None for malformed candles.
+        """
+        try:
+            if len(candle) < 6:
+                return None
+            # Volume can be None for some candles
+            vol = candle[5]
+            return (
+                float(candle[2]),
+                float(candle[3]),
+                float(candle[4]),
+                float(vol) if vol is not None else 0.0,
+            )
+        except (ValueError, TypeError):
+            return None
+
     def _parse_candles(self, candles: list):
         """
         Parse candle data handling both 6-column and 7-column formats.
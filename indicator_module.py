@@ -0,0 +1,213 @@
+"""
+indicator_module.py - Streaming indicator state.
+Responsibility: O(1) incremental updates of indicators on closed bars.
+Each state matches the batch calculation in the trend/entry modules on the same data.
+No fetching. No trade logic.
+"""
+
+from collections import deque
+
+
+class EmaState:
+    """
+    Streaming EMA with an SMA seed, identical to TrendModule._ema.
+    update() commits a closed bar; peek() evaluates a forming bar
+    without changing the committed state.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.multiplier = 2.0 / (period + 1)
+        self.count = 0
+        self.value = None  # None until `period` closes are committed
+        self._seed = []
+
+    def update(self, price: float) -> float:
+        """Commit a closed bar's price. Returns the EMA (0.0 while seeding)."""
+        self.count += 1
+        if self.value is None:
+            self._seed.append(price)
+            if len(self._seed) < self.period:
+                return 0.0
+            self.value = sum(self._seed) / self.period  # SMA seed
+            self._seed = []
+            return self.value
+
+        self.value = (price - self.value) * self.multiplier + self.value
+        return self.value
+
+    def peek(self, price: float) -> float:
+        """EMA as if price were the next bar, without committing it."""
+        if self.value is None:
+            if len(self._seed) + 1 < self.period:
+                return 0.0
+            return sum(self._seed + [price]) / self.period
+        return (price - self.value) * self.multiplier + self.value
+
+
+class WilderAtrState:
+    """
+    Streaming Wilder ATR with a running mean of the ATR series,
+    identical to EntryModule._calculate_atr_series.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prev_close = None
+        self.value = None   # None until `period` true ranges are committed
+        self.count = 0      # number of ATR values in the series
+        self.total = 0      # running sum of the ATR series
+        self._seed = []
+
+    def _true_range(self, high: float, low: float) -> float:
+        return max(
+            high - low,
+            abs(high - self.prev_close),
+            abs(low - self.prev_close),
+        )
+
+    def update(self, high: float, low: float, close: float):
+        """Commit a closed bar."""
+        if self.prev_close is not None:
+            tr = self._true_range(high, low)
+            if self.value is None:
+                self._seed.append(tr)
+                if len(self._seed) == self.period:
+                    self.value = sum(self._seed) / self.period
+                    self._seed = []
+                    self.count = 1
+                    self.total += self.value
+            else:
+                self.value = (self.value * (self.period - 1) + tr) / self.period
+                self.count += 1
+                self.total += self.value
+        self.prev_close = close
+
+    def peek(self, high: float, low: float, close: float):
+        """
+        ATR series stats as if this bar were appended, without committing it.
+        Returns (current_atr, atr_mean, series_length) or None.
+        """
+        if self.prev_close is None:
+            return None
+        tr = self._true_range(high, low)
+        if self.value is None:
+            if len(self._seed) + 1 < self.period:
+                return None
+            atr = sum(self._seed + [tr]) / self.period
+        else:
+            atr = (self.value * (self.period - 1) + tr) / self.period
+        count = self.count + 1
+        return atr, (self.total + atr) / count, count
+
+
+class WilderRsiState:
+    """Streaming Wilder RSI, identical to EntryModule._calculate_rsi."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.prev_close = None
+        self.avg_gain = None  # None until `period` deltas are committed
+        self.avg_loss = None
+        self._gains = []
+        self._losses = []
+
+    def update(self, close: float):
+        """Commit a closed bar's close."""
+        if self.prev_close is not None:
+            self.avg_gain, self.avg_loss = self._step(close - self.prev_close, commit=True)
+        self.prev_close = close
+
+    def peek(self, close: float):
+        """RSI as if close were the next bar, without committing it. None if not enough data."""
+        if self.prev_close is None:
+            return None
+        avg_gain, avg_loss = self._step(close - self.prev_close, commit=False)
+        if avg_gain is None:
+            return None
+        if avg_loss == 0:
+            return 100.0
+        rs = avg_gain / avg_loss
+        return 100.0 - (100.0 / (1.0 + rs))
+
+    def _step(self, delta: float, commit: bool):
+        gain = delta if delta > 0 else 0
+        loss = -delta if delta < 0 else 0
+
+        if self.avg_gain is not None:
+            avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+            return avg_gain, avg_loss
+
+        gains = self._gains + [gain]
+        losses = self._losses + [loss]
+        if commit:
+            self._gains = gains
+            self._losses = losses
+        if len(gains) < self.period:
+            return None, None
+        if commit:
+            self._gains = []
+            self._losses = []
+        return sum(gains) / self.period, sum(losses) / self.period
+
+
+class RollingSum:
+    """Sum of the last `window` committed values."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.total = 0.0
+        self._values = deque()
+
+    def update(self, value: float):
+        self._values.append(value)
+        self.total += value
+        if len(self._values) > self.window:
+            self.total -= self._values.popleft()
+
+    def __len__(self):
+        return len(self._values)
+
+
+class RollingMax:
+    """Max of the last `window` committed values (monotonic deque)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self._deque = deque()  # (position, value), values strictly decreasing
+
+    def update(self, value: float):
+        while self._deque and self._deque[-1][1] <= value:
+            self._deque.pop()
+        self._deque.append((self.count, value))
+        self.count += 1
+        if self._deque[0][0] <= self.count - 1 - self.window:
+            self._deque.popleft()
+
+    @property
+    def value(self):
+        return self._deque[0][1] if self._deque else None
+
+
+class EntryIndicators:
+    """
+    Per-contract bundle of the 15M entry indicators.
+    update() commits a closed bar (high, low, close, volume) in O(1).
+    """
+
+    def __init__(self, breakout_lookback: int, volume_period: int,
+                 atr_period: int, rsi_period: int):
+        self.count = 0
+        self.highs = RollingMax(breakout_lookback)
+        self.volumes = RollingSum(volume_period)
+        self.atr = WilderAtrState(atr_period)
+        self.rsi = WilderRsiState(rsi_period)
+
+    def update(self, high: float, low: float, close: float, volume: float):
+        self.count += 1
+        self.highs.update(high)
+        self.volumes.update(volume)
+        self.atr.update(high, low, close)
+        self.rsi.update(close)
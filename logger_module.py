@@ -4,14 +4,81 @@ Responsibility: Persistent CSV logging of all trades.
 No trade logic. No risk logic.
 """
 
+import atexit
 import os
 import csv
+import queue
+import threading
+import time
+import weakref
 import config
 
+# Queue marker that tells the writer thread to flush and exit
+_STOP = object()
+
+# Buffered loggers still running, closed by one exit hook
+_open_loggers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_loggers():
+    for logger in list(_open_loggers):
+        logger.close()
+
+
+CSV_HEADER = ["Date", "Contract", "Index", "Entry", "Exit", "Qty", "Lot", "PnL", "Capital_After"]
+
+
+def format_row(date, contract, index, entry, exit_price, qty, lot, pnl, capital_after=None) -> list:
+    """One trade as a CSV log row (prices to 2 decimals)."""
+    return [
+        date,
+        contract,
+        index,
+        f"{entry:.2f}",
+        f"{exit_price:.2f}",
+        qty,
+        lot,
+        f"{pnl:.2f}",
+        f"{capital_after:.2f}" if capital_after else "",
+    ]
+
+
+class _FlushBarrier:
+    """Queue item for flush(): set once every earlier row was handled."""
 
-class LoggerModule:
     def __init__(self):
-        self.log_file = config.LOG_FILE
+        self.done = threading.Event()
+        self.ok = True
+
+
+class LoggerModule:
+    """
+    Buffered mode (LOG_BUFFERED): log_trade only queues the row; a background
+    writer appends queued rows in batches (LOG_FLUSH_ROWS rows or
+    LOG_FLUSH_SECONDS, whichever comes first) and on close().
+    durable: fsync after every batch.
+    The trade count is kept in memory, seeded from the file once.
+    """
+
+    def __init__(self, log_file: str = None, buffered: bool = None, durable: bool = None):
+        self.log_file = log_file or config.LOG_FILE
+        self.buffered = config.LOG_BUFFERED if buffered is None else buffered
+        self.durable = config.LOG_DURABLE if durable is None else durable
+        self._init_storage()
+        self._trade_count = self._count_logged_trades()
+        self._count_lock = threading.Lock()
+
+        self._queue = None
+        self._writer = None
+        if self.buffered:
+            self._queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+            self._writer = threading.Thread(target=self._write_loop, name="trade-log-writer", daemon=True)
+            self._writer.start()
+            _open_loggers.add(self)
+
+    def _init_storage(self):
+        """Prepare the sink before the first write (subclasses: their own store)."""
         self._ensure_csv_header()
 
     def _ensure_csv_header(self):
@@ -19,10 +86,7 @@ class LoggerModule:
         if not os.path.exists(self.log_file):
             with open(self.log_file, "w", newline="") as f:
                 writer = csv.writer(f)
-                writer.writerow([
-                    "Date", "Contract", "Index", "Entry", "Exit",
-                    "Qty", "Lot", "PnL", "Capital_After"
-                ])
+                writer.writerow(CSV_HEADER)
             print(f"[Logger] Created trade log: {self.log_file}")
 
     def log_trade(self, date: str, contract: str, index: str,
@@ -30,27 +94,110 @@ class LoggerModule:
                   lot: int, pnl: float, capital_after: float = None):
         """
         Append a trade record to the CSV log.
+        Buffered: queued for the writer thread, no disk I/O here.
         """
-        try:
-            with open(self.log_file, "a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    date,
-                    contract,
-                    index,
-                    f"{entry:.2f}",
-                    f"{exit_price:.2f}",
-                    qty,
-                    lot,
-                    f"{pnl:.2f}",
-                    f"{capital_after:.2f}" if capital_after else "",
-                ])
-            print(f"[Logger] Trade logged: {contract} PnL={pnl:.2f}")
-        except Exception as e:
-            print(f"[Logger] ERROR writing log: {e}")
+        row = (date, contract, index, entry, exit_price, qty, lot, pnl, capital_after)
+
+        if self.buffered and self._writer.is_alive():
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                print("[Logger] WARNING: write queue full, waiting for writer")
+                self._queue.put(row)
+        else:
+            try:
+                self._append_rows([row])
+            except Exception as e:
+                print(f"[Logger] ERROR writing log: {e}")
+                return
+
+        with self._count_lock:
+            self._trade_count += 1
+        print(f"[Logger] Trade logged: {contract} PnL={pnl:.2f}")
+
+    def _append_rows(self, rows: list):
+        """Write trade tuples (log_trade argument order) to the log."""
+        with open(self.log_file, "a", newline="") as f:
+            csv.writer(f).writerows(format_row(*row) for row in rows)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _write_loop(self):
+        """Writer thread: batch queued rows, flush on size, age or stop."""
+        rows = []
+        first_queued = None
+        while True:
+            timeout = None
+            if rows:
+                timeout = max(0.0, first_queued + config.LOG_FLUSH_SECONDS - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            barrier = item if isinstance(item, _FlushBarrier) else None
+            if isinstance(item, tuple):
+                if not rows:
+                    first_queued = time.monotonic()
+                rows.append(item)
+
+            due = rows and (
+                stop
+                or barrier is not None
+                or len(rows) >= config.LOG_FLUSH_ROWS
+                or time.monotonic() - first_queued >= config.LOG_FLUSH_SECONDS
+            )
+            if due:
+                attempts = config.LOG_STOP_RETRIES if stop else 1
+                for attempt in range(attempts):
+                    try:
+                        self._append_rows(rows)
+                        rows = []
+                        break
+                    except Exception as e:
+                        # Keep the rows; retried after another LOG_FLUSH_SECONDS
+                        print(f"[Logger] ERROR writing log: {e}")
+                        first_queued = time.monotonic()
+                        if attempt + 1 < attempts:
+                            time.sleep(config.LOG_FLUSH_SECONDS)
+
+            if barrier is not None:
+                barrier.ok = not rows
+                barrier.done.set()
+            if stop:
+                if rows:
+                    print(f"[Logger] ERROR: {len(rows)} trade(s) could not be written and are lost:")
+                    for row in rows:
+                        print(f"  {format_row(*row)}")
+                return
+
+    def flush(self) -> bool:
+        """
+        Block until every row queued so far has been handled.
+        Returns False if some of them could not be written (still queued for retry).
+        """
+        if self.buffered and self._writer.is_alive():
+            barrier = _FlushBarrier()
+            self._queue.put(barrier)
+            barrier.done.wait()
+            return barrier.ok
+        return True
+
+    def close(self):
+        """Write out queued rows and stop the writer (safe to call twice)."""
+        if self.buffered and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        _open_loggers.discard(self)
 
     def get_trade_count(self) -> int:
         """Return total number of logged trades."""
+        return self._trade_count
+
+    def _count_logged_trades(self) -> int:
+        """Count rows already in the log file (once, at startup)."""
         try:
             if not os.path.exists(self.log_file):
                 return 0
@@ -6,8 +6,9 @@ No strategy logic. No risk calculation. No logging logic.
 
 import time
 import datetime
+import signal
 import sys
-from growwapi import GrowwAPI
+from concurrent.futures import ThreadPoolExecutor
 
 import config
 from trend_module import TrendModule
@@ -15,6 +16,16 @@ from entry_module import EntryModule
 from risk_module import RiskModule
 from position_module import PositionModule
 from logger_module import LoggerModule
+from tradestore_module import TradeStore
+from candlestore_module import CandleStore
+from sharedcandle_module import SharedCandleWriter
+from pricefeed_module import PollingPriceFeed
+from snapshot_module import SnapshotModule
+from chain_module import ChainModule
+from scheduler_module import BarScheduler
+from replay_module import make_client
+from metrics_module import METRICS, InstrumentedClient, stage
+from ratelimit_module import RateLimitedClient
 
 
 def get_api_token():
@@ -44,8 +55,31 @@ def is_market_hours() -> bool:
     return market_open <= current_time <= market_close
 
 
+# ReplayClock while replaying a journal (see use_replay_clock); None = wall clock
+_replay_clock = None
+
+
+def use_replay_clock(clock):
+    """Run market hours, bar closes and loop sleeps on clock (None: wall clock)."""
+    global _replay_clock
+    _replay_clock = clock
+
+
+def pause(seconds: float) -> bool:
+    """
+    Sleep between loop iterations. While replaying, the replay clock is
+    advanced instead of sleeping; returns False once the journal is used up.
+    """
+    if _replay_clock is None:
+        time.sleep(seconds)
+        return True
+    return _replay_clock.advance(seconds)
+
+
 def get_ist_now():
-    """Get current time in IST."""
+    """Get current time in IST (replay time when replaying a journal)."""
+    if _replay_clock is not None:
+        return _replay_clock.now()
     try:
         import pytz
         ist = pytz.timezone("Asia/Kolkata")
@@ -54,27 +88,34 @@ def get_ist_now():
         return datetime.datetime.utcnow() + datetime.timedelta(hours=5, minutes=30)
 
 
+def get_ist_now_naive():
+    """Current IST time without tzinfo (same form as candle timestamps)."""
+    return get_ist_now().replace(tzinfo=None)
+
+
 def is_daily_reset_time() -> bool:
     """Check if it's time for daily reset (9:15 IST)."""
     now_ist = get_ist_now()
     return now_ist.hour == config.MARKET_OPEN_HOUR and now_ist.minute == config.MARKET_OPEN_MINUTE
 
 
-def is_expiry_day_past_cutoff(expiry_date_str: str) -> bool:
+def is_expiry_day_past_cutoff(expiry_date_str: str, now_ist=None, cfg=config) -> bool:
     """
     Check if expiry is today AND current IST time is past the cutoff (12:30 PM IST).
     If expiry is today and past cutoff -> True (skip this expiry, it's dead).
     If expiry is today but before cutoff -> False (still tradeable).
     If expiry is NOT today -> False (not relevant).
+    now_ist overrides the clock and cfg the config (backtests).
     """
-    now_ist = get_ist_now()
+    if now_ist is None:
+        now_ist = get_ist_now()
     today_str = now_ist.strftime("%Y-%m-%d")
 
     if expiry_date_str != today_str:
         return False  # Not expiry day, no cutoff applies
 
     # Expiry is today - check if past cutoff
-    cutoff_minutes = config.EXPIRY_DAY_CUTOFF_HOUR * 60 + config.EXPIRY_DAY_CUTOFF_MINUTE
+    cutoff_minutes = cfg.EXPIRY_DAY_CUTOFF_HOUR * 60 + cfg.EXPIRY_DAY_CUTOFF_MINUTE
     current_minutes = now_ist.hour * 60 + now_ist.minute
 
     if current_minutes >= cutoff_minutes:
@@ -83,23 +124,301 @@ def is_expiry_day_past_cutoff(expiry_date_str: str) -> bool:
     return False  # Before 12:30 PM on expiry day = still tradeable
 
 
+def select_strikes(index_symbol: str, index_ltp: float, chain_module, now=None, cfg=config):
+    """
+    Pick the nearest tradeable expiry whose ATM strike is close to index_ltp.
+    now (IST) overrides the clock and cfg the config (backtests).
+    Returns (chain, selected_strikes) or (None, []).
+    """
+    underlying = cfg.UNDERLYING_MAP[index_symbol]
+
+    # Get nearest expiry with suitable contracts (cached chain)
+    try:
+        expiries = chain_module.get_expiries(underlying)
+        if not expiries:
+            print(f"  No expiries found for {underlying}")
+            return None, []
+
+        # Filter out expired dates
+        today_str = (now or get_ist_now()).strftime("%Y-%m-%d")
+        valid_expiries = [e for e in expiries if e >= today_str]
+        if not valid_expiries:
+            print(f"  No valid expiries for {underlying}")
+            return None, []
+
+    except Exception as e:
+        print(f"  Expiry error for {underlying}: {e}")
+        return None, []
+
+    # Try expiries in order until we find one with ATM contracts
+    for candidate_expiry in valid_expiries[:3]:  # Try up to 3 expiries
+        try:
+            # Skip dead expiry: if expiry is today and past 12:30 PM IST
+            if is_expiry_day_past_cutoff(candidate_expiry, now, cfg):
+                print(f"  Expiry {candidate_expiry}: SKIPPED (expiry day past {cfg.EXPIRY_DAY_CUTOFF_HOUR}:{cfg.EXPIRY_DAY_CUTOFF_MINUTE:02d} IST cutoff)")
+                continue
+
+            candidate_chain = chain_module.get_chain(underlying, candidate_expiry)
+            if candidate_chain is None or not candidate_chain.strikes:
+                continue
+
+            # Check if ATM strike is reasonably close to index LTP
+            atm = candidate_chain.atm_strike(index_ltp)
+            atm_distance_pct = abs(atm - index_ltp) / index_ltp
+
+            if atm_distance_pct > 0.05:  # ATM > 5% away = skip
+                print(f"  Expiry {candidate_expiry}: ATM {atm} too far from LTP {index_ltp:.0f} ({atm_distance_pct:.1%}), trying next")
+                continue
+
+            # Good expiry found
+            selected_strikes = candidate_chain.strike_window(atm, cfg.ATM_STRIKE_RANGE)
+            if selected_strikes:
+                return candidate_chain, selected_strikes
+
+        except Exception as e:
+            print(f"  Contracts error for {candidate_expiry}: {e}")
+            continue
+
+    print(f"  No suitable expiry/contracts for {underlying}")
+    return None, []
+
+
+def scan_index(index_symbol: str, snapshot, trend_module, entry_module, chain_module,
+               strike_pool=None, bias_bar=None, entry_bar=None) -> list:
+    """
+    Run one index's pipeline: trend -> chain -> strike candles -> entry check.
+    Reads only; never touches RiskModule or PositionModule state.
+    With strike_pool, the per-strike entry checks run concurrently.
+    bias_bar/entry_bar are the last closed bar times from BarScheduler; when
+    given, trend and entry results are reused until the next bar closes.
+
+    Returns list of (contract, candle_data) entry signals in strike order.
+    """
+    # Get 1H trend bias
+    with stage("trend"):
+        trend = trend_module.detect_trend(index_symbol, bias_bar)
+
+    if trend is None:
+        print(f"{index_symbol} -> No clear trend")
+        return []
+
+    print(f"{index_symbol} -> Trend: {trend}")
+
+    # Index LTP from this cycle's snapshot
+    index_ltp = snapshot.index_ltp(index_symbol)
+    if index_ltp is None:
+        print(f"  Could not get LTP for {index_symbol}")
+        return []
+
+    with stage("chain"):
+        chain, selected_strikes = select_strikes(index_symbol, index_ltp, chain_module)
+    if chain is None:
+        return []
+
+    print(f"  Expiry: {chain.expiry} | Selected Strikes: {selected_strikes}")
+
+    opt = "CE" if trend == "UP" else "PE"
+
+    # Contract must exist in the fetched chain
+    contracts = [chain.contract(strike, opt) for strike in selected_strikes]
+    contracts = [c for c in contracts if c is not None]
+
+    # Check entry conditions on 15M candles
+    with stage("entry"):
+        if config.BATCH_ENTRY:
+            results = entry_module.check_entry_batch(contracts, trend, entry_bar, strike_pool)
+        elif strike_pool is None:
+            results = [entry_module.check_entry(c, trend, entry_bar) for c in contracts]
+        else:
+            results = list(strike_pool.map(lambda c: entry_module.check_entry(c, trend, entry_bar), contracts))
+
+    return [
+        (contract, candle)
+        for contract, (signal, candle) in zip(contracts, results)
+        if signal
+    ]
+
+
+def open_from_signals(index_symbol: str, signals: list, risk_module, position_module,
+                      entry_time: str = None):
+    """
+    Size and open the first viable signal for an index (main thread only).
+    Only one trade per index per cycle. entry_time overrides the clock (backtests).
+    Lot sizes come from risk_module.cfg. Holds position_module.lock so feed
+    ticks cannot close trades (and move capital) while sizing.
+    """
+    lot_size = risk_module.cfg.LOT_SIZE[index_symbol]
+
+    with stage("sizing"), position_module.lock:
+        for contract, candle in signals:
+            print(f"\nENTRY SIGNAL: {contract}")
+
+            entry_price = candle["close"]
+            atr = candle["ATR"]
+            structure_stop = candle["low"]
+
+            # Calculate position size
+            position_data = risk_module.calculate_position(
+                entry_price,
+                atr,
+                structure_stop,
+                lot_size,
+            )
+
+            if position_data is None:
+                print("  Position sizing failed - skipping")
+                continue
+
+            # Open the trade
+            opened = position_module.open_trade(
+                contract,
+                index_symbol,
+                entry_price,
+                position_data["stop"],
+                position_data["target"],
+                position_data["qty"],
+                lot_size,
+                position_data["risk_per_unit"],
+                entry_time,
+            )
+            if not opened:
+                continue
+
+            # Register with risk module
+            risk_module.register_trade_opened(index_symbol)
+
+            print(f"TRADE OPENED: {contract}")
+            print(f"  Entry: {entry_price:.2f}")
+            print(f"  Stop: {position_data['stop']:.2f}")
+            print(f"  Target: {position_data['target']:.2f}")
+            print(f"  Qty: {position_data['qty']} ({position_data['lots']} lots)")
+
+            # Only one trade per index per cycle
+            return
+
+
+def start_price_feed(groww, position_module, risk_module, logger):
+    """
+    Start per-tick position management (PRICE_FEED), or return None to
+    manage positions once per loop.
+    """
+    if config.PRICE_FEED != "polling":
+        return None
+    feed = PollingPriceFeed(lambda contracts: position_module.get_option_ltps(groww, contracts))
+    position_module.attach_feed(feed, risk_module, logger)
+    feed.start()
+    print(f"[Feed] Position ticks every {feed.poll_seconds}s")
+    return feed
+
+
+def bar_closes(scheduler):
+    """(bias_bar, entry_bar) from the scheduler, or (None, None) if unscheduled."""
+    if scheduler is None:
+        return None, None
+    return scheduler.bar_close(config.BIAS_INTERVAL), scheduler.bar_close(config.ENTRY_INTERVAL)
+
+
+def scan_entries(snapshot, trend_module, entry_module, chain_module, risk_module,
+                 position_module, index_pool=None, strike_pool=None, scheduler=None):
+    """
+    Scan all tradeable indices for entries and open trades.
+    With index_pool, each index's pipeline runs on a worker; results are
+    merged here in INDEX_LIST order before any risk/position change.
+    """
+    bias_bar, entry_bar = bar_closes(scheduler)
+
+    # Check if we can trade this index
+    indices = [idx for idx in config.INDEX_LIST if risk_module.can_trade(idx)]
+
+    if index_pool is None:
+        for index_symbol in indices:
+            # Limits may have changed from trades opened earlier in this cycle
+            if not risk_module.can_trade(index_symbol):
+                continue
+            signals = scan_index(index_symbol, snapshot, trend_module, entry_module,
+                                 chain_module, strike_pool, bias_bar, entry_bar)
+            if signals and risk_module.can_trade(index_symbol):
+                open_from_signals(index_symbol, signals, risk_module, position_module)
+        return
+
+    futures = [
+        (index_symbol, index_pool.submit(scan_index, index_symbol, snapshot, trend_module,
+                                         entry_module, chain_module, strike_pool,
+                                         bias_bar, entry_bar))
+        for index_symbol in indices
+    ]
+
+    for index_symbol, future in futures:
+        try:
+            signals = future.result()
+        except Exception as e:
+            print(f"  Scan error for {index_symbol}: {e}")
+            continue
+
+        # Limits may have changed from trades opened earlier in this cycle
+        if signals and risk_module.can_trade(index_symbol):
+            open_from_signals(index_symbol, signals, risk_module, position_module)
+
+
+def wrap_client(groww, limiter=None):
+    """
+    Layer metrics and the shared rate limiter over a client, per config.
+    limiter overrides the default RateLimiter (e.g. a process's share of the
+    broker limits). Replayed journals are served unthrottled.
+    """
+    if config.METRICS_ENABLED:
+        groww = InstrumentedClient(groww)
+    if config.RATE_LIMITING and not config.REPLAY_JOURNAL:
+        groww = RateLimitedClient(groww, limiter)
+    return groww
+
+
+def export_metrics(signum=None, frame=None):
+    """Print and write the call/stage metrics (SIGUSR1 handler, and on exit)."""
+    print(METRICS.report())
+    print(f"[Metrics] Exported to {METRICS.export()}")
+
+
 def main():
     print("=====================================")
     print("Paper Bot v1.0 - Hybrid MTF Engine")
     print("=====================================")
 
-    # Get API token
-    token = get_api_token()
+    # Get API token (not needed to replay a journal)
+    token = None if config.REPLAY_JOURNAL else get_api_token()
 
-    # Initialize Groww
-    groww = GrowwAPI(token)
+    # Initialize Groww (optionally recording to / replaying from a journal)
+    client = make_client(token)
+    use_replay_clock(getattr(client, "clock", None))
+    groww = wrap_client(client)
+    if config.METRICS_ENABLED and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, export_metrics)
 
     # Initialize Modules
-    trend_module = TrendModule(groww)
-    entry_module = EntryModule(groww)
-    risk_module = RiskModule()
-    position_module = PositionModule()
-    logger = LoggerModule()
+    candle_store = CandleStore(config.CANDLE_STORE_DIR, get_ist_now_naive) if config.CANDLE_STORE_DIR else None
+    shared_candles = SharedCandleWriter() if config.SHARED_CANDLE_PREFIX else None
+    trend_module = TrendModule(groww, candle_store, shared_candles, get_ist_now_naive)
+    entry_module = EntryModule(groww, candle_store, shared_candles, get_ist_now_naive)
+    position_module = PositionModule(clock=get_ist_now_naive)
+    risk_module = RiskModule(position_module)
+    logger = TradeStore() if config.LOG_BACKEND == "columnar" else LoggerModule()
+    if candle_store is not None:
+        candle_store.prune()
+    snapshot_module = SnapshotModule(groww)
+    chain_module = ChainModule(groww)
+
+    # Optional concurrent scan: one worker per index, strike checks fanned out
+    index_pool = None
+    strike_pool = None
+    if config.CONCURRENT_SCAN:
+        index_pool = ThreadPoolExecutor(max_workers=config.SCAN_WORKERS)
+        strike_pool = ThreadPoolExecutor(max_workers=config.STRIKE_WORKERS)
+
+    # Trend/entry once per closed bar; positions still every loop
+    scheduler = BarScheduler(get_ist_now_naive) if config.BAR_CLOSE_SCHEDULING else None
+
+    # Stops/targets on every tick instead of every loop
+    feed = start_price_feed(groww, position_module, risk_module, logger)
 
     print("Initial Capital:", risk_module.capital)
     print("Monitoring indices:", config.INDEX_LIST)
@@ -111,193 +430,36 @@ def main():
         try:
             # Check market hours
             if not is_market_hours():
-                print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Outside market hours. Waiting...")
-                time.sleep(60)
+                print(f"[{get_ist_now_naive().strftime('%H:%M:%S')}] Outside market hours. Waiting...")
                 daily_reset_done = False
+                if not pause(60):
+                    print("\n\nReplay finished.")
+                    break
                 continue
 
             # Daily reset logic (once at market open)
             if is_daily_reset_time() and not daily_reset_done:
                 risk_module.reset_daily()
+                chain_module.clear()
+                if candle_store is not None:
+                    candle_store.prune()
                 daily_reset_done = True
 
-            # Manage open trades every cycle
-            position_module.manage_positions(groww, risk_module, logger)
-
-            # Scan for entries
-            for index_symbol in config.INDEX_LIST:
-
-                # Check if we can trade this index
-                if not risk_module.can_trade(index_symbol):
-                    continue
-
-                # Get 1H trend bias
-                trend = trend_module.detect_trend(index_symbol)
-
-                if trend is None:
-                    print(f"{index_symbol} -> No clear trend")
-                    continue
-
-                print(f"{index_symbol} -> Trend: {trend}")
-
-                # Fetch index LTP
-                try:
-                    ltp_data = groww.get_ltp(
-                        segment=groww.SEGMENT_CASH,
-                        exchange_trading_symbols=(index_symbol,),
-                    )
-                    index_ltp = ltp_data.get(index_symbol)
-                    if index_ltp is None:
-                        print(f"  Could not get LTP for {index_symbol}")
-                        continue
-                    index_ltp = float(index_ltp)
-                except Exception as e:
-                    print(f"  LTP error for {index_symbol}: {e}")
-                    continue
-
-                underlying = config.UNDERLYING_MAP[index_symbol]
-
-                # Get nearest expiry with suitable contracts
-                try:
-                    exp_data = groww.get_expiries(groww.EXCHANGE_NSE, underlying)
-                    expiries = exp_data.get("expiries", [])
-                    if not expiries:
-                        print(f"  No expiries found for {underlying}")
-                        continue
-
-                    # Filter out expired dates
-                    today_str = datetime.datetime.now().strftime("%Y-%m-%d")
-                    valid_expiries = [e for e in expiries if e >= today_str]
-                    if not valid_expiries:
-                        print(f"  No valid expiries for {underlying}")
-                        continue
-
-                except Exception as e:
-                    print(f"  Expiry error for {underlying}: {e}")
-                    continue
-
-                # Try expiries in order until we find one with ATM contracts
-                contracts = []
-                expiry = None
-                selected_strikes = []
-
-                for candidate_expiry in valid_expiries[:3]:  # Try up to 3 expiries
-                    try:
-                        # Skip dead expiry: if expiry is today and past 12:30 PM IST
-                        if is_expiry_day_past_cutoff(candidate_expiry):
-                            print(f"  Expiry {candidate_expiry}: SKIPPED (expiry day past {config.EXPIRY_DAY_CUTOFF_HOUR}:{config.EXPIRY_DAY_CUTOFF_MINUTE:02d} IST cutoff)")
-                            continue
-
-                        contracts_data = groww.get_contracts(
-                            groww.EXCHANGE_NSE,
-                            underlying,
-                            candidate_expiry,
-                        )
-                        candidate_contracts = contracts_data.get("contracts", [])
-                        if not candidate_contracts:
-                            continue
-
-                        # Extract strikes
-                        candidate_strikes = sorted(list(set(
-                            int(c.split("-")[3]) for c in candidate_contracts
-                            if len(c.split("-")) >= 5
-                        )))
-
-                        if not candidate_strikes:
-                            continue
-
-                        # Check if ATM strike is reasonably close to index LTP
-                        atm = min(candidate_strikes, key=lambda x: abs(x - index_ltp))
-                        atm_distance_pct = abs(atm - index_ltp) / index_ltp
-
-                        if atm_distance_pct > 0.05:  # ATM > 5% away = skip
-                            print(f"  Expiry {candidate_expiry}: ATM {atm} too far from LTP {index_ltp:.0f} ({atm_distance_pct:.1%}), trying next")
-                            continue
-
-                        # Good expiry found
-                        expiry = candidate_expiry
-                        contracts = candidate_contracts
-                        atm_index = candidate_strikes.index(atm)
-                        selected_strikes = candidate_strikes[
-                            max(0, atm_index - config.ATM_STRIKE_RANGE):
-                            atm_index + config.ATM_STRIKE_RANGE + 1
-                        ]
-                        break
-
-                    except Exception as e:
-                        print(f"  Contracts error for {candidate_expiry}: {e}")
-                        continue
-
-                if not expiry or not contracts or not selected_strikes:
-                    print(f"  No suitable expiry/contracts for {underlying}")
-                    continue
-
-                print(f"  Expiry: {expiry} | Selected Strikes: {selected_strikes}")
-
-                # Check each selected strike for entry
-                for strike in selected_strikes:
-                    opt = "CE" if trend == "UP" else "PE"
-
-                    # Build contract name from expiry date
-                    try:
-                        exp_dt = datetime.datetime.strptime(expiry, "%Y-%m-%d")
-                        exp_formatted = exp_dt.strftime("%d%b%y")
-                        # Capitalize first letter of month: 24Feb26
-                        contract = f"NSE-{underlying}-{exp_formatted}-{strike}-{opt}"
-                    except Exception:
-                        continue
-
-                    # Validate contract exists in fetched contracts list
-                    if contract not in contracts:
-                        continue
-
-                    # Check entry conditions on 15M candles
-                    signal, candle = entry_module.check_entry(contract, trend)
-
-                    if not signal:
-                        continue
-
-                    print(f"\nENTRY SIGNAL: {contract}")
-
-                    entry_price = candle["close"]
-                    atr = candle["ATR"]
-                    structure_stop = candle["low"]
-
-                    # Calculate position size
-                    position_data = risk_module.calculate_position(
-                        entry_price,
-                        atr,
-                        structure_stop,
-                        config.LOT_SIZE[index_symbol],
-                    )
-
-                    if position_data is None:
-                        print("  Position sizing failed - skipping")
-                        continue
-
-                    # Open the trade
-                    position_module.open_trade(
-                        contract,
-                        index_symbol,
-                        entry_price,
-                        position_data["stop"],
-                        position_data["target"],
-                        position_data["qty"],
-                        config.LOT_SIZE[index_symbol],
-                        position_data["risk_per_unit"],
-                    )
-
-                    # Register with risk module
-                    risk_module.register_trade_opened(index_symbol)
-
-                    print(f"TRADE OPENED: {contract}")
-                    print(f"  Entry: {entry_price:.2f}")
-                    print(f"  Stop: {position_data['stop']:.2f}")
-                    print(f"  Target: {position_data['target']:.2f}")
-                    print(f"  Qty: {position_data['qty']} ({position_data['lots']} lots)")
-
-                    # Only one trade per index per cycle
-                    break
+            with stage("cycle"):
+                # One market snapshot per cycle: every decision below reads from it
+                with stage("snapshot"):
+                    # Option LTPs only when positions are managed here, not by the feed
+                    snapshot = snapshot_module.take(config.INDEX_LIST, position_module if feed is None else None)
+
+                # Manage open trades every cycle (unless the feed does it per tick)
+                if feed is None:
+                    with stage("manage"):
+                        position_module.manage_positions(groww, risk_module, logger, snapshot.option_ltps)
+
+                # Scan for entries
+                with stage("scan"):
+                    scan_entries(snapshot, trend_module, entry_module, chain_module, risk_module,
+                                 position_module, index_pool, strike_pool, scheduler)
 
             # Status update
             print(f"\nCapital: {risk_module.capital:.2f}")
@@ -308,8 +470,6 @@ def main():
 
         except KeyboardInterrupt:
             print("\n\nBot stopped by user.")
-            print(f"Final Capital: {risk_module.capital:.2f}")
-            print(f"Total Logged Trades: {logger.get_trade_count()}")
             break
 
         except Exception as e:
@@ -317,7 +477,23 @@ def main():
             import traceback
             traceback.print_exc()
 
-        time.sleep(config.LOOP_SLEEP_SECONDS)
+        if not pause(config.LOOP_SLEEP_SECONDS):
+            print("\n\nReplay finished.")
+            break
+
+    print(f"Final Capital: {risk_module.capital:.2f}")
+    print(f"Total Logged Trades: {logger.get_trade_count()}")
+    if feed is not None:
+        feed.stop()
+    if shared_candles is not None:
+        shared_candles.close()
+    logger.close()
+    if config.METRICS_ENABLED:
+        export_metrics()
+
+    if index_pool is not None:
+        index_pool.shutdown(wait=False)
+        strike_pool.shutdown(wait=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,17 @@
+"""
+methods_module.py - Broker data-call names.
+Responsibility: Define the broker data calls and their rate-limit groups in one place,
+for the rate limiter, metrics, journaling and async wrappers. No imports, no logic.
+"""
+
+# Broker limit group per data call
+METHOD_GROUPS = {
+    "get_ltp": "live_data",
+    "get_quote": "live_data",
+    "get_historical_candles": "non_trading",
+    "get_expiries": "non_trading",
+    "get_contracts": "non_trading",
+}
+
+# Broker data calls: rate limited, timed, journaled and proxied by the client wrappers
+METHODS = tuple(METHOD_GROUPS)
@@ -0,0 +1,170 @@
+"""
+metrics_module.py - Call and stage instrumentation.
+Responsibility: Count calls and errors and keep latency histograms per broker API
+method and per main-loop stage, and export them (p50/p95/p99) on demand.
+No strategy logic. No trade logic.
+"""
+
+import bisect
+import contextlib
+import json
+import threading
+import time
+
+import config
+from methods_module import METHODS
+
+# Histogram bucket upper bounds (seconds): 10us .. ~100s, 25% apart
+_BUCKETS = []
+_bound = 1e-5
+while _bound < 100.0:
+    _BUCKETS.append(_bound)
+    _bound *= 1.25
+
+
+class Histogram:
+    """Fixed log-spaced latency buckets; percentiles are bucket upper bounds."""
+
+    __slots__ = ("counts", "count", "errors", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.counts[bisect.bisect_left(_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        """Latency below which a fraction q of calls fall (0 if no calls)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(_BUCKETS[i], self.max) if i < len(_BUCKETS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """
+    Histograms by name ("api.get_ltp", "stage.entry", ...). Thread-safe.
+    When disabled, timer() and record() do nothing.
+    """
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = config.METRICS_ENABLED if enabled is None else enabled
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, name: str, seconds: float, error: bool = False):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds, error)
+
+    @contextlib.contextmanager
+    def timer(self, name: str):
+        """Time the with-block under name; an exception counts as an error."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, error)
+
+    def snapshot(self) -> dict:
+        """{name: {count, errors, mean, p50, p95, p99, max}} plus the window length."""
+        with self._lock:
+            summaries = {name: h.summary() for name, h in sorted(self._histograms.items())}
+        return {
+            "window_seconds": time.time() - self.started_at,
+            "metrics": summaries,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def export(self, path: str = None) -> str:
+        """Write snapshot() as JSON to path (default METRICS_FILE). Returns the path."""
+        path = path or config.METRICS_FILE
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+    def report(self) -> str:
+        """Human-readable table of snapshot(), latencies in milliseconds."""
+        snapshot = self.snapshot()
+        lines = [f"[Metrics] {snapshot['window_seconds']:.0f}s window"]
+        for name, s in snapshot["metrics"].items():
+            lines.append(
+                f"  {name:28s} n={s['count']:<7d} err={s['errors']:<5d} "
+                f"p50={s['p50'] * 1e3:8.2f} p95={s['p95'] * 1e3:8.2f} "
+                f"p99={s['p99'] * 1e3:8.2f} max={s['max'] * 1e3:8.2f} ms"
+            )
+        return "\n".join(lines)
+
+
+# Process-wide registry used by the engines and modules
+METRICS = Metrics()
+
+
+def stage(name: str):
+    """Time a main-loop stage ("manage", "trend", "chain", "entry", "sizing", ...)."""
+    return METRICS.timer(f"stage.{name}")
+
+
+class InstrumentedClient:
+    """
+    Wraps a client (GrowwAPI, RecordingClient, SyncClientView, ...) and times
+    each data call as "api.<method>". Everything else passes through.
+    """
+
+    def __init__(self, groww, metrics: Metrics = None):
+        self.groww = groww
+        self.metrics = metrics or METRICS
+
+    def __getattr__(self, name):
+        if name not in METHODS:
+            return getattr(self.groww, name)
+        method = getattr(self.groww, name)
+        key = f"api.{name}"
+
+        def call(*args, **kwargs):
+            with self.metrics.timer(key):
+                return method(*args, **kwargs)
+
+        return call
@@ -4,40 +4,126 @@ Responsibility: Track open trades, manage stops, breakeven, trailing, exits.
 No entry logic. No risk calculation.
 """
 
-import datetime
+import threading
 import config
+from candle_module import ist_now
+from ratelimit_module import urgent
+
+
+class Position:
+    """One open paper trade (fixed fields, no per-instance dict)."""
+
+    __slots__ = (
+        "contract", "index", "entry_price", "stop_price", "target_price",
+        "qty", "lot_size", "risk_per_unit", "entry_time",
+        "highest_since_entry", "breakeven_moved", "trailing_active",
+    )
+
+    def __init__(self, contract: str, index: str, entry_price: float, stop_price: float,
+                 target_price: float, qty: int, lot_size: int, risk_per_unit: float,
+                 entry_time: str):
+        self.contract = contract
+        self.index = index
+        self.entry_price = entry_price
+        self.stop_price = stop_price
+        self.target_price = target_price
+        self.qty = qty
+        self.lot_size = lot_size
+        self.risk_per_unit = risk_per_unit
+        self.entry_time = entry_time
+        self.highest_since_entry = entry_price
+        self.breakeven_moved = False
+        self.trailing_active = False
 
 
 class PositionModule:
-    def __init__(self):
-        self.open_positions = []
+    """
+    Positions are managed either once per cycle (manage_positions) or per
+    tick from an attached PriceFeed (on_tick); both apply the same rules.
+    lock guards the positions: hold it to open trades while ticks may arrive.
+    """
+
+    def __init__(self, cfg=config, clock=None):
+        self.cfg = cfg  # config module or an isolated copy (sweeps)
+        self.clock = clock or ist_now  # naive IST now, for entry times
+        self.open_positions = {}  # contract -> Position, in open order
+        self._by_index = {}       # index_symbol -> {contract: Position}
+        self.lock = threading.RLock()
+        self._ltp_symbols = {}    # contract -> LTP symbol (None: not convertible)
+        self._price_paths = {}    # contract -> "ltp" or "quote", whichever returned a price
+        self._feed = None
+        self._risk_module = None
+        self._logger = None
+
+    def attach_feed(self, feed, risk_module, logger):
+        """Manage positions on every tick of feed; open contracts are subscribed."""
+        with self.lock:
+            self._feed = feed
+            self._risk_module = risk_module
+            self._logger = logger
+            feed.add_listener(self.on_tick)
+            feed.subscribe(list(self.open_positions))
+
+    def on_tick(self, contract: str, ltp: float):
+        """Apply stop/target/breakeven/trail to one contract at a new LTP."""
+        with self.lock:
+            trade = self.open_positions.get(contract)
+            if trade is None:
+                return
+            try:
+                self._apply_ltp(trade, ltp, self._risk_module, self._logger)
+            except Exception as e:
+                print(f"  [Position] Error managing {contract}: {e}")
 
     def open_trade(self, contract: str, index_symbol: str, entry_price: float,
                    stop_price: float, target_price: float, qty: int,
-                   lot_size: int, risk_per_unit: float):
+                   lot_size: int, risk_per_unit: float, entry_time: str = None) -> bool:
         """
         Open a new paper trade.
+        entry_time ("%Y-%m-%d %H:%M") defaults to now.
+        Returns False (nothing opened) if the contract is already open.
         """
-        trade = {
-            "contract": contract,
-            "index": index_symbol,
-            "entry_price": entry_price,
-            "stop_price": stop_price,
-            "target_price": target_price,
-            "qty": qty,
-            "lot_size": lot_size,
-            "risk_per_unit": risk_per_unit,
-            "entry_time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "highest_since_entry": entry_price,
-            "breakeven_moved": False,
-            "trailing_active": False,
-        }
-        self.open_positions.append(trade)
-
-    def manage_positions(self, groww, risk_module, logger):
+        with self.lock:
+            if contract in self.open_positions:
+                print(f"  [Position] {contract} already open - skipping")
+                return False
+
+            trade = Position(
+                contract, index_symbol, entry_price, stop_price, target_price, qty,
+                lot_size, risk_per_unit,
+                entry_time or self.clock().strftime("%Y-%m-%d %H:%M"),
+            )
+            self.open_positions[contract] = trade
+            self._by_index.setdefault(index_symbol, {})[contract] = trade
+            self._ltp_symbol(contract)  # translate once, not per cycle
+            if self._feed is not None:
+                self._feed.subscribe([contract])
+            return True
+
+    def get_position(self, contract: str):
+        """Open Position for contract, or None."""
+        return self.open_positions.get(contract)
+
+    def positions_for(self, index_symbol: str) -> list:
+        """Open positions of one index."""
+        return list(self._by_index.get(index_symbol, {}).values())
+
+    def _remove(self, trade: Position):
+        del self.open_positions[trade.contract]
+        by_contract = self._by_index[trade.index]
+        del by_contract[trade.contract]
+        if not by_contract:
+            del self._by_index[trade.index]
+        self._ltp_symbols.pop(trade.contract, None)
+        self._price_paths.pop(trade.contract, None)
+        if self._feed is not None:
+            self._feed.unsubscribe([trade.contract])
+
+    def manage_positions(self, groww, risk_module, logger, ltps=None):
         """
         Manage all open positions every cycle:
-        - Fetch current LTP
+        - Use LTPs from the cycle snapshot (ltps: contract -> ltp), or fetch
+          them in one batched request when not given
         - Check stop hit
         - Check target hit
         - Move to breakeven at 1R
@@ -46,97 +132,143 @@ class PositionModule:
         if not self.open_positions:
             return
 
-        closed_trades = []
-
-        for trade in self.open_positions:
-            try:
-                # Fetch current LTP for the option
-                ltp = self._get_option_ltp(groww, trade)
-                if ltp is None:
-                    continue
-
-                entry = trade["entry_price"]
-                stop = trade["stop_price"]
-                target = trade["target_price"]
-                risk = trade["risk_per_unit"]
-                qty = trade["qty"]
-
-                # Update highest since entry
-                if ltp > trade["highest_since_entry"]:
-                    trade["highest_since_entry"] = ltp
-
-                # Check stop hit
-                if ltp <= stop:
-                    pnl = (ltp - entry) * qty
-                    self._close_trade(trade, ltp, pnl, "STOP HIT", risk_module, logger)
-                    closed_trades.append(trade)
-                    continue
-
-                # Check target hit
-                if ltp >= target:
-                    pnl = (ltp - entry) * qty
-                    self._close_trade(trade, ltp, pnl, "TARGET HIT", risk_module, logger)
-                    closed_trades.append(trade)
-                    continue
-
-                # Move to breakeven at 1R
-                move_from_entry = ltp - entry
-                r_multiple = move_from_entry / risk if risk > 0 else 0
-
-                if not trade["breakeven_moved"] and r_multiple >= config.BREAKEVEN_R:
-                    trade["stop_price"] = entry
-                    trade["breakeven_moved"] = True
-                    print(f"  [Position] Breakeven moved: {trade['contract']} stop -> {entry:.2f}")
-
-                # Trail after 1.5R
-                if r_multiple >= config.TRAIL_R:
-                    trade["trailing_active"] = True
-                    # Trail stop = entry + (current_move - 1R)
-                    trail_stop = entry + (move_from_entry - risk)
-                    if trail_stop > trade["stop_price"]:
-                        trade["stop_price"] = trail_stop
-                        print(f"  [Position] Trail updated: {trade['contract']} stop -> {trail_stop:.2f}")
-
-            except Exception as e:
-                print(f"  [Position] Error managing {trade['contract']}: {e}")
+        if ltps is None:
+            ltps = self.get_option_ltps(groww)
+
+        with self.lock:
+            # Copy: closed trades are removed while iterating
+            for trade in list(self.open_positions.values()):
+                try:
+                    ltp = ltps.get(trade.contract)
+                    if ltp is None:
+                        continue
+                    self._apply_ltp(trade, ltp, risk_module, logger)
+                except Exception as e:
+                    print(f"  [Position] Error managing {trade.contract}: {e}")
+
+    def _apply_ltp(self, trade: Position, ltp: float, risk_module, logger):
+        """Stop, target, breakeven and trail rules for one trade at ltp."""
+        entry = trade.entry_price
+        stop = trade.stop_price
+        target = trade.target_price
+        risk = trade.risk_per_unit
+        qty = trade.qty
+
+        # Update highest since entry
+        if ltp > trade.highest_since_entry:
+            trade.highest_since_entry = ltp
+
+        # Check stop hit
+        if ltp <= stop:
+            pnl = (ltp - entry) * qty
+            self._close_trade(trade, ltp, pnl, "STOP HIT", risk_module, logger)
+            return
 
-        # Remove closed trades
-        for trade in closed_trades:
-            if trade in self.open_positions:
-                self.open_positions.remove(trade)
+        # Check target hit
+        if ltp >= target:
+            pnl = (ltp - entry) * qty
+            self._close_trade(trade, ltp, pnl, "TARGET HIT", risk_module, logger)
+            return
 
-    def _get_option_ltp(self, groww, trade: dict):
+        # Move to breakeven at 1R
+        move_from_entry = ltp - entry
+        r_multiple = move_from_entry / risk if risk > 0 else 0
+
+        if not trade.breakeven_moved and r_multiple >= self.cfg.BREAKEVEN_R:
+            trade.stop_price = entry
+            trade.breakeven_moved = True
+            print(f"  [Position] Breakeven moved: {trade.contract} stop -> {entry:.2f}")
+
+        # Trail after 1.5R
+        if r_multiple >= self.cfg.TRAIL_R:
+            trade.trailing_active = True
+            # Trail stop = entry + (current_move - 1R)
+            trail_stop = entry + (move_from_entry - risk)
+            if trail_stop > trade.stop_price:
+                trade.stop_price = trail_stop
+                print(f"  [Position] Trail updated: {trade.contract} stop -> {trail_stop:.2f}")
+
+    @urgent()
+    def get_option_ltps(self, groww, contracts=None) -> dict:
         """
-        Fetch LTP for an option contract.
-        Convert contract format to LTP symbol format.
+        Fetch LTPs for contracts (default: all open option contracts).
+        Convertible contracts are requested together via get_ltp (in chunks of
+        LTP_BATCH_SIZE); only contracts missing from the response, or sharing
+        a guessed symbol with another open contract, fall back to get_quote.
+        A contract that get_ltp does not price (weekly expiries) is remembered
+        and goes straight to get_quote afterwards.
+        Returns dict contract -> ltp.
+        Marked urgent: served ahead of scan calls by the rate limiter.
         """
-        try:
-            contract = trade["contract"]
-            # Contract: NSE-NIFTY-24Feb26-25600-CE
-            # LTP symbol: NSE_NIFTY26FEB25600CE (monthly)
-            # For weekly, must use get_quote or proper format
-
-            ltp_symbol = self._contract_to_ltp_symbol(contract)
-            if ltp_symbol is None:
-                # Fallback: try get_quote
-                return self._get_ltp_via_quote(groww, contract)
-
-            ltp_data = groww.get_ltp(
-                segment=groww.SEGMENT_FNO,
-                exchange_trading_symbols=(ltp_symbol,),
-            )
-
-            ltp = ltp_data.get(ltp_symbol)
-            if ltp is None:
-                # Fallback to get_quote
-                return self._get_ltp_via_quote(groww, contract)
+        ltps = {}
+        symbol_to_contract = {}
+        fallback = []
+
+        if contracts is None:
+            with self.lock:
+                contracts = list(self.open_positions)
+
+        claimed = {}  # ltp_symbol -> contracts that translate to it
+        for contract in contracts:
+            ltp_symbol = self._ltp_symbol(contract)
+            if ltp_symbol is None or self._price_paths.get(contract) == "quote":
+                fallback.append(contract)
+            else:
+                claimed.setdefault(ltp_symbol, []).append(contract)
+
+        for ltp_symbol, owners in claimed.items():
+            if len(owners) == 1:
+                symbol_to_contract[ltp_symbol] = owners[0]
+            else:
+                # Weekly and monthly expiries of one month share the guessed
+                # symbol; its price belongs to at most one of them
+                fallback.extend(owners)
+
+        symbols = list(symbol_to_contract)
+        for i in range(0, len(symbols), self.cfg.LTP_BATCH_SIZE):
+            chunk = symbols[i:i + self.cfg.LTP_BATCH_SIZE]
+            try:
+                ltp_data = groww.get_ltp(
+                    segment=groww.SEGMENT_FNO,
+                    exchange_trading_symbols=tuple(chunk),
+                )
+            except Exception as e:
+                print(f"  [Position] LTP fetch error: {e}")
+                ltp_data = None
+
+            for ltp_symbol in chunk:
+                contract = symbol_to_contract[ltp_symbol]
+                ltp = ltp_data.get(ltp_symbol) if ltp_data is not None else None
+                if ltp is not None:
+                    try:
+                        ltps[contract] = float(ltp)
+                        self._price_paths[contract] = "ltp"
+                    except (TypeError, ValueError):
+                        print(f"  [Position] Bad LTP for {contract}: {ltp!r}")
+                        fallback.append(contract)
+                    continue
+                if ltp_data is not None:
+                    # Answered without this symbol: the guessed symbol is wrong.
+                    # One that priced before gets one more get_ltp try first.
+                    if self._price_paths.pop(contract, None) != "ltp":
+                        self._price_paths[contract] = "quote"
+                fallback.append(contract)
+
+        # Fallback to get_quote only for symbols missing from the response
+        for contract in fallback:
+            ltp = self._get_ltp_via_quote(groww, contract)
+            if ltp is not None:
+                ltps[contract] = ltp
 
-            return float(ltp)
+        return ltps
 
-        except Exception as e:
-            print(f"  [Position] LTP fetch error: {e}")
-            # Fallback to get_quote
-            return self._get_ltp_via_quote(groww, contract)
+    def _ltp_symbol(self, contract: str):
+        """LTP symbol for contract, translated once and then looked up."""
+        try:
+            return self._ltp_symbols[contract]
+        except KeyError:
+            ltp_symbol = self._ltp_symbols[contract] = self._contract_to_ltp_symbol(contract)
+            return ltp_symbol
 
     def _contract_to_ltp_symbol(self, contract: str):
         """
@@ -192,26 +324,27 @@ class PositionModule:
             print(f"  [Position] Quote fallback error: {e}")
             return None
 
-    def _close_trade(self, trade: dict, exit_price: float, pnl: float,
+    def _close_trade(self, trade: Position, exit_price: float, pnl: float,
                      reason: str, risk_module, logger):
-        """Close a trade and log it."""
-        print(f"\nTrade Closed: {trade['contract']} | {reason} | PnL: {pnl:.2f}")
+        """Close a trade, remove it from the open positions and log it."""
+        print(f"\nTrade Closed: {trade.contract} | {reason} | PnL: {pnl:.2f}")
 
-        risk_module.register_trade_closed(trade["index"], pnl)
+        self._remove(trade)
+        risk_module.register_trade_closed(trade.index, pnl)
         print(f"Capital: {risk_module.capital:.2f}")
 
         logger.log_trade(
-            date=trade["entry_time"],
-            contract=trade["contract"],
-            index=trade["index"],
-            entry=trade["entry_price"],
+            date=trade.entry_time,
+            contract=trade.contract,
+            index=trade.index,
+            entry=trade.entry_price,
             exit_price=exit_price,
-            qty=trade["qty"],
-            lot=trade["lot_size"],
+            qty=trade.qty,
+            lot=trade.lot_size,
             pnl=pnl,
             capital_after=risk_module.capital,
         )
 
     def has_open_position(self, index_symbol: str) -> bool:
         """Check if there's an open position for this index."""
-        return any(t["index"] == index_symbol for t in self.open_positions)
+        return index_symbol in self._by_index
@@ -0,0 +1,122 @@
+"""
+pricefeed_module.py - Push-based option price feed.
+Responsibility: Deliver LTP ticks for subscribed contracts to listeners as soon as
+they arrive (PositionModule.on_tick), instead of once per main-loop cycle.
+No strategy logic. No trade logic.
+
+Feeds:
+    LocalPriceFeed    in-process stand-in: push(contract, ltp) delivers immediately
+    PollingPriceFeed  background thread polling batched LTPs every FEED_POLL_SECONDS
+"""
+
+import threading
+
+import config
+from metrics_module import METRICS
+
+
+class PriceFeed:
+    """
+    Base feed: a subscription set and tick listeners.
+    Listeners are called as listener(contract, ltp) on the feed's thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribed = set()
+        self._listeners = []
+
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def subscribe(self, contracts):
+        with self._lock:
+            self._subscribed.update(contracts)
+
+    def unsubscribe(self, contracts):
+        with self._lock:
+            self._subscribed.difference_update(contracts)
+
+    def subscribed(self) -> list:
+        with self._lock:
+            return sorted(self._subscribed)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def _emit(self, contract: str, ltp: float):
+        """Hand one tick to every listener (only for subscribed contracts)."""
+        with self._lock:
+            if contract not in self._subscribed:
+                return
+            listeners = list(self._listeners)
+        with METRICS.timer("feed.tick"):
+            for listener in listeners:
+                try:
+                    listener(contract, ltp)
+                except Exception as e:
+                    print(f"  [Feed] Listener error on {contract}: {e}")
+
+
+class LocalPriceFeed(PriceFeed):
+    """Ticks are pushed by the caller (tests, replays) and delivered synchronously."""
+
+    def push(self, contract: str, ltp: float):
+        self._emit(contract, float(ltp))
+
+
+class PollingPriceFeed(PriceFeed):
+    """
+    Polls LTPs of the subscribed contracts with one batched request per
+    FEED_POLL_SECONDS (fetch: contracts -> {contract: ltp}, e.g.
+    PositionModule.get_option_ltps) and emits only prices that changed.
+    """
+
+    def __init__(self, fetch, poll_seconds: float = None):
+        super().__init__()
+        self.fetch = fetch
+        self.poll_seconds = config.FEED_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self._last = {}  # contract -> last emitted ltp
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll_loop, name="price-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def unsubscribe(self, contracts):
+        with self._lock:
+            self._subscribed.difference_update(contracts)
+            for contract in contracts:
+                self._last.pop(contract, None)
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            contracts = self.subscribed()
+            if contracts:
+                try:
+                    ltps = self.fetch(contracts)
+                except Exception as e:
+                    print(f"  [Feed] Poll error: {e}")
+                    ltps = {}
+                for contract, ltp in ltps.items():
+                    # Only subscribed contracts are remembered (one may be
+                    # unsubscribed while its poll is in flight)
+                    with self._lock:
+                        changed = contract in self._subscribed and self._last.get(contract) != ltp
+                        if changed:
+                            self._last[contract] = ltp
+                    if changed:
+                        self._emit(contract, ltp)
+            self._stop.wait(self.poll_seconds)
@@ -0,0 +1,182 @@
+"""
+ratelimit_module.py - Shared client-side rate limiting.
+Responsibility: Pace every broker data call through per-endpoint-group token buckets,
+let position-management LTP calls jump the queue, and back off (jittered, exponential,
+shared by all threads) when the broker throttles. No strategy logic. No trade logic.
+"""
+
+import contextlib
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+from growwapi.groww.exceptions import GrowwAPIRateLimitException
+
+import config
+from methods_module import METHOD_GROUPS
+from metrics_module import METRICS
+
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def urgent():
+    """
+    Calls made by this thread inside the block are position-management calls:
+    they may use the reserved tokens and are served before waiting scan calls.
+    Also usable as a decorator (@urgent()).
+    """
+    previous = getattr(_local, "urgent", False)
+    _local.urgent = True
+    try:
+        yield
+    finally:
+        _local.urgent = previous
+
+
+def is_urgent() -> bool:
+    return getattr(_local, "urgent", False)
+
+
+class WindowBucket:
+    """
+    `count` tokens per `period` seconds. A token comes back exactly `period`
+    after it was used, so no window of that length ever holds more than
+    `count` calls (a refill-rate bucket lets up to twice that through).
+    """
+
+    __slots__ = ("count", "period", "used")
+
+    def __init__(self, count: int, period: float):
+        self.count = count
+        self.period = period
+        self.used = deque()  # send times inside the current window, oldest first
+
+    def refill(self, now: float):
+        while self.used and self.used[0] <= now - self.period:
+            self.used.popleft()
+
+    def time_until(self, tokens: int, now: float) -> float:
+        """Seconds until `tokens` are free (after refill)."""
+        free = self.count - len(self.used)
+        if free >= tokens:
+            return 0.0
+        return self.used[tokens - free - 1] + self.period - now
+
+    def take(self, now: float):
+        self.used.append(now)
+
+
+class RateLimiter:
+    """
+    One set of buckets per group, e.g. live_data: 10/s and 300/min.
+    A call takes a token from every bucket of its group.
+
+    Normal calls leave `reserve` tokens in each bucket and wait while an
+    urgent call is waiting, so position LTPs are never starved by scans.
+    A bucket with no more than `reserve` tokens keeps count - 1 back, so
+    normal calls still get one when it is full.
+    throttled() pauses a whole group, so every thread backs off together.
+    """
+
+    def __init__(self, limits: dict = None, reserve: int = None, clock=time.monotonic):
+        self.clock = clock
+        self.reserve = config.RATE_LIMIT_RESERVE if reserve is None else reserve
+        self._buckets = {
+            group: [WindowBucket(count, period) for count, period in windows]
+            for group, windows in (limits or config.RATE_LIMITS).items()
+        }
+        for group, buckets in self._buckets.items():
+            for bucket in buckets:
+                if bucket.count < 1 or bucket.period <= 0:
+                    raise ValueError(f"{group}: rate limit {bucket.count}/{bucket.period}s never lets a call through")
+        self._paused_until = defaultdict(float)
+        self._urgent_waiting = defaultdict(int)
+        self._cond = threading.Condition()
+
+    def acquire(self, group: str, urgent: bool = False) -> float:
+        """Block until a call in group may go out. Returns seconds waited."""
+        buckets = self._buckets.get(group)
+        if not buckets:
+            return 0.0
+
+        start = self.clock()
+        waited = False
+        need = 1 if urgent else 1 + self.reserve
+        with self._cond:
+            if urgent:
+                self._urgent_waiting[group] += 1
+            try:
+                while True:
+                    now = self.clock()
+                    for bucket in buckets:
+                        bucket.refill(now)
+                    wait = max(
+                        [self._paused_until[group] - now]
+                        + [bucket.time_until(min(need, bucket.count), now) for bucket in buckets]
+                    )
+                    blocked = not urgent and self._urgent_waiting[group] > 0
+                    if wait <= 0 and not blocked:
+                        for bucket in buckets:
+                            bucket.take(now)
+                        return now - start if waited else 0.0
+                    # Woken early by notify_all when an urgent call leaves
+                    self._cond.wait(timeout=wait if wait > 0 else 0.01)
+                    waited = True
+            finally:
+                if urgent:
+                    self._urgent_waiting[group] -= 1
+                    self._cond.notify_all()
+
+    def throttled(self, group: str, delay: float):
+        """Broker rejected a call: pause group for delay."""
+        with self._cond:
+            self._paused_until[group] = max(self._paused_until[group], self.clock() + delay)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter: half fixed, half random."""
+    delay = min(config.RATE_LIMIT_BACKOFF_MAX, config.RATE_LIMIT_BACKOFF_BASE * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _is_throttle(error: Exception) -> bool:
+    return isinstance(error, GrowwAPIRateLimitException) or str(getattr(error, "code", "")) == "429"
+
+
+class RateLimitedClient:
+    """
+    Wraps a client so every data call waits for its group's bucket and is
+    retried with backoff (up to RATE_LIMIT_MAX_RETRIES) when throttled.
+    Share one instance between all modules and threads.
+    """
+
+    def __init__(self, groww, limiter: RateLimiter = None):
+        self.groww = groww
+        self.limiter = limiter or RateLimiter()
+
+    def __getattr__(self, name):
+        group = METHOD_GROUPS.get(name)
+        if group is None:
+            return getattr(self.groww, name)
+        method = getattr(self.groww, name)
+
+        def call(*args, **kwargs):
+            attempt = 0
+            while True:
+                waited = self.limiter.acquire(group, is_urgent())
+                if waited > 0:
+                    METRICS.record(f"ratelimit.wait.{group}", waited)
+                try:
+                    return method(*args, **kwargs)
+                except Exception as e:
+                    if not _is_throttle(e) or attempt >= config.RATE_LIMIT_MAX_RETRIES:
+                        raise
+                    delay = backoff_delay(attempt)
+                    self.limiter.throttled(group, delay)
+                    METRICS.record(f"ratelimit.throttled.{group}", delay)
+                    print(f"  [RateLimit] {name} throttled, retry {attempt + 1} in {delay:.2f}s")
+                    attempt += 1
+
+        return call
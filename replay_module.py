@@ -0,0 +1,258 @@
+"""
+replay_module.py - Record and replay of broker API traffic.
+Responsibility: Journal every get_historical_candles / get_ltp / get_quote /
+get_expiries / get_contracts request and response to a gzip JSON-lines file, and
+serve a journal back through a client with the GrowwAPI interface, so a session
+can be rerun offline. No strategy logic. No trade logic.
+
+Journal line: {"m": method, "k": call args, "r": response | "e": error, "s": seconds,
+               "t": epoch time of the call}
+
+Replays run on a virtual clock (ReplayClock) built from the recorded call times,
+so a session replays in seconds instead of in real time.
+"""
+
+import atexit
+import bisect
+import datetime
+import gzip
+import inspect
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from growwapi import GrowwAPI
+from growwapi.groww import exceptions as groww_exceptions
+from growwapi.groww.exceptions import GrowwAPIException
+
+import config
+from candle_module import IST
+from methods_module import METHODS
+
+# Arguments that depend on the wall clock, not on what is being asked for
+_TIME_ARGS = ("start_time", "end_time", "timeout")
+
+
+def _call_args(method: str, args: tuple, kwargs: dict) -> dict:
+    """Bind a call to GrowwAPI's signature: {param: value}, tuples as lists."""
+    bound = inspect.signature(getattr(GrowwAPI, method)).bind(None, *args, **kwargs)
+    call = dict(bound.arguments)
+    call.pop("self")
+    return {
+        name: list(value) if isinstance(value, tuple) else value
+        for name, value in call.items()
+    }
+
+
+def _request_key(method: str, call: dict) -> str:
+    """Replay lookup key: method plus every argument except the time window."""
+    fields = {name: value for name, value in call.items() if name not in _TIME_ARGS}
+    return method + json.dumps(fields, sort_keys=True, separators=(",", ":"))
+
+
+class RecordingClient:
+    """
+    Wraps a live client (GrowwAPI, SyncClientView) and appends each of the
+    five data calls to a journal. Everything else passes through unchanged.
+    Safe to share between scan threads. The journal is closed at exit.
+    """
+
+    def __init__(self, groww, journal_file: str):
+        self.groww = groww
+        self.journal_file = journal_file
+        self._lock = threading.Lock()
+        self._journal = gzip.open(journal_file, "at", encoding="utf-8")
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        if name not in METHODS:
+            return getattr(self.groww, name)
+        method = getattr(self.groww, name)
+
+        def call(*args, **kwargs):
+            entry = {"m": name, "k": _call_args(name, args, kwargs), "t": round(time.time(), 3)}
+            start = time.perf_counter()
+            try:
+                response = method(*args, **kwargs)
+                entry["r"] = response
+                return response
+            except Exception as e:
+                entry["e"] = {
+                    "type": type(e).__name__,
+                    "msg": getattr(e, "msg", str(e)),
+                    "code": getattr(e, "code", None),
+                }
+                raise
+            finally:
+                entry["s"] = round(time.perf_counter() - start, 4)
+                self._write(entry)
+
+        return call
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            if not self._journal.closed:
+                self._journal.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
+
+
+def _read_journal(journal_file: str):
+    """Journal entries in recorded order (a journal cut short ends early)."""
+    with gzip.open(journal_file, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, json.JSONDecodeError):
+            # Journal cut short (recorder killed): keep what was complete
+            print(f"[Replay] Journal truncated: {journal_file}")
+
+
+class ReplayClock:
+    """
+    Virtual time of a replay. Starts at the first recorded call and moves
+    with the recorded times of the calls served. advance() stands in for the
+    engine's sleeps: it moves the clock on by the sleep, or straight to the
+    next recorded call when nothing was recorded in between (waits, nights).
+    """
+
+    def __init__(self, times: list):
+        self._times = sorted(times)
+        self._now = self._times[0]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_journals(cls, journal_files: list):
+        """Clock over every call in the journals; None if none has call times."""
+        times = [
+            entry["t"]
+            for journal_file in journal_files
+            for entry in _read_journal(journal_file)
+            if "t" in entry
+        ]
+        return cls(times) if times else None
+
+    def now(self) -> datetime.datetime:
+        """Current replay time (IST, timezone-aware like get_ist_now)."""
+        with self._lock:
+            return datetime.datetime.fromtimestamp(self._now, IST)
+
+    def observe(self, t: float):
+        """A call recorded at t was served: time does not run backwards."""
+        with self._lock:
+            if t > self._now:
+                self._now = t
+
+    def advance(self, seconds: float) -> bool:
+        """Pass `seconds` of replay time. False once no recorded call is left."""
+        with self._lock:
+            upcoming = bisect.bisect_right(self._times, self._now)
+            if upcoming == len(self._times):
+                return False
+            self._now = max(self._now + seconds, self._times[upcoming])
+            return True
+
+
+class ReplayClient:
+    """
+    Serves a recorded journal with the GrowwAPI interface and constants.
+
+    Requests are matched on method and arguments, ignoring start/end times
+    (the candle cache asks for windows relative to the clock). Each key is a
+    FIFO in recorded order; once exhausted the last response is repeated.
+    Unrecorded requests raise LookupError.
+
+    latency: None (no delay), "recorded" (sleep the recorded duration) or
+    seconds to sleep per call. clock is the journal's ReplayClock (None for
+    journals without call times).
+    """
+
+    def __init__(self, journal_file: str, latency=None):
+        self.journal_file = journal_file
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries = defaultdict(deque)
+        self._last = {}
+        self.calls = 0
+
+        times = []
+        for entry in _read_journal(journal_file):
+            self._entries[_request_key(entry["m"], entry["k"])].append(entry)
+            if "t" in entry:
+                times.append(entry["t"])
+        # Journals recorded before call times were kept replay on the wall clock
+        self.clock = ReplayClock(times) if times else None
+
+    def __getattr__(self, name):
+        # Constants (EXCHANGE_NSE, SEGMENT_FNO, CANDLE_INTERVAL_MIN_15, ...)
+        if name.isupper():
+            return getattr(GrowwAPI, name)
+        raise AttributeError(name)
+
+    def _replay(self, method: str, args: tuple, kwargs: dict) -> dict:
+        key = _request_key(method, _call_args(method, args, kwargs))
+        with self._lock:
+            self.calls += 1
+            queue = self._entries.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+        if entry is None:
+            raise LookupError(f"No recorded response for {key}")
+        if self.clock is not None and "t" in entry:
+            self.clock.observe(entry["t"])
+
+        if self.latency == "recorded":
+            time.sleep(entry.get("s", 0.0))
+        elif self.latency:
+            time.sleep(self.latency)
+
+        if "e" in entry:
+            raise self._error(entry["e"])
+        return entry["r"]
+
+    @staticmethod
+    def _error(error: dict) -> Exception:
+        """Rebuild the recorded exception (GrowwAPI's mapped types where possible)."""
+        cls = getattr(groww_exceptions, error["type"], None)
+        if cls in GrowwAPI._ERROR_MAP.values():
+            return cls()
+        if cls is not None and issubclass(cls, GrowwAPIException):
+            return GrowwAPIException(msg=error["msg"], code=error["code"])
+        return RuntimeError(f"{error['type']}: {error['msg']}")
+
+    def get_historical_candles(self, *args, **kwargs) -> dict:
+        return self._replay("get_historical_candles", args, kwargs)
+
+    def get_ltp(self, *args, **kwargs) -> dict:
+        return self._replay("get_ltp", args, kwargs)
+
+    def get_quote(self, *args, **kwargs) -> dict:
+        return self._replay("get_quote", args, kwargs)
+
+    def get_expiries(self, *args, **kwargs) -> dict:
+        return self._replay("get_expiries", args, kwargs)
+
+    def get_contracts(self, *args, **kwargs) -> dict:
+        return self._replay("get_contracts", args, kwargs)
+
+
+def make_client(token: str = None):
+    """
+    Client for the engines per config: ReplayClient when REPLAY_JOURNAL is
+    set, GrowwAPI wrapped in a RecordingClient when RECORD_JOURNAL is set,
+    else plain GrowwAPI.
+    """
+    if config.REPLAY_JOURNAL:
+        return ReplayClient(config.REPLAY_JOURNAL, config.REPLAY_LATENCY)
+    groww = GrowwAPI(token)
+    if config.RECORD_JOURNAL:
+        return RecordingClient(groww, config.RECORD_JOURNAL)
+    return groww
@@ -0,0 +1,85 @@
+"""
+resample_module.py - Local multi-timeframe candles.
+Responsibility: Build higher-timeframe bars (15M -> 1H, 1M -> 15M -> 1H) from one
+base-interval candle stream, aligned to the NSE session (bars start at 09:15, the
+last bar of the day is cut at 15:30). No fetching. No indicator logic.
+"""
+
+import datetime
+
+from candle_module import candle_time
+from scheduler_module import session_bounds
+
+
+def bucket_start(t: datetime.datetime, minutes: int) -> datetime.datetime:
+    """Start of the session-aligned `minutes` bar that contains t."""
+    session_open, _ = session_bounds(t)
+    elapsed = (t - session_open).total_seconds() // 60
+    return session_open + datetime.timedelta(minutes=(elapsed // minutes) * minutes)
+
+
+def resample(candles: list, minutes: int) -> list:
+    """
+    Aggregate base candles ([ts, o, h, l, c, v(, oi)], oldest first) into
+    `minutes` bars: first open, max high, min low, last close, summed volume
+    (None if no base bar has one), last oi. Timestamps are ISO bar starts.
+    The last bar holds whatever base bars exist so far (partial or forming).
+    """
+    bars = []
+    current_start = None
+    for c in candles:
+        start = bucket_start(candle_time(c), minutes)
+        volume = c[5] if len(c) > 5 else None
+        if start != current_start:
+            current_start = start
+            bar = [start.strftime("%Y-%m-%dT%H:%M:%S"), c[1], c[2], c[3], c[4], volume]
+            if len(c) > 6:
+                bar.append(c[6])
+            bars.append(bar)
+            continue
+        bar = bars[-1]
+        if c[2] > bar[2]:
+            bar[2] = c[2]
+        if c[3] < bar[3]:
+            bar[3] = c[3]
+        bar[4] = c[4]
+        if volume is not None:
+            bar[5] = volume if bar[5] is None else bar[5] + volume
+        if len(c) > 6:
+            bar[6:] = [c[6]]
+    return bars
+
+
+class Resampler:
+    """
+    Incremental resample() per (key, minutes). Base history only grows at the
+    end (CandleCache), so only base bars from the start of the last output bar
+    on are aggregated again; a changed first base bar rebuilds the series.
+    """
+
+    def __init__(self):
+        # (key, minutes) -> (first base time, base index of the last bar's start, bars)
+        self._series = {}
+
+    def get(self, key: str, candles: list, minutes: int) -> list:
+        if not candles:
+            return []
+        first_time = candle_time(candles[0])
+        entry = self._series.get((key, minutes))
+        if entry is None or entry[0] != first_time or entry[1] > len(candles):
+            done, bars = 0, []
+        else:
+            _, done, bars = entry
+            bars = bars[:-1]  # the last bar may have grown
+
+        tail = resample(candles[done:], minutes)
+        bars = bars + tail
+
+        # Base index where the (possibly still growing) last bar starts
+        last_start = candle_time(bars[-1])
+        done = len(candles)
+        while done > 0 and candle_time(candles[done - 1]) >= last_start:
+            done -= 1
+
+        self._series[(key, minutes)] = (first_time, done, bars)
+        return bars
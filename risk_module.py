@@ -8,21 +8,25 @@ import config
 
 
 class RiskModule:
-    def __init__(self):
-        self.capital = config.INITIAL_CAPITAL
-        self.start_of_day_capital = config.INITIAL_CAPITAL
+    def __init__(self, position_module, cfg=config):
+        if position_module is None:
+            raise ValueError("RiskModule needs the PositionModule for the one-trade-per-index rule")
+        self.cfg = cfg  # config module or an isolated copy (sweeps)
+        # Open trades per index are read from the PositionModule (no copy kept here)
+        self.position_module = position_module
+        self.capital = cfg.INITIAL_CAPITAL
+        self.start_of_day_capital = cfg.INITIAL_CAPITAL
         self.daily_trades = 0
         self.consecutive_losses = {}  # per index
-        self.open_indices = set()     # indices with open trades
 
-        for idx in config.INDEX_LIST:
+        for idx in cfg.INDEX_LIST:
             self.consecutive_losses[idx] = 0
 
     def reset_daily(self):
         """Reset daily counters at market open."""
         self.daily_trades = 0
         self.start_of_day_capital = self.capital
-        for idx in config.INDEX_LIST:
+        for idx in self.cfg.INDEX_LIST:
             self.consecutive_losses[idx] = 0
         print("[Risk] Daily counters reset.")
 
@@ -36,21 +40,21 @@ class RiskModule:
         - One open trade per index
         """
         # Max trades per day
-        if self.daily_trades >= config.MAX_TRADES_PER_DAY:
+        if self.daily_trades >= self.cfg.MAX_TRADES_PER_DAY:
             return False
 
         # Max consecutive losses per index
-        if self.consecutive_losses.get(index_symbol, 0) >= config.MAX_CONSECUTIVE_LOSSES:
+        if self.consecutive_losses.get(index_symbol, 0) >= self.cfg.MAX_CONSECUTIVE_LOSSES:
             return False
 
         # Daily drawdown limit
         drawdown = (self.start_of_day_capital - self.capital) / self.start_of_day_capital
-        if drawdown >= config.MAX_DAILY_DRAWDOWN_PCT:
+        if drawdown >= self.cfg.MAX_DAILY_DRAWDOWN_PCT:
             print(f"[Risk] Daily drawdown limit reached: {drawdown:.2%}")
             return False
 
         # One open trade per index
-        if index_symbol in self.open_indices:
+        if self.position_module.has_open_position(index_symbol):
             return False
 
         return True
@@ -67,7 +71,7 @@ class RiskModule:
             return None
 
         # Calculate stop distance
-        atr_stop_distance = config.ATR_STOP_MULTIPLIER * atr
+        atr_stop_distance = self.cfg.ATR_STOP_MULTIPLIER * atr
         structure_stop_distance = abs(entry_price - structure_stop)
         stop_distance = max(atr_stop_distance, structure_stop_distance)
 
@@ -78,7 +82,7 @@ class RiskModule:
         stop_price = entry_price - stop_distance
 
         # Risk amount = 2% of capital
-        risk_amount = self.capital * config.RISK_PER_TRADE_PCT
+        risk_amount = self.capital * self.cfg.RISK_PER_TRADE_PCT
 
         # Quantity calculation (must be multiple of lot size)
         risk_per_unit = stop_distance
@@ -93,7 +97,7 @@ class RiskModule:
             qty = lots * lot_size
 
         # Target at 3R
-        target_price = entry_price + (stop_distance * config.TARGET_R)
+        target_price = entry_price + (stop_distance * self.cfg.TARGET_R)
 
         return {
             "qty": qty,
@@ -107,12 +111,10 @@ class RiskModule:
     def register_trade_opened(self, index_symbol: str):
         """Record that a trade was opened."""
         self.daily_trades += 1
-        self.open_indices.add(index_symbol)
 
     def register_trade_closed(self, index_symbol: str, pnl: float):
         """Record trade result and update capital."""
         self.capital += pnl
-        self.open_indices.discard(index_symbol)
 
         if pnl < 0:
             self.consecutive_losses[index_symbol] = self.consecutive_losses.get(index_symbol, 0) + 1
@@ -0,0 +1,68 @@
+"""
+scheduler_module.py - Bar-close alignment.
+Responsibility: Work out which NSE session bars have closed (09:15 aligned, partial
+last bar at 15:30) so trend/entry are evaluated once per closed bar.
+No strategy logic. No trade logic.
+"""
+
+import datetime
+
+import config
+from candle_module import ist_now
+
+# Candle interval string -> minutes
+INTERVAL_MINUTES = {
+    "1minute": 1,
+    "5minute": 5,
+    "15minute": 15,
+    "30minute": 30,
+    "1hour": 60,
+}
+
+
+def session_bounds(day: datetime.datetime):
+    """(open, close) of the NSE session on day's date, naive IST."""
+    session_open = day.replace(
+        hour=config.MARKET_OPEN_HOUR, minute=config.MARKET_OPEN_MINUTE,
+        second=0, microsecond=0,
+    )
+    session_close = day.replace(
+        hour=config.MARKET_CLOSE_HOUR, minute=config.MARKET_CLOSE_MINUTE,
+        second=0, microsecond=0,
+    )
+    return session_open, session_close
+
+
+def last_bar_close(now: datetime.datetime, minutes: int) -> datetime.datetime:
+    """
+    Close time of the most recent closed bar of `minutes` length.
+    Bars start at 09:15; the last bar of the day is cut at 15:30.
+    Before 09:15 this is today's open (i.e. yesterday's bars are all closed).
+    Every bar with start < this time is closed.
+    """
+    session_open, session_close = session_bounds(now)
+    if now <= session_open:
+        return session_open
+    if now >= session_close:
+        return session_close
+
+    elapsed = (now - session_open).total_seconds() // 60
+    bars_closed = int(elapsed // minutes)
+    return session_open + datetime.timedelta(minutes=bars_closed * minutes)
+
+
+class BarScheduler:
+    """
+    Tracks the last closed bar per interval. bar_close() is the memo key for
+    per-bar evaluation.
+    """
+
+    def __init__(self, clock=None, settle_seconds: float = None):
+        self.clock = clock or ist_now
+        # Wait this long after a close so the broker has the final bar
+        self.settle = datetime.timedelta(
+            seconds=config.BAR_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        )
+
+    def bar_close(self, interval: str) -> datetime.datetime:
+        return last_bar_close(self.clock() - self.settle, INTERVAL_MINUTES[interval])
@@ -0,0 +1,397 @@
+"""
+shard_engine.py - Sharded multi-process scanner.
+Responsibility: Split the scan universe (SCAN_UNIVERSE) into shards, run the
+trend -> chain -> entry pipeline of each shard in its own worker process, and merge
+the candidate signals in this coordinator process, which alone owns RiskModule and
+PositionModule state. Per-shard cycle times are reported and used to rebalance.
+No strategy logic. No risk calculation.
+
+Rate limits: the coordinator keeps a RATE_LIMIT_RESERVE-sized share of every window for
+position LTPs and the price feed; the workers share the rest of each broker limit evenly.
+
+Usage: python shard_engine.py [--shards N]
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import queue
+import signal
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from trend_module import TrendModule
+from entry_module import EntryModule
+from risk_module import RiskModule
+from position_module import PositionModule
+from logger_module import LoggerModule
+from tradestore_module import TradeStore
+from candlestore_module import CandleStore
+from snapshot_module import SnapshotModule
+from chain_module import ChainModule
+from scheduler_module import BarScheduler
+from replay_module import ReplayClock, make_client
+from metrics_module import METRICS, stage
+from ratelimit_module import RateLimiter
+from universe_module import load_universe, apply_universe
+from main_engine import (
+    get_api_token,
+    get_ist_now_naive,
+    use_replay_clock,
+    pause,
+    is_market_hours,
+    is_daily_reset_time,
+    bar_closes,
+    scan_index,
+    open_from_signals,
+    start_price_feed,
+    export_metrics,
+    wrap_client,
+)
+
+
+def split_limits(shards: int):
+    """
+    (coordinator_limits, worker_limits) shares of config.RATE_LIMITS.
+    The coordinator gets RATE_LIMIT_RESERVE calls per shortest window, scaled
+    to each longer window (live_data 10/s, 300/min -> 2/s, 60/min); the
+    workers split the rest evenly.
+    """
+    coordinator, worker = {}, {}
+    for group, windows in config.RATE_LIMITS.items():
+        shortest = min(windows, key=lambda window: window[1])[0]
+        shares = [max(1, config.RATE_LIMIT_RESERVE * count // shortest) for count, _ in windows]
+        coordinator[group] = [(share, period) for share, (_, period) in zip(shares, windows)]
+        worker[group] = [
+            (max(1, (count - share) // shards), period)
+            for share, (count, period) in zip(shares, windows)
+        ]
+    return coordinator, worker
+
+
+def config_snapshot() -> dict:
+    """Uppercase config values, so spawned workers run with the coordinator's config."""
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+def shard_worker(shard_id: int, settings: dict, limits: dict, token, commands, results):
+    """
+    Worker process: per command (cycle, indices, bias_bar, entry_bar, reset)
+    scan the given indices and reply (shard_id, cycle, signals, costs, seconds).
+    signals: {index: [(contract, candle_data)]}; costs: {index: scan seconds}.
+    None stops the worker. Ctrl+C is left to the coordinator.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for name, value in settings.items():
+        setattr(config, name, value)
+    # One journal file per process: a sharded recording replays per shard
+    # (a single-process journal, without shard files, is replayed by every shard)
+    if config.RECORD_JOURNAL:
+        config.RECORD_JOURNAL = f"{config.RECORD_JOURNAL}.shard{shard_id}"
+    if config.REPLAY_JOURNAL and os.path.exists(f"{config.REPLAY_JOURNAL}.shard{shard_id}"):
+        config.REPLAY_JOURNAL = f"{config.REPLAY_JOURNAL}.shard{shard_id}"
+
+    client = make_client(token)
+    # Replay time follows the calls this worker serves from its journal
+    use_replay_clock(getattr(client, "clock", None))
+    groww = wrap_client(client, RateLimiter(limits, reserve=0))
+    # Own store per shard: CandleStore's index is not shared between processes
+    candle_store = None
+    if config.CANDLE_STORE_DIR:
+        candle_store = CandleStore(os.path.join(config.CANDLE_STORE_DIR, f"shard{shard_id}"), get_ist_now_naive)
+    trend_module = TrendModule(groww, candle_store, clock=get_ist_now_naive)
+    entry_module = EntryModule(groww, candle_store, clock=get_ist_now_naive)
+    if candle_store is not None:
+        candle_store.prune()
+    chain_module = ChainModule(groww)
+    snapshot_module = SnapshotModule(groww)
+    strike_pool = ThreadPoolExecutor(max_workers=config.STRIKE_WORKERS) if config.CONCURRENT_SCAN else None
+
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+        cycle, indices, bias_bar, entry_bar, reset = command
+        if reset:
+            chain_module.clear()
+            if candle_store is not None:
+                candle_store.prune()
+
+        start = time.perf_counter()
+        signals, costs = {}, {}
+        try:
+            # Positions live in the coordinator: index LTPs only
+            snapshot = snapshot_module.take(indices)
+            for index_symbol in indices:
+                index_start = time.perf_counter()
+                try:
+                    found = scan_index(index_symbol, snapshot, trend_module, entry_module,
+                                       chain_module, strike_pool, bias_bar, entry_bar)
+                    if found:
+                        signals[index_symbol] = found
+                except Exception as e:
+                    print(f"  [Shard {shard_id}] Scan error for {index_symbol}: {e}")
+                costs[index_symbol] = time.perf_counter() - index_start
+        except Exception as e:
+            print(f"  [Shard {shard_id}] Cycle error: {e}")
+        results.put((shard_id, cycle, signals, costs, time.perf_counter() - start))
+
+    if strike_pool is not None:
+        strike_pool.shutdown(wait=False)
+
+
+class ShardCoordinator:
+    """
+    Starts one worker per shard and fans each cycle's tradeable indices out
+    to them. Shards start as round-robin splits of the universe; rebalance()
+    re-splits them by smoothed per-index scan time.
+    """
+
+    def __init__(self, universe: list, shards: int, token=None):
+        self.universe = list(universe)
+        self.shards = max(1, min(shards, len(self.universe)))
+        self.assignment = [self.universe[i::self.shards] for i in range(self.shards)]
+        self.costs = {}                         # index -> smoothed scan seconds
+        self.shard_seconds = [None] * self.shards  # last cycle's time per shard
+        self.cycle = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._settings = config_snapshot()
+        _, self._limits = split_limits(self.shards)
+        self._token = token
+        self.results = self._context.Queue()
+        self.commands = [None] * self.shards
+        self.workers = [None] * self.shards
+        for shard in range(self.shards):
+            self._start_worker(shard)
+
+    def _start_worker(self, shard: int):
+        """(Re)start one shard's process, with a fresh command queue."""
+        self.commands[shard] = self._context.Queue()
+        self.workers[shard] = self._context.Process(
+            target=shard_worker,
+            args=(shard, self._settings, self._limits, self._token, self.commands[shard], self.results),
+            name=f"shard-{shard}",
+            daemon=True,
+        )
+        self.workers[shard].start()
+
+    def _restart_dead(self, shards) -> list:
+        """Restart workers among shards that have exited. Returns their ids."""
+        dead = [shard for shard in shards if not self.workers[shard].is_alive()]
+        for shard in dead:
+            print(f"[Shard] Worker {shard} exited (code {self.workers[shard].exitcode}), restarting")
+            self._start_worker(shard)
+        return dead
+
+    def scan(self, indices: list, bias_bar=None, entry_bar=None, reset: bool = False) -> dict:
+        """
+        Scan indices on their shards. Returns {index: signals} from the shards
+        that replied within SHARD_TIMEOUT_SECONDS; late replies are dropped.
+        Workers that have exited are restarted (their indices are skipped for
+        the cycle they died in). reset clears the workers' chain caches and
+        prunes their candle stores (daily reset).
+        """
+        self.cycle += 1
+        self._restart_dead(range(self.shards))
+        wanted = set(indices)
+        pending = set()
+        for shard, assigned in enumerate(self.assignment):
+            shard_indices = [idx for idx in assigned if idx in wanted]
+            if shard_indices or reset:
+                self.commands[shard].put((self.cycle, shard_indices, bias_bar, entry_bar, reset))
+                pending.add(shard)
+            else:
+                self.shard_seconds[shard] = 0.0
+
+        signals = {}
+        deadline = time.monotonic() + config.SHARD_TIMEOUT_SECONDS
+        while pending:
+            remaining = deadline - time.monotonic()
+            try:
+                # Short waits, so a crashed worker is noticed without the full timeout
+                shard, cycle, found, costs, seconds = self.results.get(timeout=max(0.0, min(remaining, 1.0)))
+            except queue.Empty:
+                for shard in self._restart_dead(pending):
+                    pending.discard(shard)
+                    self.shard_seconds[shard] = None
+                if pending and remaining <= 1.0:
+                    print(f"[Shard] No reply from shard(s) {sorted(pending)} this cycle")
+                    for shard in pending:
+                        self.shard_seconds[shard] = None
+                    break
+                continue
+            if cycle != self.cycle:
+                continue  # reply to a cycle that already timed out
+
+            pending.discard(shard)
+            signals.update(found)
+            self.shard_seconds[shard] = seconds
+            METRICS.record(f"shard.{shard}", seconds)
+            for index_symbol, cost in costs.items():
+                previous = self.costs.get(index_symbol)
+                if previous is None:
+                    self.costs[index_symbol] = cost
+                else:
+                    self.costs[index_symbol] = previous + config.SHARD_COST_SMOOTHING * (cost - previous)
+        return signals
+
+    def loads(self) -> list:
+        """Expected scan seconds per shard (sum of its indices' smoothed costs)."""
+        default = statistics.mean(self.costs.values()) if self.costs else 0.0
+        return [sum(self.costs.get(idx, default) for idx in assigned) for assigned in self.assignment]
+
+    def rebalance(self) -> bool:
+        """
+        Re-split when the slowest shard's load exceeds the fastest's by
+        SHARD_REBALANCE_IMBALANCE: costliest indices first, each onto the
+        currently lightest shard. Moved indices start with cold caches.
+        Returns True if the shards changed.
+        """
+        loads = self.loads()
+        if not self.costs or max(loads) <= min(loads) * config.SHARD_REBALANCE_IMBALANCE:
+            return False
+
+        default = statistics.mean(self.costs.values())
+        ranked = sorted(self.universe, key=lambda idx: self.costs.get(idx, default), reverse=True)
+        totals = [0.0] * self.shards
+        assignment = [[] for _ in range(self.shards)]
+        for index_symbol in ranked:
+            lightest = totals.index(min(totals))
+            assignment[lightest].append(index_symbol)
+            totals[lightest] += self.costs.get(index_symbol, default)
+
+        order = {idx: i for i, idx in enumerate(self.universe)}
+        self.assignment = [sorted(assigned, key=order.get) for assigned in assignment]
+        print(f"[Shard] Rebalanced: load {self._format_loads(loads)} -> {self._format_loads(totals)}")
+        return True
+
+    @staticmethod
+    def _format_loads(loads: list) -> str:
+        return "/".join(f"{load:.2f}s" for load in loads)
+
+    def report(self) -> str:
+        """One line: last cycle time and index count per shard."""
+        parts = [
+            f"shard{i} {'timeout' if seconds is None else f'{seconds:.2f}s'} ({len(self.assignment[i])})"
+            for i, seconds in enumerate(self.shard_seconds)
+        ]
+        return f"[Shard] cycle {self.cycle}: " + " | ".join(parts)
+
+    def stop(self):
+        for commands in self.commands:
+            commands.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan the universe on sharded worker processes.")
+    parser.add_argument("--shards", type=int, default=config.SHARD_COUNT, help="Worker processes")
+    args = parser.parse_args()
+
+    print("=====================================")
+    print("Paper Bot v1.0 - Sharded Scanner")
+    print("=====================================")
+
+    token = None if config.REPLAY_JOURNAL else get_api_token()
+
+    # Coordinator: position LTPs only, on the reserved share of the rate limits
+    coordinator_limits, _ = split_limits(args.shards)
+    groww = wrap_client(make_client(token), RateLimiter(coordinator_limits, reserve=0))
+    if config.REPLAY_JOURNAL:
+        # Replay time covers the coordinator's and every shard's calls
+        journals = [config.REPLAY_JOURNAL] + sorted(glob.glob(f"{config.REPLAY_JOURNAL}.shard*"))
+        use_replay_clock(ReplayClock.from_journals(journals))
+    if config.METRICS_ENABLED and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, export_metrics)
+
+    apply_universe(load_universe(groww))
+
+    position_module = PositionModule(clock=get_ist_now_naive)
+    risk_module = RiskModule(position_module)
+    logger = TradeStore() if config.LOG_BACKEND == "columnar" else LoggerModule()
+    scheduler = BarScheduler(get_ist_now_naive) if config.BAR_CLOSE_SCHEDULING else None
+    feed = start_price_feed(groww, position_module, risk_module, logger)
+    shards = ShardCoordinator(config.INDEX_LIST, args.shards, token)
+
+    print("Initial Capital:", risk_module.capital)
+    print(f"Scanning {len(config.INDEX_LIST)} underlyings on {shards.shards} shards")
+    print("-------------------------------------\n")
+
+    daily_reset_done = False
+
+    while True:
+        try:
+            if not is_market_hours():
+                print(f"[{get_ist_now_naive().strftime('%H:%M:%S')}] Outside market hours. Waiting...")
+                daily_reset_done = False
+                if not pause(60):
+                    print("\n\nReplay finished.")
+                    break
+                continue
+
+            reset = False
+            if is_daily_reset_time() and not daily_reset_done:
+                risk_module.reset_daily()
+                daily_reset_done = True
+                reset = True
+
+            with stage("cycle"):
+                # Manage open trades every cycle (unless the feed does it per tick)
+                if feed is None:
+                    with stage("manage"):
+                        position_module.manage_positions(groww, risk_module, logger)
+
+                # Fan out the tradeable indices, then apply signals in universe order
+                with stage("scan"):
+                    bias_bar, entry_bar = bar_closes(scheduler)
+                    indices = [idx for idx in config.INDEX_LIST if risk_module.can_trade(idx)]
+                    signals = shards.scan(indices, bias_bar, entry_bar, reset)
+
+                for index_symbol in config.INDEX_LIST:
+                    found = signals.get(index_symbol)
+                    # Limits may have changed from trades opened earlier in this cycle
+                    if found and risk_module.can_trade(index_symbol):
+                        open_from_signals(index_symbol, found, risk_module, position_module)
+
+            print(shards.report())
+            if shards.cycle % config.SHARD_REBALANCE_CYCLES == 0:
+                shards.rebalance()
+
+            print(f"\nCapital: {risk_module.capital:.2f}")
+            print(f"Open Positions: {len(position_module.open_positions)}")
+            print(f"Daily Trades: {risk_module.daily_trades}")
+            print(f"Daily Drawdown: {risk_module.get_daily_drawdown_pct():.2%}")
+            print("-------------------------------------\n")
+
+        except KeyboardInterrupt:
+            print("\n\nBot stopped by user.")
+            break
+
+        except Exception as e:
+            print(f"\n[Engine] Unexpected error: {e}")
+            import traceback
+            traceback.print_exc()
+
+        if not pause(config.LOOP_SLEEP_SECONDS):
+            print("\n\nReplay finished.")
+            break
+
+    print(f"Final Capital: {risk_module.capital:.2f}")
+    print(f"Total Logged Trades: {logger.get_trade_count()}")
+    shards.stop()
+    if feed is not None:
+        feed.stop()
+    logger.close()
+    if config.METRICS_ENABLED:
+        export_metrics()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+sharedcandle_module.py - Shared-memory candle arrays.
+Responsibility: Publish candle history per (symbol, interval) as fixed-layout
+RECORD arrays in named shared memory, so other processes (dashboards, analytics,
+scanners) read the bot's candles zero-copy instead of fetching them again.
+No fetching. No indicator logic.
+
+Layout of one segment (name: <SHARED_CANDLE_PREFIX>.<interval>.<symbol>):
+    header   8 x uint64: generation, length, capacity (0 = retired), unused
+    records  capacity x RECORD (candlestore_module), oldest first
+
+One writer per segment. Writes are bracketed by the generation counter
+(seqlock): odd while a write is in progress, bumped to the next even value when
+done. Readers take the generation, use the rows, and check it is unchanged.
+A generation that stays odd (writer died mid-write) makes readers raise
+TimeoutError after SHARED_CANDLE_READ_TIMEOUT instead of waiting forever.
+"""
+
+import re
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import config
+from candlestore_module import RECORD, to_candles, to_records
+
+_HEADER_SLOTS = 8
+_HEADER_BYTES = _HEADER_SLOTS * 8
+_GENERATION, _LENGTH, _CAPACITY = 0, 1, 2
+
+_created = set()  # segment names this process writes (tracked for unlink at exit)
+
+
+def segment_name(interval: str, symbol: str, prefix: str = None) -> str:
+    """Shared memory name for one series (characters outside [A-Za-z0-9_.-] -> _)."""
+    prefix = config.SHARED_CANDLE_PREFIX if prefix is None else prefix
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", f"{prefix}.{interval}.{symbol}")
+
+
+class SharedCandleArray:
+    """
+    One (symbol, interval) segment. create=True makes (or reuses) it for the
+    writer; otherwise an existing segment is attached read-only by convention
+    (FileNotFoundError if there is none).
+    """
+
+    def __init__(self, name: str, capacity: int = None, create: bool = False):
+        self.name = name
+        self.owner = create
+        if create:
+            capacity = config.SHARED_CANDLE_CAPACITY if capacity is None else capacity
+            self._shm = self._create(name, capacity)
+            _created.add(name)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Python < 3.13 tracks attached segments too and unlinks them when
+            # the reader exits; only the writer may remove a segment.
+            if name not in _created:
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        self._header = np.ndarray((_HEADER_SLOTS,), dtype="<u8", buffer=self._shm.buf)
+        if create:
+            self._header[_CAPACITY] = capacity
+        capacity = int(self._header[_CAPACITY])
+        self._records = np.ndarray((capacity,), dtype=RECORD, buffer=self._shm.buf, offset=_HEADER_BYTES)
+
+    @staticmethod
+    def _create(name: str, capacity: int):
+        size = _HEADER_BYTES + capacity * RECORD.itemsize
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            pass
+        # Left by an earlier writer: reuse it so attached readers keep working
+        shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray((_HEADER_SLOTS,), dtype="<u8", buffer=shm.buf)
+        if shm.size >= size and header[_CAPACITY] == capacity:
+            if header[_GENERATION] % 2:
+                header[_GENERATION] += 1  # earlier writer died mid-write
+            del header
+            return shm
+        del header
+        shm.close()
+        shm.unlink()
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+    # ---------- readers ----------
+
+    @property
+    def generation(self) -> int:
+        return int(self._header[_GENERATION])
+
+    @property
+    def retired(self) -> bool:
+        """True once the writer has closed the segment."""
+        return self._header[_CAPACITY] == 0
+
+    def view(self, timeout: float = None):
+        """
+        (generation, records) where records is a zero-copy view of the stored
+        rows. The rows are only consistent if valid(generation) still holds
+        after they were used.
+        Raises TimeoutError if a write is still in progress after timeout
+        seconds (default SHARED_CANDLE_READ_TIMEOUT).
+        """
+        deadline = self._deadline(timeout)
+        while True:
+            generation = int(self._header[_GENERATION])
+            if generation % 2 == 0:
+                return generation, self._records[:int(self._header[_LENGTH])]
+            self._wait(deadline)
+
+    def valid(self, generation: int) -> bool:
+        """True if no write started since view() returned generation."""
+        return int(self._header[_GENERATION]) == generation
+
+    def read(self, timeout: float = None) -> np.ndarray:
+        """
+        Consistent copy of the stored rows (retries while the writer is busy).
+        Raises TimeoutError like view().
+        """
+        deadline = self._deadline(timeout)
+        while True:
+            generation, records = self.view(max(0.0, deadline - time.monotonic()))
+            copy = np.array(records)
+            if self.valid(generation):
+                return copy
+            self._wait(deadline)
+
+    @staticmethod
+    def _deadline(timeout: float = None) -> float:
+        timeout = config.SHARED_CANDLE_READ_TIMEOUT if timeout is None else timeout
+        return time.monotonic() + timeout
+
+    def _wait(self, deadline: float):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{self.name}: write in progress (writer busy or died mid-write)")
+        time.sleep(0)
+
+    # ---------- writer ----------
+
+    def write(self, new: np.ndarray):
+        """
+        Merge RECORD rows (oldest first) into the series, like CandleStore.write:
+        stored rows in the new rows' time range are replaced. Appending at the
+        tail only touches rows from the first new one on, so earlier rows of a
+        reader's view stay intact. Beyond capacity the oldest rows are dropped.
+        """
+        if not len(new):
+            return
+        capacity = len(self._records)
+        length = int(self._header[_LENGTH])
+        existing = self._records[:length]
+        first, last = new["time"][0], new["time"][-1]
+
+        self._header[_GENERATION] += 1  # odd: write in progress
+        try:
+            if not length or existing["time"][-1] <= last:
+                cut = int(np.searchsorted(existing["time"], first, "left"))
+                if cut + len(new) <= capacity:
+                    self._records[cut:cut + len(new)] = new
+                    self._header[_LENGTH] = cut + len(new)
+                    return
+                merged = np.concatenate([existing[:cut], new])
+            else:
+                merged = np.concatenate([
+                    existing[existing["time"] < first],
+                    new,
+                    existing[existing["time"] > last],
+                ])
+            merged = merged[-capacity:]
+            self._records[:len(merged)] = merged
+            self._header[_LENGTH] = len(merged)
+        finally:
+            self._header[_GENERATION] += 1  # even: consistent
+
+    def close(self):
+        """Detach. The writer also retires and removes the segment."""
+        if self.owner:
+            self._header[_GENERATION] += 1
+            self._header[_CAPACITY] = 0
+            self._header[_GENERATION] += 1
+        del self._header, self._records
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # a caller still holds a view; unmapped once it is released
+        if self.owner:
+            self._shm.unlink()
+            _created.discard(self.name)
+
+
+class SharedCandleWriter:
+    """
+    Publishes candle batches from CandleCache (same write() signature as
+    CandleStore) to one SharedCandleArray per (interval, symbol).
+    Only one process may write a given series.
+    """
+
+    def __init__(self, prefix: str = None, capacity: int = None):
+        self.prefix = config.SHARED_CANDLE_PREFIX if prefix is None else prefix
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._arrays = {}  # (interval, symbol) -> SharedCandleArray
+
+    def write(self, interval: str, symbol: str, candles: list, covered_from=None):
+        if not candles:
+            return
+        records = to_records(candles)
+        with self._lock:
+            array = self._arrays.get((interval, symbol))
+            if array is None:
+                array = SharedCandleArray(segment_name(interval, symbol, self.prefix),
+                                          self.capacity, create=True)
+                self._arrays[(interval, symbol)] = array
+            array.write(records)
+
+    def close(self):
+        """Retire and remove every published segment."""
+        with self._lock:
+            for array in self._arrays.values():
+                array.close()
+            self._arrays.clear()
+
+
+class SharedCandleReader:
+    """
+    Attaches to published series on first use. A retired segment (writer
+    restarted or stopped) is dropped and attached again on the next call.
+    """
+
+    def __init__(self, prefix: str = None):
+        self.prefix = config.SHARED_CANDLE_PREFIX if prefix is None else prefix
+        self._arrays = {}  # (interval, symbol) -> SharedCandleArray
+
+    def array(self, interval: str, symbol: str):
+        """The attached SharedCandleArray, or None if the series is not published."""
+        array = self._arrays.get((interval, symbol))
+        if array is not None and array.retired:
+            array.close()
+            array = None
+        if array is None:
+            try:
+                array = SharedCandleArray(segment_name(interval, symbol, self.prefix))
+            except FileNotFoundError:
+                self._arrays.pop((interval, symbol), None)
+                return None
+            self._arrays[(interval, symbol)] = array
+        return array
+
+    def read(self, interval: str, symbol: str) -> np.ndarray:
+        """
+        Consistent RECORD copy of a series (empty if not published).
+        Raises TimeoutError if its writer stalled mid-write (see view()).
+        """
+        array = self.array(interval, symbol)
+        return np.zeros(0, dtype=RECORD) if array is None else array.read()
+
+    def read_candles(self, interval: str, symbol: str) -> list:
+        """Same as read(), as a list of API-style candles."""
+        return to_candles(self.read(interval, symbol))
+
+    def generation(self, interval: str, symbol: str):
+        """Current generation of a series (None if not published), to poll for updates."""
+        array = self.array(interval, symbol)
+        return None if array is None else array.generation
+
+    def close(self):
+        for array in self._arrays.values():
+            array.close()
+        self._arrays.clear()
@@ -0,0 +1,84 @@
+"""
+snapshot_module.py - Per-cycle market snapshot.
+Responsibility: Fetch index and open-contract LTPs in bulk once per cycle and
+expose them as one read-only snapshot. No strategy logic. No trade logic.
+"""
+
+import datetime
+from types import MappingProxyType
+
+import config
+
+
+class MarketSnapshot:
+    """Read-only LTPs taken at the start of a cycle."""
+
+    __slots__ = ("_taken_at", "_index_ltps", "_option_ltps")
+
+    def __init__(self, taken_at: datetime.datetime, index_ltps: dict, option_ltps: dict):
+        object.__setattr__(self, "_taken_at", taken_at)
+        object.__setattr__(self, "_index_ltps", MappingProxyType(dict(index_ltps)))
+        object.__setattr__(self, "_option_ltps", MappingProxyType(dict(option_ltps)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MarketSnapshot is immutable")
+
+    @property
+    def taken_at(self) -> datetime.datetime:
+        return self._taken_at
+
+    @property
+    def index_ltps(self):
+        """index_symbol -> ltp (read-only mapping)."""
+        return self._index_ltps
+
+    @property
+    def option_ltps(self):
+        """contract -> ltp for open positions (read-only mapping)."""
+        return self._option_ltps
+
+    def index_ltp(self, index_symbol: str):
+        return self._index_ltps.get(index_symbol)
+
+    def option_ltp(self, contract: str):
+        return self._option_ltps.get(contract)
+
+
+class SnapshotModule:
+    def __init__(self, groww):
+        self.groww = groww
+
+    def take(self, index_symbols: list, position_module=None) -> MarketSnapshot:
+        """
+        Build the snapshot for this cycle:
+        - index LTPs in bulk get_ltp calls (CASH segment)
+        - option LTPs for all open positions (see PositionModule.get_option_ltps);
+          none without position_module (a price feed manages the positions)
+        """
+        taken_at = datetime.datetime.now()
+        index_ltps = self._get_index_ltps(index_symbols)
+        option_ltps = position_module.get_option_ltps(self.groww) if position_module is not None else {}
+        return MarketSnapshot(taken_at, index_ltps, option_ltps)
+
+    def _get_index_ltps(self, index_symbols: list) -> dict:
+        """Fetch index LTPs in chunks of LTP_BATCH_SIZE. Returns dict symbol -> ltp."""
+        ltps = {}
+        symbols = list(index_symbols)
+
+        for i in range(0, len(symbols), config.LTP_BATCH_SIZE):
+            chunk = symbols[i:i + config.LTP_BATCH_SIZE]
+            try:
+                ltp_data = self.groww.get_ltp(
+                    segment=self.groww.SEGMENT_CASH,
+                    exchange_trading_symbols=tuple(chunk),
+                )
+            except Exception as e:
+                print(f"  [Snapshot] Index LTP error for {chunk}: {e}")
+                continue
+
+            for index_symbol in chunk:
+                ltp = ltp_data.get(index_symbol)
+                if ltp is not None:
+                    ltps[index_symbol] = float(ltp)
+
+        return ltps
@@ -0,0 +1,183 @@
+"""
+sweep_engine.py - Parameter sweep over strategy constants.
+Responsibility: Expand a grid / random-search spec over config constants, run one
+backtest per point on a process pool and write a ranked results table.
+Each run gets its own config copy; the module-level config is never mutated.
+Constants the backtest reads from the global config (session hours) cannot be swept.
+
+Spec (JSON):
+    {
+      "mode": "grid",                      # or "random"
+      "samples": 50,                       # random mode only
+      "seed": 1,                           # random mode only
+      "metric": "net_pnl",                 # summary key to rank by (descending)
+      "params": {
+        "EMA_FAST": [13, 21],              # list: grid values / random choice
+        "ATR_STOP_MULTIPLIER": {"min": 1.0, "max": 2.5},           # random: uniform
+        "BREAKOUT_LOOKBACK": {"min": 3, "max": 8, "int": true}      # random: integer
+      }
+    }
+
+Usage: python sweep_engine.py DATA_DIR SPEC.json [--out sweep_results.csv] [--workers N]
+"""
+
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+import random
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from backtest_engine import Backtester, load_candle_dir
+
+# Constants read from the module-level config (scheduler_module.session_bounds)
+FIXED_CONSTANTS = (
+    "MARKET_OPEN_HOUR", "MARKET_OPEN_MINUTE",
+    "MARKET_CLOSE_HOUR", "MARKET_CLOSE_MINUTE",
+)
+
+# Constants that change how load_candle_dir splits and resamples the data
+LOADER_CONSTANTS = ("BIAS_INTERVAL", "ENTRY_INTERVAL", "BIAS_BASE_INTERVAL", "INDEX_LIST")
+
+# Per worker process: data directory and candle data per loader setting (see _init_worker)
+_WORKER_DIR = None
+_WORKER_DATA = {}
+
+
+def make_config(**overrides) -> types.SimpleNamespace:
+    """
+    Isolated copy of every constant in config, with overrides applied.
+    Unknown names and FIXED_CONSTANTS raise ValueError.
+    """
+    values = {
+        name: copy.deepcopy(getattr(config, name))
+        for name in dir(config)
+        if name.isupper()
+    }
+    for name, value in overrides.items():
+        if name not in values:
+            raise ValueError(f"Unknown config constant: {name}")
+        if name in FIXED_CONSTANTS:
+            raise ValueError(f"{name} is read from the global config and cannot be swept")
+        values[name] = value
+    return types.SimpleNamespace(**values)
+
+
+def expand_spec(spec: dict) -> list:
+    """Turn a sweep spec into a list of override dicts."""
+    params = spec.get("params", {})
+    names = list(params)
+    mode = spec.get("mode", "grid")
+
+    if mode == "grid":
+        for name in names:
+            if not isinstance(params[name], list):
+                raise ValueError(f"Grid values for {name} must be a list")
+        return [dict(zip(names, values)) for values in itertools.product(*(params[n] for n in names))]
+
+    if mode == "random":
+        rng = random.Random(spec.get("seed"))
+        points = []
+        for _ in range(spec.get("samples", 20)):
+            point = {}
+            for name in names:
+                choice = params[name]
+                if isinstance(choice, list):
+                    point[name] = rng.choice(choice)
+                elif choice.get("int"):
+                    point[name] = rng.randint(choice["min"], choice["max"])
+                else:
+                    point[name] = rng.uniform(choice["min"], choice["max"])
+            points.append(point)
+        return points
+
+    raise ValueError(f"Unknown sweep mode: {mode}")
+
+
+def _init_worker(data_dir: str):
+    """Remember the data directory; candles are loaded on first use per loader setting."""
+    global _WORKER_DIR
+    _WORKER_DIR = data_dir
+
+
+def _worker_data(cfg) -> tuple:
+    """Candle data split and resampled for cfg, loaded once per worker and setting."""
+    key = tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in (getattr(cfg, name) for name in LOADER_CONSTANTS)
+    )
+    if key not in _WORKER_DATA:
+        _WORKER_DATA[key] = load_candle_dir(_WORKER_DIR, cfg)
+    return _WORKER_DATA[key]
+
+
+def _run_point(overrides: dict) -> dict:
+    """Backtest one parameter point in a worker."""
+    cfg = make_config(**overrides)
+    try:
+        index_candles, option_candles, index_prices = _worker_data(cfg)
+        summary = Backtester(index_candles, option_candles, cfg, index_prices).run()
+        summary["error"] = ""
+    except Exception as e:
+        summary = {"error": str(e)}
+    summary["params"] = overrides
+    return summary
+
+
+def run_sweep(data_dir: str, spec: dict, workers: int = None) -> list:
+    """Run every point of spec; returns results sorted best-first by spec["metric"]."""
+    points = expand_spec(spec)
+    for point in points:
+        make_config(**point)  # validate names before starting workers
+
+    metric = spec.get("metric", "net_pnl")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_dir,)) as pool:
+        results = list(pool.map(_run_point, points))
+
+    return sorted(results, key=lambda r: r.get(metric, float("-inf")), reverse=True)
+
+
+def write_results(results: list, path: str):
+    """Write the ranked table: rank, each swept param, then summary stats."""
+    param_names = sorted({name for r in results for name in r["params"]})
+    stat_names = sorted({name for r in results for name in r if name not in ("params", "error")})
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Rank"] + param_names + stat_names + ["Error"])
+        for rank, result in enumerate(results, start=1):
+            writer.writerow(
+                [rank]
+                + [result["params"].get(name, "") for name in param_names]
+                + [result.get(name, "") for name in stat_names]
+                + [result.get("error", "")]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep strategy constants over stored candles.")
+    parser.add_argument("data_dir", help="Directory with <interval>/<symbol>.csv candle files")
+    parser.add_argument("spec", help="Sweep spec JSON file")
+    parser.add_argument("--out", default="sweep_results.csv", help="Ranked results CSV")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args()
+
+    with open(args.spec, "r") as f:
+        spec = json.load(f)
+
+    results = run_sweep(args.data_dir, spec, args.workers)
+    write_results(results, args.out)
+
+    metric = spec.get("metric", "net_pnl")
+    print(f"[Sweep] {len(results)} runs -> {args.out}")
+    for result in results[:5]:
+        print(f"  {metric}={result.get(metric)} {result['params']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Backtester signals and trend against the live EntryModule and TrendModule."""
+
+import datetime
+import random
+
+import pytest
+
+import config
+from backtest_engine import Backtester
+from benchmark_engine import SyntheticGroww
+from entry_module import EntryModule
+from trend_module import TrendModule
+
+INDEX = "NSE_NIFTY"
+CONTRACTS = ["NSE-NIFTY-30Jun26-25000-CE", "NSE-NIFTY-30Jun26-25000-PE"]
+SETTLE = datetime.timedelta(seconds=config.BAR_SETTLE_SECONDS)
+
+
+def _sessions(days: int, minutes: int, seed: int, price: float) -> list:
+    """Random-walk candles for `days` weekdays from 2026-06-01 (last bar of a day cut at 15:30)."""
+    rng = random.Random(seed)
+    candles = []
+    day = datetime.date(2026, 6, 1)
+    while days:
+        if day.weekday() < 5:
+            t = datetime.datetime.combine(day, datetime.time(9, 15))
+            while t < datetime.datetime.combine(day, datetime.time(15, 30)):
+                open_ = price
+                price = max(1.0, price * (1 + rng.gauss(0, 0.01)))
+                candles.append([t.strftime("%Y-%m-%dT%H:%M:%S"), open_, max(open_, price) * 1.003,
+                                min(open_, price) * 0.997, price, rng.randint(100, 1000)])
+                t += datetime.timedelta(minutes=minutes)
+            days -= 1
+        day += datetime.timedelta(days=1)
+    return candles
+
+
+class RecordedGroww(SyntheticGroww):
+    """SyntheticGroww serving fixed series instead of generated ones."""
+
+    def __init__(self, series: dict):
+        super().__init__()
+        self._series = {
+            key: ([datetime.datetime.fromisoformat(c[0]) for c in candles], candles)
+            for key, candles in series.items()
+        }
+
+
+class Clock:
+    def __init__(self):
+        self.now = None
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope="module")
+def data():
+    hours = _sessions(40, 60, seed=4, price=25000.0)
+    options = {contract: _sessions(12, 15, seed=10 + i, price=100.0) for i, contract in enumerate(CONTRACTS)}
+    backtester = Backtester({INDEX: hours}, options)
+    groww = RecordedGroww({
+        (config.GROWW_SYMBOL_MAP[INDEX], "1hour"): hours,
+        **{(contract, "15minute"): candles for contract, candles in options.items()},
+    })
+    return backtester, groww, hours, options
+
+
+def test_entry_signals_match_check_entry(data, capsys):
+    backtester, groww, _, options = data
+    clock = Clock()
+    signals = 0
+    for contract, candles in options.items():
+        entry_module = EntryModule(groww, clock=clock)
+        trend = "UP" if contract.endswith("CE") else "DOWN"
+        close_times = sorted(backtester._bar_index[contract], key=backtester._bar_index[contract].get)
+        columns = backtester._entries[contract]
+        for j, bar_close in enumerate(close_times):
+            clock.now = bar_close + SETTLE
+            signal, candle_data = entry_module.check_entry(contract, trend, bar_close)
+            assert signal == bool(columns["signal"][j]), (contract, bar_close)
+            if signal:
+                signals += 1
+                assert candle_data["ATR"] == pytest.approx(columns["atr"][j])
+                assert candle_data["RSI"] == pytest.approx(columns["rsi"][j])
+    assert signals > 0
+
+
+def test_trend_matches_trend_module(data, capsys):
+    backtester, groww, hours, _ = data
+    clock = Clock()
+    trend_module = TrendModule(groww, clock=clock)
+    starts = [datetime.datetime.fromisoformat(c[0]) for c in hours]
+    checked = 0
+    for start in starts[1:]:
+        # First cycle after each 1H close (the next bar's start, or 15:30)
+        bias_bar = start if start.time() != datetime.time(9, 15) else None
+        if bias_bar is None:
+            continue
+        clock.now = bias_bar + SETTLE
+        expected = trend_module.detect_trend(INDEX, bias_bar)
+        assert backtester._trend_at(INDEX, bias_bar)[0] == expected, bias_bar
+        checked += expected is not None
+    assert checked > 50
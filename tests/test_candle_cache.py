@@ -0,0 +1,39 @@
+"""CandleCache fetch ranges stay on the IST clock whatever the host timezone."""
+
+import datetime
+import os
+import time
+
+import pytest
+
+from candle_module import IST, TIME_FORMAT, CandleCache
+
+
+@pytest.fixture
+def new_york_host():
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def test_refresh_range_uses_ist_on_both_ends(new_york_host):
+    last_bar = datetime.datetime.now(IST).timestamp() - 30 * 60
+    requests = []
+
+    def fetch(start, end):
+        requests.append((datetime.datetime.strptime(start, TIME_FORMAT),
+                         datetime.datetime.strptime(end, TIME_FORMAT)))
+        return [[last_bar, 100.0, 101.0, 99.0, 100.5, 1000]]
+
+    cache = CandleCache(1)
+    cache.get("NSE-NIFTY", fetch)
+    cache.get("NSE-NIFTY", fetch)
+
+    start, end = requests[1]
+    assert datetime.timedelta(minutes=29) <= end - start <= datetime.timedelta(minutes=31)
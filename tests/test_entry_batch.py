@@ -0,0 +1,103 @@
+"""check_entry_batch against per-contract check_entry on the same candles."""
+
+import datetime
+
+import pytest
+
+import vector_module
+from benchmark_engine import SyntheticGroww
+from entry_module import EntryModule
+
+CONTRACTS = [f"NSE-BENCH-20Oct26-{25000 + 50 * (i // 2)}-{('CE', 'PE')[i % 2]}" for i in range(24)]
+
+
+class ShortHistoryGroww(SyntheticGroww):
+    """Every third contract has a shorter history, so the batch splits into groups."""
+
+    def get_historical_candles(self, *args, **kwargs):
+        response = super().get_historical_candles(*args, **kwargs)
+        symbol = kwargs.get("groww_symbol", args[2] if len(args) > 2 else None)
+        if symbol in CONTRACTS and CONTRACTS.index(symbol) % 3 == 0:
+            return {"candles": response["candles"][40:]}
+        return response
+
+
+@pytest.fixture
+def groww():
+    return ShortHistoryGroww(bars=200)
+
+
+def _scalar(groww, trend, bar_close=None):
+    entry_module = EntryModule(groww)
+    return [entry_module.check_entry(contract, trend, bar_close) for contract in CONTRACTS]
+
+
+@pytest.mark.parametrize("trend", ["UP", "DOWN"])
+def test_batch_matches_scalar(groww, trend, capsys):
+    expected = _scalar(groww, trend)
+    assert EntryModule(groww).check_entry_batch(CONTRACTS, trend) == expected
+    if trend == "UP":
+        assert any(signal for signal, _ in expected)
+
+
+def test_batch_matches_scalar_when_warm(groww, capsys):
+    scalar_module = EntryModule(groww)
+    batch_module = EntryModule(groww)
+    for _ in range(2):
+        expected = [scalar_module.check_entry(contract, "UP") for contract in CONTRACTS]
+        assert batch_module.check_entry_batch(CONTRACTS, "UP") == expected
+
+
+def test_batch_memo_repeats_the_bar_result(groww, capsys):
+    bar_close = datetime.datetime.now() + datetime.timedelta(days=1)
+    entry_module = EntryModule(groww)
+    first = entry_module.check_entry_batch(CONTRACTS, "UP", bar_close)
+    assert first == _scalar(groww, "UP", bar_close)
+    assert any(signal for signal, _ in first)
+    assert entry_module.check_entry_batch(CONTRACTS, "UP", bar_close) == first
+
+
+@pytest.mark.parametrize("trend", ["UP", "DOWN"])
+def test_bar_close_scheduling_keeps_signals(groww, trend, capsys):
+    # Once every fetched bar is closed, cycles with and without bar-close
+    # scheduling see the same signals, whether or not the last one was traded
+    bar_close = datetime.datetime.now() + datetime.timedelta(days=1)
+    unscheduled = EntryModule(groww)
+    scheduled = EntryModule(groww)
+    scheduled_batch = EntryModule(groww)
+    for _ in range(3):
+        expected = [unscheduled.check_entry(contract, trend) for contract in CONTRACTS]
+        assert [scheduled.check_entry(contract, trend, bar_close) for contract in CONTRACTS] == expected
+        assert scheduled_batch.check_entry_batch(CONTRACTS, trend, bar_close) == expected
+
+
+def test_fetch_error_only_costs_its_contract(groww, monkeypatch, capsys):
+    entry_module = EntryModule(groww)
+    fetch = entry_module._fetch_15m_candles
+    broken = CONTRACTS[1]
+
+    def failing_fetch(contract):
+        if contract == broken:
+            raise RuntimeError("boom")
+        return fetch(contract)
+
+    monkeypatch.setattr(entry_module, "_fetch_15m_candles", failing_fetch)
+    results = entry_module.check_entry_batch(CONTRACTS, "UP")
+    expected = _scalar(groww, "UP")
+    expected[1] = (False, None)
+    assert results == expected
+    assert f"Error for {broken}" in capsys.readouterr().out
+
+
+def test_evaluation_error_is_not_memoized(groww, monkeypatch, capsys):
+    bar_close = datetime.datetime.now() + datetime.timedelta(days=1)
+    entry_module = EntryModule(groww)
+
+    def failing(*args, **kwargs):
+        raise ValueError("boom")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(vector_module, "entry_current", failing)
+        assert entry_module.check_entry_batch(CONTRACTS, "UP", bar_close) == [(False, None)] * len(CONTRACTS)
+
+    assert entry_module.check_entry_batch(CONTRACTS, "UP", bar_close) == _scalar(groww, "UP", bar_close)
@@ -0,0 +1,91 @@
+"""Streaming indicator states (indicator_module) against the batch calculations."""
+
+import random
+
+import numpy as np
+import pytest
+
+import vector_module
+from entry_module import EntryModule
+from indicator_module import EmaState, RollingMax, RollingSum, WilderAtrState, WilderRsiState
+from trend_module import TrendModule
+
+
+def _bars(count: int, seed: int = 7):
+    """Random-walk (high, low, close, volume) bars."""
+    rng = random.Random(seed)
+    price = 100.0
+    bars = []
+    for _ in range(count):
+        open_ = price
+        price = max(1.0, price * (1 + rng.gauss(0, 0.01)))
+        bars.append((max(open_, price) * 1.002, min(open_, price) * 0.998, price, rng.randint(100, 1000)))
+    return bars
+
+
+@pytest.mark.parametrize("period", [1, 9, 21])
+def test_ema_state_matches_batch(period):
+    closes = [c for _, _, c, _ in _bars(120)]
+    state = EmaState(period)
+    batch = vector_module.ema(np.array(closes), period)
+    for i, close in enumerate(closes):
+        expected = TrendModule._ema(closes[:i + 1], period)
+        assert state.peek(close) == pytest.approx(expected)
+        assert state.update(close) == pytest.approx(expected)
+        if i >= period - 1:
+            assert batch[i] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("period", [1, 14])
+def test_atr_state_matches_batch(period):
+    bars = _bars(120)
+    state = WilderAtrState(period)
+    for i, (high, low, close, _) in enumerate(bars):
+        window = bars[:i + 1]
+        series = EntryModule._calculate_atr_series(
+            [b[0] for b in window], [b[1] for b in window], [b[2] for b in window], period,
+        )
+        stats = state.peek(high, low, close)
+        if not series:
+            assert stats is None
+        else:
+            atr, atr_mean, count = stats
+            assert atr == pytest.approx(series[-1])
+            assert atr_mean == pytest.approx(sum(series) / len(series))
+            assert count == len(series)
+        state.update(high, low, close)
+
+
+@pytest.mark.parametrize("period", [2, 14])
+def test_rsi_state_matches_batch(period):
+    closes = [c for _, _, c, _ in _bars(120)]
+    state = WilderRsiState(period)
+    batch = vector_module.wilder_rsi(np.array(closes), period)
+    for i, close in enumerate(closes):
+        expected = EntryModule._calculate_rsi(closes[:i + 1], period)
+        rsi = state.peek(close)
+        if expected is None:
+            assert rsi is None
+        else:
+            assert rsi == pytest.approx(expected)
+            assert batch[i] == pytest.approx(expected)
+        state.update(close)
+
+
+def test_rsi_state_without_losses_is_100():
+    state = WilderRsiState(3)
+    for close in (1.0, 2.0, 3.0, 4.0):
+        state.update(close)
+    assert state.peek(5.0) == 100.0
+
+
+def test_rolling_windows_match_slices():
+    bars = _bars(60)
+    highest = RollingMax(5)
+    volumes = RollingSum(10)
+    for i, (high, _, _, volume) in enumerate(bars):
+        highest.update(high)
+        volumes.update(volume)
+        assert highest.value == max(b[0] for b in bars[max(0, i - 4):i + 1])
+        assert volumes.total == sum(b[3] for b in bars[max(0, i - 9):i + 1])
+        assert len(volumes) == min(i + 1, 10)
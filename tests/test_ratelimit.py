@@ -0,0 +1,87 @@
+"""RateLimiter windows, reserve and urgent calls on a virtual clock."""
+
+import pytest
+
+from ratelimit_module import RateLimiter, WindowBucket
+
+
+class VirtualClock:
+    """Clock for RateLimiter whose waits advance time instead of sleeping."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def attach(self, limiter: RateLimiter):
+        def wait(timeout=None):
+            self.now += timeout
+            return False
+        limiter._cond.wait = wait
+        return limiter
+
+
+def _send_times(limiter: RateLimiter, clock: VirtualClock, calls: int, urgent: bool = False) -> list:
+    times = []
+    for _ in range(calls):
+        limiter.acquire("live_data", urgent)
+        times.append(clock.now)
+    return times
+
+
+def _max_in_window(times: list, period: float) -> int:
+    return max(sum(1 for t in times if start <= t < start + period) for start in times)
+
+
+def test_bucket_returns_tokens_one_period_after_use():
+    bucket = WindowBucket(3, 1.0)
+    for t in (0.0, 0.25, 0.5):
+        bucket.take(t)
+    assert bucket.time_until(1, 0.5) == pytest.approx(0.5)
+    assert bucket.time_until(2, 0.5) == pytest.approx(0.75)
+    bucket.refill(1.0)
+    assert bucket.time_until(1, 1.0) == 0.0
+    assert len(bucket.used) == 2
+
+
+def test_no_window_holds_more_than_its_count():
+    clock = VirtualClock()
+    limiter = clock.attach(RateLimiter({"live_data": [(5, 1.0), (12, 10.0)]}, reserve=0, clock=clock))
+    times = _send_times(limiter, clock, 40)
+    assert _max_in_window(times, 1.0) == 5
+    assert _max_in_window(times, 10.0) == 12
+    assert times[:5] == [0.0] * 5
+
+
+def test_normal_calls_leave_the_reserve_for_urgent_calls():
+    clock = VirtualClock()
+    limiter = clock.attach(RateLimiter({"live_data": [(5, 1.0)]}, reserve=2, clock=clock))
+    assert _send_times(limiter, clock, 3) == [0.0] * 3
+    assert _send_times(limiter, clock, 2, urgent=True) == [0.0] * 2
+    assert limiter.acquire("live_data") == pytest.approx(1.0)
+
+
+def test_reserve_larger_than_a_bucket_is_clamped():
+    clock = VirtualClock()
+    limiter = clock.attach(RateLimiter({"live_data": [(2, 1.0)]}, reserve=2, clock=clock))
+    assert _send_times(limiter, clock, 3) == [0.0, 1.0, 2.0]
+    assert _send_times(limiter, clock, 2, urgent=True) == [2.0, 3.0]
+
+
+def test_unknown_group_is_not_limited():
+    limiter = RateLimiter({"live_data": [(1, 1.0)]})
+    assert limiter.acquire("other") == 0.0
+
+
+def test_throttled_pauses_the_group():
+    clock = VirtualClock()
+    limiter = clock.attach(RateLimiter({"live_data": [(5, 1.0)]}, reserve=0, clock=clock))
+    limiter.throttled("live_data", 3.0)
+    assert limiter.acquire("live_data") == pytest.approx(3.0)
+
+
+@pytest.mark.parametrize("windows", [[(0, 1.0)], [(5, 0.0)]])
+def test_windows_that_never_admit_a_call_are_rejected(windows):
+    with pytest.raises(ValueError):
+        RateLimiter({"live_data": windows})
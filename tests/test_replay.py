@@ -0,0 +1,75 @@
+"""Replaying a journal recorded long ago runs on the recorded time, not the wall clock."""
+
+import datetime
+
+import pytest
+from growwapi import GrowwAPI
+
+import main_engine
+import replay_module
+from candle_module import IST, CandleCache
+from position_module import PositionModule
+from replay_module import RecordingClient, ReplayClient
+
+SESSION = datetime.datetime(2025, 1, 6, 9, 15)
+RECORDED_AT = datetime.datetime(2025, 1, 6, 15, 35, tzinfo=IST).timestamp()
+SYMBOL = "NSE-NIFTY-09Jan25-23500-CE"
+
+
+class RecordedDayGroww:
+    """25 15M bars of one session in 2025."""
+
+    def get_historical_candles(self, exchange, segment, groww_symbol, start_time, end_time,
+                               candle_interval, timeout=None):
+        candles = []
+        for i in range(25):
+            t = SESSION + datetime.timedelta(minutes=15 * i)
+            candles.append([t.strftime("%Y-%m-%dT%H:%M:%S"), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1000])
+        return {"candles": candles}
+
+
+def _fetch(client):
+    def fetch(start_str, end_str):
+        return client.get_historical_candles(
+            exchange=GrowwAPI.EXCHANGE_NSE,
+            segment=GrowwAPI.SEGMENT_FNO,
+            groww_symbol=SYMBOL,
+            start_time=start_str,
+            end_time=end_str,
+            candle_interval=GrowwAPI.CANDLE_INTERVAL_MIN_15,
+        )["candles"]
+    return fetch
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.jsonl.gz")
+    with monkeypatch.context() as patch:
+        patch.setattr(replay_module.time, "time", lambda: RECORDED_AT)
+        recorder = RecordingClient(RecordedDayGroww(), path)
+        _fetch(recorder)("2024-12-31 15:35:00", "2025-01-06 15:35:00")
+        recorder.close()
+    return path
+
+
+@pytest.fixture
+def replay_clock(journal):
+    client = ReplayClient(journal)
+    main_engine.use_replay_clock(client.clock)
+    yield client
+    main_engine.use_replay_clock(None)
+
+
+def test_old_journal_keeps_its_bars(replay_clock):
+    cache = CandleCache(5, clock=main_engine.get_ist_now_naive)
+    fetch = _fetch(replay_clock)
+    assert [len(cache.get(SYMBOL, fetch)) for _ in range(4)] == [25, 25, 25, 25]
+
+
+def test_replay_clock_is_the_recorded_time(replay_clock):
+    _fetch(replay_clock)("", "")
+    assert main_engine.get_ist_now_naive() == datetime.datetime(2025, 1, 6, 15, 35)
+
+    position_module = PositionModule(clock=main_engine.get_ist_now_naive)
+    position_module.open_trade(SYMBOL, "NSE_NIFTY", 100.0, 90.0, 120.0, 75, 75, 10.0)
+    assert position_module.open_positions[SYMBOL].entry_time == "2025-01-06 15:35"
@@ -0,0 +1,69 @@
+"""Session-aligned resampling: chained timeframes equal direct ones."""
+
+import datetime
+import random
+
+import pytest
+
+from resample_module import Resampler, bucket_start, resample
+
+SESSION_OPEN = datetime.time(9, 15)
+SESSION_CLOSE = datetime.time(15, 30)
+
+
+def _minute_candles(days: int = 3, seed: int = 3, with_oi: bool = False) -> list:
+    """1M candles for whole sessions; the last day stops mid-session, some volumes missing."""
+    rng = random.Random(seed)
+    price = 100.0
+    candles = []
+    day = datetime.date(2026, 6, 1)
+    for d in range(days):
+        t = datetime.datetime.combine(day + datetime.timedelta(days=d), SESSION_OPEN)
+        end = datetime.datetime.combine(t.date(), SESSION_CLOSE)
+        if d == days - 1:
+            end = t + datetime.timedelta(minutes=137)
+        while t < end:
+            open_ = price
+            price = max(1.0, price + rng.gauss(0, 0.2))
+            volume = None if rng.random() < 0.05 else rng.randint(1, 50)
+            candle = [t.strftime("%Y-%m-%dT%H:%M:%S"), open_, max(open_, price) + 0.05,
+                      min(open_, price) - 0.05, price, volume]
+            if with_oi:
+                candle.append(rng.randint(1000, 2000))
+            candles.append(candle)
+            t += datetime.timedelta(minutes=1)
+    return candles
+
+
+@pytest.mark.parametrize("with_oi", [False, True])
+def test_chained_resample_equals_direct(with_oi):
+    minutes = _minute_candles(with_oi=with_oi)
+    assert resample(resample(minutes, 15), 60) == resample(minutes, 60)
+    assert resample(resample(minutes, 5), 15) == resample(minutes, 15)
+
+
+def test_hour_bars_align_to_the_session():
+    minutes = _minute_candles(days=2)
+    first_day = [c for c in minutes if c[0].startswith("2026-06-01")]
+    hours = resample(minutes, 60)
+    starts = [bar[0][11:16] for bar in hours]
+    assert starts == ["09:15", "10:15", "11:15", "12:15", "13:15", "14:15", "15:15", "09:15", "10:15", "11:15"]
+    # 15:15-15:30 is the session's short last bar
+    assert hours[6][1] == first_day[-15][1]
+    assert hours[6][4] == first_day[-1][4]
+
+
+def test_bucket_start():
+    t = datetime.datetime(2026, 6, 1, 10, 14, 59)
+    assert bucket_start(t, 60) == datetime.datetime(2026, 6, 1, 9, 15)
+    assert bucket_start(t, 15) == datetime.datetime(2026, 6, 1, 10, 0)
+
+
+def test_incremental_resampler_matches_resample():
+    minutes = _minute_candles()
+    resampler = Resampler()
+    for end in range(1, len(minutes), 37):
+        assert resampler.get("NSE_NIFTY", minutes[:end], 15) == resample(minutes[:end], 15)
+    assert resampler.get("NSE_NIFTY", minutes, 15) == resample(minutes, 15)
+    # A new first bar (history trimmed) rebuilds the series
+    assert resampler.get("NSE_NIFTY", minutes[400:], 15) == resample(minutes[400:], 15)
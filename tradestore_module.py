@@ -0,0 +1,206 @@
+"""
+tradestore_module.py - Columnar, date-partitioned trade store.
+Responsibility: Store closed trades as typed column files, one partition per trade
+date, with a small index (rows, indices, contracts per date) so range and per-index
+queries only read the partitions they need. Same interface as LoggerModule; can
+export to the CSV log schema. No trade logic. No risk logic.
+
+Layout:
+    STORE_DIR/index.json                 partitions + symbol table
+    STORE_DIR/2026-10-17/<column>.bin    raw little-endian column values
+"""
+
+import csv
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+
+import config
+from logger_module import LoggerModule, CSV_HEADER, format_row
+
+# Column name -> dtype. contract/index hold ids into the symbol table.
+COLUMNS = {
+    "time": "<M8[m]",
+    "contract": "<i4",
+    "index": "<i4",
+    "entry": "<f8",
+    "exit": "<f8",
+    "qty": "<i8",
+    "lot": "<i8",
+    "pnl": "<f8",
+    "capital_after": "<f8",
+}
+
+_INDEX_FILE = "index.json"
+
+
+class TradeStore(LoggerModule):
+    """
+    LoggerModule whose sink is the columnar store. Rows go through the same
+    (optionally buffered) writer; each batch appends to its date partitions
+    and then rewrites the index, so readers never see half a batch.
+    """
+
+    def __init__(self, store_dir: str = None, buffered: bool = None, durable: bool = None):
+        self.store_dir = store_dir or config.TRADE_STORE_DIR
+        super().__init__(self.store_dir, buffered, durable)
+
+    def _init_storage(self):
+        """Create the store directory and load its index."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        self._store_lock = threading.Lock()  # writer thread vs queries
+        self._index = {"partitions": {}, "symbols": []}
+        path = os.path.join(self.store_dir, _INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._index = json.load(f)
+        self._symbol_ids = {name: i for i, name in enumerate(self._index["symbols"])}
+
+    def _count_logged_trades(self) -> int:
+        return sum(p["rows"] for p in self._index["partitions"].values())
+
+    def _symbol_id(self, name: str) -> int:
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self._index["symbols"])
+            self._index["symbols"].append(name)
+            self._symbol_ids[name] = symbol_id
+        return symbol_id
+
+    def _append_rows(self, rows: list):
+        """
+        Append trade tuples to their date partitions, then commit the index.
+        Row counts only change in memory once the index is written, so a
+        failed batch is retried from the committed rows (no duplicates).
+        """
+        with self._store_lock:
+            staged = self._append_partitions(rows)
+            index = {
+                "partitions": {**self._index["partitions"], **staged},
+                "symbols": self._index["symbols"],
+            }
+            self._write_index(index)
+            self._index = index
+
+    def _append_partitions(self, rows: list) -> dict:
+        """Write rows after each date's committed rows. Returns the staged partitions."""
+        by_date = {}
+        for row in rows:
+            by_date.setdefault(str(row[0])[:10], []).append(row)
+
+        staged = {}
+        for date, date_rows in by_date.items():
+            committed = self._index["partitions"].get(
+                date, {"rows": 0, "indices": [], "contracts": []}
+            )
+            folder = os.path.join(self.store_dir, date)
+            os.makedirs(folder, exist_ok=True)
+
+            columns = {
+                "time": [str(r[0]).replace(" ", "T") for r in date_rows],
+                "contract": [self._symbol_id(r[1]) for r in date_rows],
+                "index": [self._symbol_id(r[2]) for r in date_rows],
+                "entry": [r[3] for r in date_rows],
+                "exit": [r[4] for r in date_rows],
+                "qty": [r[5] for r in date_rows],
+                "lot": [r[6] for r in date_rows],
+                "pnl": [r[7] for r in date_rows],
+                "capital_after": [np.nan if r[8] is None else r[8] for r in date_rows],
+            }
+            for name, dtype in COLUMNS.items():
+                path = os.path.join(folder, f"{name}.bin")
+                with open(path, "ab") as f:
+                    # Drop bytes past the committed rows (interrupted batch)
+                    f.truncate(committed["rows"] * np.dtype(dtype).itemsize)
+                    f.write(np.array(columns[name], dtype=dtype).tobytes())
+                    if self.durable:
+                        f.flush()
+                        os.fsync(f.fileno())
+
+            staged[date] = {
+                "rows": committed["rows"] + len(date_rows),
+                "indices": sorted(set(committed["indices"]) | {r[2] for r in date_rows}),
+                "contracts": sorted(set(committed["contracts"]) | {r[1] for r in date_rows}),
+            }
+        return staged
+
+    def _write_index(self, index: dict):
+        """Replace index.json atomically; it is the commit point for a batch."""
+        path = os.path.join(self.store_dir, _INDEX_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def partitions(self, start: str = None, end: str = None, index: str = None,
+                   contract: str = None) -> list:
+        """Partition dates (YYYY-MM-DD, inclusive range) that can hold matching trades."""
+        return [
+            date for date, p in sorted(self._index["partitions"].items())
+            if (start is None or date >= start)
+            and (end is None or date <= end)
+            and (index is None or index in p["indices"])
+            and (contract is None or contract in p["contracts"])
+        ]
+
+    def query(self, start: str = None, end: str = None, index: str = None,
+              contract: str = None) -> dict:
+        """
+        Trades in [start, end] (dates), optionally for one index and/or contract.
+        Only matching partitions are read. Returns column name -> NumPy array;
+        contract/index are decoded to names. Call flush() first to include
+        queued rows.
+        """
+        parts = {name: [] for name in COLUMNS}
+        with self._store_lock:
+            dates = self.partitions(start, end, index, contract)
+            for date in dates:
+                rows = self._index["partitions"][date]["rows"]
+                for name, dtype in COLUMNS.items():
+                    path = os.path.join(self.store_dir, date, f"{name}.bin")
+                    parts[name].append(np.fromfile(path, dtype=dtype, count=rows))
+            symbol_ids = dict(self._symbol_ids)
+            symbols = np.array(self._index["symbols"] or [""], dtype=object)
+
+        result = {
+            name: np.concatenate(chunks) if chunks else np.zeros(0, dtype=COLUMNS[name])
+            for name, chunks in parts.items()
+        }
+
+        mask = np.ones(len(result["time"]), dtype=bool)
+        if index is not None:
+            mask &= result["index"] == symbol_ids.get(index, -1)
+        if contract is not None:
+            mask &= result["contract"] == symbol_ids.get(contract, -1)
+        result = {name: values[mask] for name, values in result.items()}
+
+        result["contract"] = symbols[result["contract"]]
+        result["index"] = symbols[result["index"]]
+        return result
+
+    def export_csv(self, path: str, **filters) -> int:
+        """Write matching trades in the LoggerModule CSV schema. Returns row count."""
+        trades = self.query(**filters)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for i in range(len(trades["time"])):
+                capital_after = trades["capital_after"][i]
+                writer.writerow(format_row(
+                    trades["time"][i].astype(datetime.datetime).strftime("%Y-%m-%d %H:%M"),
+                    trades["contract"][i],
+                    trades["index"][i],
+                    trades["entry"][i],
+                    trades["exit"][i],
+                    int(trades["qty"][i]),
+                    int(trades["lot"][i]),
+                    trades["pnl"][i],
+                    None if np.isnan(capital_after) else capital_after,
+                ))
+        return len(trades["time"])
@@ -3,36 +3,66 @@ trend_module.py - 1H index trend bias detection.
 Responsibility: Determine UP/DOWN/None trend using EMA21 vs EMA50 on 1H index candles.
 """
 
-import datetime
 import config
+from candle_module import CandleCache, candle_time, closed_candles
+from indicator_module import EmaState
+from resample_module import Resampler
+from scheduler_module import INTERVAL_MINUTES
 
 
 class TrendModule:
-    def __init__(self, groww):
+    def __init__(self, groww, candle_store=None, shared_candles=None, clock=None):
         self.groww = groww
-
-    def detect_trend(self, index_symbol: str):
+        # Index bars are fetched at the base interval and resampled to 1H when set
+        self.base_interval = config.BIAS_BASE_INTERVAL or config.BIAS_INTERVAL
+        self.resampler = Resampler() if self.base_interval != config.BIAS_INTERVAL else None
+        self.candle_cache = CandleCache(config.BIAS_LOOKBACK_DAYS, candle_store, self.base_interval,
+                                        shared_candles, clock)
+        # index_symbol -> (first bar time, committed bar count, fast state, slow state)
+        self._ema_states = {}
+        # index_symbol -> (bar_close, trend) for bar-close scheduling
+        self._trend_memo = {}
+
+    def detect_trend(self, index_symbol: str, bar_close=None):
         """
         Detect trend on 1H index candles using EMA21 vs EMA50.
+        Closed bars are committed to streaming EMA states; the last bar
+        (possibly still forming) is only peeked, so the result equals
+        _ema() over the full close series.
+
+        With bar_close (see scheduler_module), only bars that started before
+        it are used and the result is reused until the next bar closes.
         Returns: "UP", "DOWN", or None
         """
+        if bar_close is not None:
+            memo = self._trend_memo.get(index_symbol)
+            if memo is not None and memo[0] == bar_close:
+                return memo[1]
+
         try:
             candles = self._fetch_1h_candles(index_symbol)
+            if candles is not None and bar_close is not None:
+                candles = closed_candles(candles, bar_close)
             if candles is None or len(candles) < config.EMA_SLOW:
                 print(f"  [Trend] Not enough 1H candles for {index_symbol} (got {len(candles) if candles else 0})")
                 return None
 
-            closes = [float(c[4]) for c in candles]  # close price
+            fast_state, slow_state = self._update_ema_states(index_symbol, candles)
 
-            ema_fast = self._ema(closes, config.EMA_FAST)
-            ema_slow = self._ema(closes, config.EMA_SLOW)
+            last_close = float(candles[-1][4])  # close price
+            ema_fast = fast_state.peek(last_close)
+            ema_slow = slow_state.peek(last_close)
 
             if ema_fast > ema_slow:
-                return "UP"
+                trend = "UP"
             elif ema_fast < ema_slow:
-                return "DOWN"
+                trend = "DOWN"
             else:
-                return None
+                trend = None
+
+            if bar_close is not None:
+                self._trend_memo[index_symbol] = (bar_close, trend)
+            return trend
 
         except Exception as e:
             print(f"  [Trend] Error for {index_symbol}: {e}")
@@ -41,31 +71,56 @@ class TrendModule:
     def _fetch_1h_candles(self, index_symbol: str):
         """
         Fetch 1H candles for index from Groww API.
-        Uses get_historical_candles with proper time format.
+        The first call loads the full lookback window; later calls only
+        request bars from the last cached bar onwards (see CandleCache).
+        With BIAS_BASE_INTERVAL the base bars are fetched and resampled.
         """
-        now = datetime.datetime.now()
-        # Go back enough days to get sufficient candles (weekends, holidays)
-        start = now - datetime.timedelta(days=15)
-
-        # Weekend-safe: adjust start to avoid starting on weekend
-        start_str = start.strftime("%Y-%m-%d %H:%M:%S")
-        end_str = now.strftime("%Y-%m-%d %H:%M:%S")
-
         # groww_symbol requires dash format: NSE-NIFTY, not NSE_NIFTY
         groww_symbol = config.GROWW_SYMBOL_MAP[index_symbol]
 
-        # For index candles, use CASH segment
+        candles = self.candle_cache.get(
+            index_symbol,
+            lambda start_str, end_str: self._request_1h_candles(groww_symbol, start_str, end_str),
+        )
+        if candles and self.resampler is not None:
+            candles = self.resampler.get(index_symbol, candles, INTERVAL_MINUTES[config.BIAS_INTERVAL])
+        return candles if candles else None
+
+    def _request_1h_candles(self, groww_symbol: str, start_str: str, end_str: str) -> list:
+        """Request index candles at the base interval (1H unless resampling, CASH segment)."""
         data = self.groww.get_historical_candles(
             exchange=self.groww.EXCHANGE_NSE,
             segment=self.groww.SEGMENT_CASH,
             groww_symbol=groww_symbol,
             start_time=start_str,
             end_time=end_str,
-            candle_interval=self.groww.CANDLE_INTERVAL_HOUR_1,
+            candle_interval=self.base_interval,
         )
+        return data.get("candles", [])
 
-        candles = data.get("candles", [])
-        return candles if candles else None
+    def _update_ema_states(self, index_symbol: str, candles: list):
+        """
+        Commit every bar except the last to the EMA states for this index.
+        States are rebuilt if the cached history was replaced.
+        """
+        first_time = candle_time(candles[0])
+        closed_count = len(candles) - 1
+
+        entry = self._ema_states.get(index_symbol)
+        if entry is None or entry[0] != first_time or entry[1] > closed_count:
+            fast_state = EmaState(config.EMA_FAST)
+            slow_state = EmaState(config.EMA_SLOW)
+            committed = 0
+        else:
+            _, committed, fast_state, slow_state = entry
+
+        for c in candles[committed:closed_count]:
+            close = float(c[4])
+            fast_state.update(close)
+            slow_state.update(close)
+
+        self._ema_states[index_symbol] = (first_time, closed_count, fast_state, slow_state)
+        return fast_state, slow_state
 
     @staticmethod
     def _ema(data: list, period: int) -> float:
@@ -0,0 +1,74 @@
+"""
+universe_module.py - Scan universe.
+Responsibility: Decide which underlyings are scanned (config INDEX_LIST, or every
+F&O underlying in the broker's instrument list) and install their symbol maps and
+lot sizes into config. No strategy logic. No trade logic.
+"""
+
+import config
+
+# Columns used from GrowwAPI.get_all_instruments() (all strings)
+_INSTRUMENT_COLUMNS = ("exchange", "segment", "instrument_type", "underlying_symbol",
+                       "lot_size", "expiry_date")
+
+
+def config_universe() -> dict:
+    """The configured INDEX_LIST as {symbol: {underlying, groww_symbol, lot_size}}."""
+    return {
+        symbol: {
+            "underlying": config.UNDERLYING_MAP[symbol],
+            "groww_symbol": config.GROWW_SYMBOL_MAP[symbol],
+            "lot_size": config.LOT_SIZE[symbol],
+        }
+        for symbol in config.INDEX_LIST
+    }
+
+
+def fno_universe(groww) -> dict:
+    """
+    Every NSE F&O underlying with listed options, keyed NSE_<UNDERLYING>.
+    Lot size is taken from the nearest expiry. Configured indices come first
+    (keeping their config entries), then the rest alphabetically.
+    """
+    instruments = groww.get_all_instruments()
+    missing = [c for c in _INSTRUMENT_COLUMNS if c not in instruments.columns]
+    if missing:
+        raise ValueError(f"instrument list has no {', '.join(missing)} column")
+
+    options = instruments[
+        (instruments["exchange"] == "NSE")
+        & (instruments["segment"] == "FNO")
+        & instruments["instrument_type"].isin(["CE", "PE"])
+    ].sort_values("expiry_date")
+    nearest = options.drop_duplicates("underlying_symbol")
+
+    universe = config_universe()
+    for underlying, lot_size in sorted(zip(nearest["underlying_symbol"], nearest["lot_size"])):
+        symbol = f"NSE_{underlying}"
+        if symbol not in universe:
+            universe[symbol] = {
+                "underlying": underlying,
+                "groww_symbol": f"NSE-{underlying}",
+                "lot_size": int(float(lot_size)),
+            }
+    return universe
+
+
+def load_universe(groww) -> dict:
+    """Universe per SCAN_UNIVERSE ("config" or "fno"); falls back to config."""
+    if config.SCAN_UNIVERSE == "fno":
+        try:
+            universe = fno_universe(groww)
+            print(f"[Universe] {len(universe)} F&O underlyings")
+            return universe
+        except Exception as e:
+            print(f"[Universe] ERROR loading F&O underlyings, using INDEX_LIST: {e}")
+    return config_universe()
+
+
+def apply_universe(universe: dict):
+    """Point INDEX_LIST and the per-symbol maps in config at universe."""
+    config.INDEX_LIST = list(universe)
+    config.UNDERLYING_MAP = {s: u["underlying"] for s, u in universe.items()}
+    config.GROWW_SYMBOL_MAP = {s: u["groww_symbol"] for s, u in universe.items()}
+    config.LOT_SIZE = {s: u["lot_size"] for s, u in universe.items()}
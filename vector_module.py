@@ -0,0 +1,236 @@
+"""
+vector_module.py - NumPy indicator columns.
+Responsibility: Whole-array versions of the trend/entry indicators. Every function
+works along the last axis, so a 1-D series and a 2-D (contracts x bars) block use
+the same code. Element i equals the scalar calculation on bars 0..i.
+No fetching. No trade logic.
+"""
+
+import numpy as np
+
+
+def _seed_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """Mean of the first `period` values, summed left to right like sum()."""
+    total = np.zeros(values.shape[:-1])
+    for i in range(period):
+        total = total + values[..., i]
+    return total / period
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    EMA with SMA seed (TrendModule._ema). NaN until `period` values exist;
+    _ema returns 0.0 there, callers must treat NaN the same way.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    n = values.shape[-1]
+    if n < period:
+        return out
+
+    multiplier = 2.0 / (period + 1)
+    current = _seed_mean(values, period)
+    out[..., period - 1] = current
+    for i in range(period, n):
+        current = (values[..., i] - current) * multiplier + current
+        out[..., i] = current
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; element 0 is NaN (no previous close)."""
+    prev_close = close[..., :-1]
+    tr = np.maximum(
+        np.maximum(high[..., 1:] - low[..., 1:], np.abs(high[..., 1:] - prev_close)),
+        np.abs(low[..., 1:] - prev_close),
+    )
+    pad = np.full(high.shape[:-1] + (1,), np.nan)
+    return np.concatenate([pad, tr], axis=-1)
+
+
+def wilder_atr(high, low, close, period: int):
+    """
+    Wilder ATR and the running mean of the ATR series
+    (EntryModule._calculate_atr_series). Returns (atr, atr_mean, atr_count);
+    atr is NaN before bar `period`.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    n = high.shape[-1]
+    atr = np.full(high.shape, np.nan)
+    if n < period + 1:
+        return atr, atr.copy(), np.zeros(high.shape)
+
+    tr = true_range(high, low, close)
+    current = _seed_mean(tr[..., 1:], period)
+    atr[..., period] = current
+    for i in range(period + 1, n):
+        current = (current * (period - 1) + tr[..., i]) / period
+        atr[..., i] = current
+
+    defined = ~np.isnan(atr)
+    count = np.cumsum(defined, axis=-1)
+    total = np.cumsum(np.where(defined, atr, 0.0), axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        atr_mean = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+    return atr, atr_mean, count
+
+
+def wilder_rsi(close, period: int) -> np.ndarray:
+    """Wilder RSI (EntryModule._calculate_rsi). NaN before bar `period`."""
+    close = np.asarray(close, dtype=float)
+    n = close.shape[-1]
+    rsi = np.full(close.shape, np.nan)
+    if n < period + 1:
+        return rsi
+
+    delta = np.diff(close, axis=-1)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+
+    # Averages per bar first, RSI from them in one pass
+    avg_gains = np.empty(close.shape[:-1] + (n - period,))
+    avg_losses = np.empty(avg_gains.shape)
+    avg_gain = _seed_mean(gains, period)
+    avg_loss = _seed_mean(losses, period)
+    avg_gains[..., 0] = avg_gain
+    avg_losses[..., 0] = avg_loss
+    for i in range(period, n - 1):
+        avg_gain = (avg_gain * (period - 1) + gains[..., i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[..., i]) / period
+        avg_gains[..., i + 1 - period] = avg_gain
+        avg_losses[..., i + 1 - period] = avg_loss
+    rsi[..., period:] = _rsi_from_averages(avg_gains, avg_losses)
+    return rsi
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = avg_gain / avg_loss
+        rsi = 100.0 - (100.0 / (1.0 + rs))
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+
+def rolling_max_prev(values, window: int) -> np.ndarray:
+    """Max of the `window` values before each element. NaN for the first `window`."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] <= window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values[..., :-1], window, axis=-1)
+    out[..., window:] = windows.max(axis=-1)
+    return out
+
+
+def rolling_mean_prev(values, window: int) -> np.ndarray:
+    """Mean of the `window` values before each element. NaN for the first `window`."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] <= window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values[..., :-1], window, axis=-1)
+    out[..., window:] = windows.sum(axis=-1) / window
+    return out
+
+
+def entry_columns(high, low, close, volume, opt_type: str, cfg) -> dict:
+    """
+    All four EntryModule conditions as boolean columns, element i evaluated
+    with bar i as the current candle. Returns dict with "signal", "atr",
+    "rsi", "close", "low", "high", "volume" and the thresholds compared
+    against ("breakout_level", "vol_avg", "atr_mean").
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+
+    min_candles = max(
+        cfg.BREAKOUT_LOOKBACK + 1,
+        cfg.VOLUME_AVG_PERIOD + 1,
+        cfg.ATR_PERIOD + 1,
+        cfg.RSI_PERIOD + 1,
+    )
+    enough = np.arange(close.shape[-1]) + 1 >= min_candles
+
+    with np.errstate(invalid="ignore"):
+        breakout_level = rolling_max_prev(high, cfg.BREAKOUT_LOOKBACK)
+        breakout = close > breakout_level
+
+        vol_avg = rolling_mean_prev(volume, cfg.VOLUME_AVG_PERIOD)
+        volume_ok = (vol_avg > 0) & (volume > vol_avg)
+
+        atr, atr_mean, atr_count = wilder_atr(high, low, close, cfg.ATR_PERIOD)
+        atr_ok = (atr_count >= 2) & (atr > atr_mean)
+
+        rsi = wilder_rsi(close, cfg.RSI_PERIOD)
+        if opt_type == "CE":
+            rsi_ok = rsi > cfg.RSI_CE_THRESHOLD
+        else:
+            rsi_ok = rsi < cfg.RSI_PE_THRESHOLD
+
+    return {
+        "signal": enough & breakout & volume_ok & atr_ok & rsi_ok,
+        "atr": atr,
+        "rsi": rsi,
+        "close": close,
+        "low": low,
+        "high": high,
+        "volume": volume,
+        "breakout_level": breakout_level,
+        "vol_avg": vol_avg,
+        "atr_mean": atr_mean,
+    }
+
+
+def entry_current(high, low, close, volume, opt_type: str, cfg) -> dict:
+    """
+    entry_columns for the last bar only, per row of (contracts x bars) blocks:
+    same values as entry_columns(...)[name][..., -1], without the rolling
+    windows over every earlier bar. Needs the entry minimum of bars.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+
+    min_candles = max(
+        cfg.BREAKOUT_LOOKBACK + 1,
+        cfg.VOLUME_AVG_PERIOD + 1,
+        cfg.ATR_PERIOD + 1,
+        cfg.RSI_PERIOD + 1,
+    )
+    if close.shape[-1] < min_candles:
+        raise ValueError(f"need at least {min_candles} bars, got {close.shape[-1]}")
+
+    current_close = close[..., -1]
+    current_volume = volume[..., -1]
+    breakout_level = high[..., -1 - cfg.BREAKOUT_LOOKBACK:-1].max(axis=-1)
+    vol_avg = volume[..., -1 - cfg.VOLUME_AVG_PERIOD:-1].sum(axis=-1) / cfg.VOLUME_AVG_PERIOD
+
+    atr, atr_mean, atr_count = wilder_atr(high, low, close, cfg.ATR_PERIOD)
+    atr, atr_mean, atr_count = atr[..., -1], atr_mean[..., -1], atr_count[..., -1]
+    rsi = wilder_rsi(close, cfg.RSI_PERIOD)[..., -1]
+
+    with np.errstate(invalid="ignore"):
+        breakout = current_close > breakout_level
+        volume_ok = (vol_avg > 0) & (current_volume > vol_avg)
+        atr_ok = (atr_count >= 2) & (atr > atr_mean)
+        if opt_type == "CE":
+            rsi_ok = rsi > cfg.RSI_CE_THRESHOLD
+        else:
+            rsi_ok = rsi < cfg.RSI_PE_THRESHOLD
+
+    return {
+        "signal": breakout & volume_ok & atr_ok & rsi_ok,
+        "atr": atr,
+        "rsi": rsi,
+        "close": current_close,
+        "low": low[..., -1],
+        "high": high[..., -1],
+        "volume": current_volume,
+        "breakout_level": breakout_level,
+        "vol_avg": vol_avg,
+        "atr_mean": atr_mean,
+    }